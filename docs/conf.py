@@ -109,6 +109,8 @@ rst_epilog = """
 
 .. |modify| replace:: :meth:`~f5.bigip.resource.ResourceBase.modify`
 
+.. |save| replace:: :meth:`~f5.bigip.resource.ResourceBase.save`
+
 .. |refresh| replace:: :meth:`~f5.bigip.resource.Resource.refresh`
 
 .. |delete| replace:: :meth:`~f5.bigip.resource.Resource.delete`
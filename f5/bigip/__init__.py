@@ -17,6 +17,10 @@
 #
 
 
+from collections import deque
+from icontrol.session import BOOLEANS
+from icontrol.session import BOOLEANS_TRUE
+from icontrol.session import debug_prepared_request
 from icontrol.session import iControlRESTSession
 try:
     import urlparse
@@ -43,6 +47,10 @@ from f5.bigip.tm.sys import Sys
 from f5.bigip.tm import Tm
 from f5.bigip.tm.transaction import Transactions
 from f5.sdk_exception import TimeoutError
+from f5.utils.cache import ResourceCache
+from f5.utils.json_codec import get_codec
+from f5.utils.metrics import RequestMetrics
+from f5.utils.retry import RetryPolicy
 
 
 def timeout_handler(signum, frame):
@@ -68,7 +76,12 @@ class BaseManagement(PathElement):
             token_to_use=kwargs.pop('token_to_use', None),
             verify=kwargs.pop('verify', False),
             auth_provider=kwargs.pop('auth_provider', None),
-            debug=kwargs.pop('debug', False)
+            debug=kwargs.pop('debug', False),
+            retry_policy=kwargs.pop('retry_policy', None),
+            cache=kwargs.pop('cache', None),
+            json_codec=kwargs.pop('json_codec', None),
+            metrics=kwargs.pop('metrics', None),
+            debug_history=kwargs.pop('debug_history', None)
         )
         if kwargs:
             raise TypeError('Unexpected **kwargs: %r' % kwargs)
@@ -94,7 +107,9 @@ class BaseManagement(PathElement):
             params['token'] = kwargs['token']
 
         result = iControlRESTSession(**params)
-        result.debug = kwargs['debug']
+        if not kwargs['debug_history']:
+            # Otherwise the trace is kept by _trace_response
+            result.debug = kwargs['debug']
         return result
 
     def configure_meta_data(self, *args, **kwargs):
@@ -110,10 +125,33 @@ class BaseManagement(PathElement):
             'username': kwargs['username'],
             'password': kwargs['password'],
             'tmos_version': None,
+            'retry_policy': kwargs['retry_policy'] or RetryPolicy(),
+            'cache': kwargs['cache'],
+            'json_codec': get_codec(kwargs['json_codec']),
+            'metrics': kwargs['metrics'] or RequestMetrics(),
+            'debug': kwargs['debug'] in BOOLEANS_TRUE,
+            'debug_history': deque(maxlen=kwargs['debug_history'])
+            if kwargs['debug_history'] else None,
         }
+        cache = kwargs['cache']
+        if isinstance(cache, ResourceCache) and cache.codec is None:
+            cache.codec = self._meta_data['json_codec']
 
     def set_icr_metadata(self, icrs):
         self._meta_data['icr_session'] = icrs
+        if self._meta_data['debug_history'] is not None:
+            icrs.session.hooks['response'].append(self._trace_response)
+
+    def _trace_response(self, response, *args, **kwargs):
+        """Response hook of the session recording the debug trace.
+
+        The session's own trace is an unbounded list, so with a
+        ``debug_history`` the trace is kept in a bounded deque instead,
+        formatted by the session's ``debug_prepared_request``.
+        """
+        if self._meta_data['debug']:
+            self._meta_data['debug_history'].append(
+                debug_prepared_request(response.request))
 
     def post_configuration_setup(self):
         self._get_tmos_version()
@@ -138,7 +176,7 @@ class BaseManagement(PathElement):
         response = connect.get(base_uri)
         ##
 
-        ver = response.json()
+        ver = self._meta_data['json_codec'].decode(response)
         version = urlparse.parse_qs(
             urlparse.urlparse(ver['selfLink']).query)['ver'][0]
         self._meta_data['tmos_version'] = version
@@ -157,16 +195,50 @@ class BaseManagement(PathElement):
             self._meta_data['tmos_version'] = self._get_tmos_version()
         return self._meta_data['tmos_version']
 
+    @property
+    def retry_policy(self):
+        return self._meta_data['retry_policy']
+
+    @property
+    def cache(self):
+        return self._meta_data['cache']
+
+    @property
+    def json_codec(self):
+        return self._meta_data['json_codec']
+
+    @property
+    def metrics(self):
+        return self._meta_data['metrics']
+
+    def add_request_hook(self, after=None, before=None):
+        """Call ``after`` and ``before`` every HTTP request to the device.
+
+        Both are callables taking a :class:`f5.utils.metrics.RequestEvent`.
+        """
+        self.metrics.add_hook(after=after, before=before)
+
+    def remove_request_hook(self, hook):
+        self.metrics.remove_hook(hook)
+
     @property
     def debug(self):
+        if self._meta_data['debug_history'] is not None:
+            return self._meta_data['debug']
         return self.icrs.debug
 
     @debug.setter
     def debug(self, value):
-        self.icrs.debug = value
+        if self._meta_data['debug_history'] is not None:
+            if value in BOOLEANS:
+                self._meta_data['debug'] = value in BOOLEANS_TRUE
+        else:
+            self.icrs.debug = value
 
     @property
     def debug_output(self):
+        if self._meta_data['debug_history'] is not None:
+            return list(self._meta_data['debug_history'])
         result = []
         if self.icrs.debug_output:
             result += self.icrs.debug_output
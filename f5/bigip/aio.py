@@ -0,0 +1,184 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""asyncio interface to the BIG-IP® SDK (Python 3.5 and later).
+
+:class:`AsyncManagementRoot` exposes the same object tree as
+:class:`~f5.bigip.ManagementRoot`, but every method that talks to the device
+returns an awaitable and collections can be walked with ``async for``:
+
+.. code-block:: python
+
+    >>> import asyncio
+    >>> from f5.bigip.aio import AsyncManagementRoot
+    >>> async def main():
+    ...     mgmt = await AsyncManagementRoot.connect('10.0.0.1', 'admin', 'pw')
+    ...     pools = mgmt.tm.ltm.pools
+    ...     pool = await pools.pool.load(name='web', partition='Common')
+    ...     await pool.modify(description='updated')
+    ...     async for member in pool.members_s.iter_collection():
+    ...         print(member.name)
+    ...     loaded = await asyncio.gather(*[
+    ...         pools.pool.load(name=n, partition='Common') for n in names])
+
+The requests are performed by a bounded pool of worker threads sharing one
+connection pool of the same size, so any number of coroutines can have
+requests outstanding against a device while the number of threads and
+connections stays fixed at ``max_workers``.
+"""
+
+import asyncio
+import functools
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import BaseAdapter
+from requests.adapters import HTTPAdapter
+
+from f5.bigip import ManagementRoot
+from f5.bigip.resource import PathElement
+
+
+def _resize_connection_pool(session, maxsize):
+    """Resize the HTTPS pool of the adapter already mounted on ``session``.
+
+    The adapter is resized in place rather than replaced, so wrappers such
+    as a rate limiting adapter stay mounted.
+    """
+    adapter = session.get_adapter('https://')
+    while not isinstance(adapter, HTTPAdapter) and \
+            isinstance(getattr(adapter, 'adapter', None), BaseAdapter):
+        adapter = adapter.adapter
+    if not isinstance(adapter, HTTPAdapter):
+        return
+    adapter.poolmanager.clear()
+    for manager in adapter.proxy_manager.values():
+        manager.clear()
+    adapter.proxy_manager.clear()
+    adapter.init_poolmanager(adapter._pool_connections, maxsize, block=True)
+
+
+def _stop_async_iteration():
+    raise StopAsyncIteration  # NOQA
+
+
+class AsyncCollectionIterator(object):
+    """Async iterator over a (blocking) generator, advanced in the executor."""
+    def __init__(self, generator, executor, wrap):
+        self._generator = generator
+        self._executor = executor
+        self._wrap = wrap
+
+    def __aiter__(self):
+        return self
+
+    def _next(self):
+        try:
+            return self._wrap(next(self._generator))
+        except StopIteration:
+            _stop_async_iteration()
+
+    def __anext__(self):
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(self._executor, self._next)
+
+
+class AsyncProxy(object):
+    """Wrap a ``PathElement`` so that its device-facing methods are awaitable.
+
+    Attribute access is passed through to the wrapped object: child path
+    elements are returned wrapped in turn, plain values are returned as-is
+    and methods are returned as functions that run the method in the
+    executor and return an asyncio future of its (wrapped) result.
+    """
+    def __init__(self, target, executor):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_executor', executor)
+
+    @property
+    def sync(self):
+        """The wrapped, blocking object."""
+        return self._target
+
+    def _wrap(self, value):
+        if isinstance(value, PathElement):
+            return AsyncProxy(value, self._executor)
+        if isinstance(value, list):
+            return [self._wrap(v) for v in value]
+        return value
+
+    def _call(self, method, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        call = functools.partial(method, *args, **kwargs)
+        future = loop.run_in_executor(
+            self._executor, lambda: self._wrap(call()))
+        return future
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name == 'iter_collection':
+            def iter_collection(*args, **kwargs):
+                return AsyncCollectionIterator(
+                    value(*args, **kwargs), self._executor, self._wrap)
+            return iter_collection
+        if callable(value) and not isinstance(value, PathElement):
+            return functools.partial(self._call, value)
+        return self._wrap(value)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __delattr__(self, name):
+        delattr(self._target, name)
+
+    def __repr__(self):
+        return '<AsyncProxy %r>' % self._target
+
+
+class AsyncManagementRoot(AsyncProxy):
+    """An asyncio interface to a single BIG-IP.
+
+    Args:
+        mgmt_root (ManagementRoot): An already connected management root.
+        max_workers (int): Number of requests performed concurrently, which
+            is also the size of the HTTPS connection pool to the device.
+    """
+    def __init__(self, mgmt_root, max_workers=16):
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        super(AsyncManagementRoot, self).__init__(mgmt_root, executor)
+        _resize_connection_pool(
+            mgmt_root._meta_data['icr_session'].session, max_workers)
+
+    @classmethod
+    def connect(cls, hostname, username, password, max_workers=16,
+                **kwargs):
+        """Connect to a device without blocking the event loop.
+
+        Takes the same arguments as :class:`~f5.bigip.ManagementRoot`.
+
+        Returns:
+            asyncio.Future: resolves to an :class:`AsyncManagementRoot`.
+        """
+        loop = asyncio.get_event_loop()
+
+        def _connect():
+            mgmt = ManagementRoot(hostname, username, password, **kwargs)
+            return cls(mgmt, max_workers=max_workers)
+        return loop.run_in_executor(None, _connect)
+
+    def close(self, wait=True):
+        """Stop the worker threads once outstanding requests finish."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,252 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Queue many create/modify/delete operations and submit them together.
+
+A :class:`Batch` is bound to a single ``Collection`` and collects intents
+against the ``Resource`` type that collection holds.  On :meth:`Batch.submit`
+the intents are sent inside iControl REST transactions (one transaction per
+chunk), using the same :class:`~f5.bigip.contexts.TransactionContextManager`
+that callers would otherwise drive by hand.
+
+Example:
+
+.. code-block:: python
+
+    >>> members = pool.members_s
+    >>> batch = members.batch()
+    >>> for address in addresses:
+    ...     batch.create(partition='Common', name='%s:80' % address)
+    >>> batch.delete(partition='Common', name='10.0.0.1:80')
+    >>> for item in batch.submit(chunk_size=500):
+    ...     if not item.succeeded:
+    ...         print(item.action, item.kwargs, item.error)
+"""
+
+import logging
+import re
+
+from f5.bigip.contexts import TransactionContextManager
+from f5.sdk_exception import MissingRequiredReadParameter
+from f5.sdk_exception import TransactionSubmitException
+from f5.sdk_exception import UnsupportedOperation
+from icontrol.session import generate_bigip_uri
+from six import itervalues
+
+
+def _names(full_path, message):
+    """Whether ``message`` names ``full_path``, not just a longer path."""
+    pattern = r'(?<![\w/.-])%s(?![\w-]|\.\w)' % re.escape(full_path)
+    return re.search(pattern, message) is not None
+
+
+class BatchItem(object):
+    """A single queued intent and, after submission, its outcome.
+
+    Attributes:
+        action (str): One of ``create``, ``modify`` or ``delete``, or
+            ``unchanged`` for an entry of ``Collection.upsert`` that needed
+            no request.
+        kwargs (dict): The keyword arguments the intent was queued with.
+        result: The object returned by the underlying resource verb while
+            the transaction was being built, or ``None``.
+        error (Exception): The exception attributed to this item, or ``None``.
+    """
+    def __init__(self, action, kwargs):
+        self.action = action
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+
+    @property
+    def succeeded(self):
+        return self.error is None and self.result is not None
+
+    @property
+    def full_path(self):
+        partition = self.kwargs.get('partition', '')
+        sub_path = self.kwargs.get('subPath', '')
+        name = self.kwargs.get('name', '')
+        parts = [p for p in (partition, sub_path, name) if p]
+        return '/' + '/'.join(parts)
+
+    def __repr__(self):
+        return '<BatchItem %s %s>' % (self.action, self.full_path)
+
+
+class Batch(object):
+    """Collect create/modify/delete intents for one ``Collection``.
+
+    Use :meth:`~f5.bigip.resource.Collection.batch` rather than instantiating
+    this class directly.
+
+    Args:
+        collection (Collection): The collection whose resources are targeted.
+        resource_class (type): The ``Resource`` subclass to build.  Only
+            needed when the collection registers more than one kind.
+    """
+    def __init__(self, collection, resource_class=None):
+        self._collection = collection
+        self._resource_class = resource_class or \
+            self._get_resource_class(collection)
+        self.items = []
+
+    @staticmethod
+    def _get_resource_class(collection):
+        registry = collection._meta_data.get('attribute_registry', {})
+        classes = set(itervalues(registry))
+        if len(classes) != 1:
+            error_message = "%s registers %d resource kinds, pass " \
+                            "resource_class to choose one" \
+                            % (collection.__class__.__name__, len(classes))
+            raise UnsupportedOperation(error_message)
+        return classes.pop()
+
+    def __len__(self):
+        return len(self.items)
+
+    def _add(self, action, kwargs):
+        item = BatchItem(action, kwargs)
+        self.items.append(item)
+        return item
+
+    def create(self, **kwargs):
+        """Queue a ``create`` with the given creation parameters."""
+        return self._add('create', kwargs)
+
+    def modify(self, **kwargs):
+        """Queue a ``modify`` (PATCH) of the named resource.
+
+        ``name`` (and ``partition``/``subPath`` where applicable) identify the
+        resource, every other keyword argument is sent as the patch.
+        """
+        self._check_identifier(kwargs)
+        return self._add('modify', kwargs)
+
+    def delete(self, **kwargs):
+        """Queue a ``delete`` of the named resource."""
+        self._check_identifier(kwargs)
+        return self._add('delete', kwargs)
+
+    @staticmethod
+    def _check_identifier(kwargs):
+        if 'name' not in kwargs:
+            error_message = "Missing required params: ['name']"
+            raise MissingRequiredReadParameter(error_message)
+
+    def _stamp_out_resource(self, kwargs, collection):
+        resource = self._resource_class(collection)
+        uri = generate_bigip_uri(
+            collection._meta_data['uri'],
+            kwargs.pop('partition', ''),
+            kwargs.pop('name'),
+            kwargs.pop('subPath', ''),
+            ''
+        )
+        resource._meta_data['uri'] = uri + '/'
+        return resource
+
+    def _queue(self, item, collection):
+        kwargs = dict(item.kwargs)
+        if item.action == 'create':
+            resource = self._resource_class(collection)
+            return resource.create(**kwargs)
+        resource = self._stamp_out_resource(kwargs, collection)
+        if item.action == 'modify':
+            resource.modify(**kwargs)
+        else:
+            resource.delete()
+        return resource
+
+    def _chunks(self, chunk_size):
+        if not chunk_size:
+            yield self.items
+            return
+        for start in range(0, len(self.items), chunk_size):
+            yield self.items[start:start + chunk_size]
+
+    def _submit_chunk(self, chunk, validate_only):
+        bigip = self._collection._meta_data['bigip']
+        transaction = bigip.tm.transactions.transaction
+        queued = []
+        try:
+            context = TransactionContextManager(transaction,
+                                                validate_only=validate_only)
+            with context:
+                # Only this copy of the collection sends its requests in the
+                # transaction, other users of the session are unaffected.
+                collection = context.bind(self._collection)
+                for item in chunk:
+                    try:
+                        result = self._queue(item, collection)
+                    except Exception as ex:
+                        item.error = ex
+                        raise
+                    queued.append((item, result))
+        except TransactionSubmitException as ex:
+            self._attribute_commit_error(chunk, ex)
+            return
+        except Exception as ex:
+            logging.debug(ex)
+            for item in chunk:
+                if item.error is None:
+                    item.error = TransactionSubmitException(
+                        'Transaction not submitted: %s' % ex
+                    )
+            return
+        for item, result in queued:
+            item.result = result
+
+    @staticmethod
+    def _attribute_commit_error(chunk, error):
+        """Map a failed commit back onto the items that caused it.
+
+        The device reports a failed commit with a single message for the
+        whole transaction, which names the offending object.  Items whose
+        full path appears in that message, as a whole path rather than the
+        prefix of a longer one, get the error, the rest are marked as
+        rolled back.  If no item can be singled out, every item in the
+        chunk carries the error.
+        """
+        message = str(error)
+        culprits = [i for i in chunk
+                    if i.full_path != '/' and _names(i.full_path, message)]
+        for item in chunk:
+            if not culprits or item in culprits:
+                item.error = error
+            else:
+                item.error = TransactionSubmitException(
+                    'Rolled back because the transaction failed: %s'
+                    % message
+                )
+
+    def submit(self, chunk_size=None, validate_only=False):
+        """Send the queued intents to the device.
+
+        Args:
+            chunk_size (int): Maximum number of intents per transaction.
+                ``None`` sends everything in a single transaction.  Each
+                chunk commits (or fails) independently of the others.
+            validate_only (bool): Ask the device to validate, not commit.
+
+        Returns:
+            list: The :class:`BatchItem` objects, in the order they were
+            queued, with ``result`` and ``error`` filled in.
+        """
+        for chunk in self._chunks(chunk_size):
+            self._submit_chunk(chunk, validate_only)
+        return self.items
@@ -16,12 +16,60 @@
 #
 
 
-import copy
 import logging
 
 from f5.sdk_exception import TransactionSubmitException
 
 
+COORDINATION_HEADER = 'X-F5-REST-Coordination-Id'
+
+
+class TransactionSession(object):
+    """An iControl REST session that sends every request in a transaction.
+
+    Requests get the ``X-F5-REST-Coordination-Id`` header of the
+    transaction added to them, so the shared session, its headers and its
+    connection pool are used without being changed.  Everything other than
+    the HTTP verbs is delegated to the wrapped session.
+
+    Args:
+        icr (iControlRESTSession): The session to send requests through.
+        transaction_id: The ``transId`` of the transaction.
+    """
+    def __init__(self, icr, transaction_id):
+        self.icr = icr
+        self.transaction_headers = {COORDINATION_HEADER: str(transaction_id)}
+
+    def close(self):
+        """Send later requests outside of the transaction."""
+        self.transaction_headers = {}
+
+    def _send(self, verb, uri, **kwargs):
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.transaction_headers)
+        return getattr(self.icr, verb)(uri, headers=headers, **kwargs)
+
+    def delete(self, uri, **kwargs):
+        return self._send('delete', uri, **kwargs)
+
+    def get(self, uri, **kwargs):
+        return self._send('get', uri, **kwargs)
+
+    def patch(self, uri, **kwargs):
+        return self._send('patch', uri, **kwargs)
+
+    def post(self, uri, **kwargs):
+        return self._send('post', uri, **kwargs)
+
+    def put(self, uri, **kwargs):
+        return self._send('put', uri, **kwargs)
+
+    def __getattr__(self, name):
+        if name == 'icr':
+            raise AttributeError(name)
+        return getattr(self.icr, name)
+
+
 class TransactionContextManager(object):
     def __init__(self, transaction, validate_only=False):
         """Initialize a new Transaction context
@@ -41,18 +89,17 @@ class TransactionContextManager(object):
                 mgmt_root
             icr (iControlRESTSession): A reference to the dictionary
                 containing the iControl REST session
-            original_headers (dict): A deep copy of all the headers that were
-                originally part of the iControl REST session. A copy is needed
-                so that we can revert back to them after the transaction has
-                been committed, since the only way to commit the transaction
-                is to set the X-F5-REST-Coordination-Id to the value of the
-                transaction ID of the transaction.
+            session (TransactionSession): The session of the transaction,
+                wrapping ``icr``.
+            api (ManagementRoot): The copy of ``bigip`` returned by
+                ``__enter__``, whose requests belong to the transaction.
         """
         self.transaction = transaction
         self.validate_only = validate_only
         self.bigip = transaction._meta_data['bigip']
         self.icr = self.bigip._meta_data['icr_session']
-        self.original_headers = copy.deepcopy(self.icr.session.headers)
+        self.session = None
+        self.api = None
 
     def __enter__(self):
         """Begins a new transaction context
@@ -60,20 +107,29 @@ class TransactionContextManager(object):
         When a transaction begins, this method will automatically be called
         to set up the transaction.
 
-        Transaction IDs are automatically retrieved for you and the
-        appropriate headers are set so that operations in the Transaction
-        Context will reference the transaction.
-
-        Headers are preserved so that after you exit the transaction, you will
-        be able to use the API object as you normally would.
+        Transaction IDs are automatically retrieved for you.  The returned
+        API object is a copy of the ``ManagementRoot`` whose requests carry
+        the transaction's ``X-F5-REST-Coordination-Id`` header.  The shared
+        session is not changed, so the original ``ManagementRoot`` and
+        other transactions can be used at the same time, from any thread.
+        Objects obtained before the transaction can join it through
+        :meth:`bind`.  Once the context exits, the returned object sends
+        ordinary requests again.
         """
 
         self.transaction = self.transaction.create()
+        self.session = TransactionSession(self.icr,
+                                          self.transaction.transId)
+        self.api = self.bigip._rebind(icr_session=self.session)
+        return self.api
 
-        self.icr.session.headers.update({
-            'X-F5-REST-Coordination-Id': str(self.transaction.transId)
-        })
-        return self.bigip
+    def bind(self, resource):
+        """Return a copy of ``resource`` whose requests join the transaction.
+
+        :param resource: a ``Resource`` or ``Collection`` of the BIG-IP the
+            transaction was started on
+        """
+        return resource._rebind(self.api)
 
     def __exit__(self, exc_type, exc_value, exc_tb):
         """Commit a transaction upon Context Manager exit
@@ -90,7 +146,8 @@ class TransactionContextManager(object):
         :returns: void
         """
 
-        self.icr.session.headers = dict()
+        # Objects of the transaction used afterwards act as ordinary ones.
+        self.session.close()
         if exc_tb is None:
             try:
                 self.transaction.modify(state="VALIDATING",
@@ -98,6 +155,3 @@ class TransactionContextManager(object):
             except Exception as e:
                 logging.debug(e)
                 raise TransactionSubmitException(e)
-            finally:
-                self.icr.session.headers = self.original_headers
-        self.icr.session.headers = self.original_headers
@@ -0,0 +1,238 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Compact storage for the ``_meta_data`` of hydrated resources.
+
+Most of a resource's ``_meta_data`` is set by its class constructor and is
+the same for every instance of the class: the required parameters, the
+allowed commands, the attribute registry and so on.  Once a resource has
+been loaded, :func:`share_meta_data` moves those entries into a dict that
+is shared by every instance of the class holding the same values, leaving
+only the per-instance entries (``uri``, ``container``, ...) in the
+instance's own :class:`MetaData`.
+
+Sharing is copy-on-write: reading a shared list, set or dict through
+``_meta_data[key]`` first copies it into the instance, so code that mutates
+the value in place only ever changes its own copy.  Assigning or deleting a
+key also only affects the instance.
+"""
+
+import copy
+
+from six import iteritems
+from six.moves import intern
+
+
+SHARED_META_DATA_KEYS = frozenset((
+    'allowed_commands',
+    'allowed_lazy_attributes',
+    'attribute_registry',
+    'creation_uri_frag',
+    'creation_uri_qargs',
+    'exclusive_attributes',
+    'minimum_additional_parameters',
+    'minimum_version',
+    'object_has_stats',
+    'read_only_attributes',
+    'reduction_forcing_pairs',
+    'required_command_parameters',
+    'required_creation_parameters',
+    'required_json_kind',
+    'required_load_parameters',
+))
+
+# Distinct shared dicts kept per class; classes whose constructor produces
+# more variants than this are not shared any further.
+MAX_VARIANTS = 8
+
+# Strings at most this long are interned when a resource is hydrated.
+INTERN_MAX_LENGTH = 64
+
+_MUTABLE = (list, set, dict)
+_EMPTY = {}
+
+
+class MetaData(dict):
+    """A ``_meta_data`` dict backed by a shared dict of class invariants.
+
+    Entries stored in the instance take precedence over the shared ones.
+    """
+    __slots__ = ('shared',)
+
+    def __init__(self, local=(), shared=_EMPTY):
+        dict.__init__(self, local)
+        self.shared = shared
+
+    def __missing__(self, key):
+        value = self.shared[key]
+        if isinstance(value, _MUTABLE):
+            value = copy.copy(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def peek(self, key, default=None):
+        """Return the value for ``key`` without copying a shared value.
+
+        The result must not be mutated.
+        """
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        return self.shared.get(key, default)
+
+    def _detach(self):
+        for key, value in iteritems(self.shared):
+            if not dict.__contains__(self, key):
+                if isinstance(value, _MUTABLE):
+                    value = copy.copy(value)
+                dict.__setitem__(self, key, value)
+        self.shared = _EMPTY
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self.shared
+
+    def __delitem__(self, key):
+        if key in self.shared:
+            self._detach()
+        dict.__delitem__(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        if key in self.shared:
+            self._detach()
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        self._detach()
+        return dict.popitem(self)
+
+    def clear(self):
+        self.shared = _EMPTY
+        dict.clear(self)
+
+    def copy(self):
+        return MetaData(dict.items(self), self.shared)
+
+    def keys(self):
+        local = list(dict.keys(self))
+        return local + [k for k in self.shared if not dict.__contains__(
+            self, k)]
+
+    def values(self):
+        return [self.peek(k) for k in self.keys()]
+
+    def items(self):
+        return [(k, self.peek(k)) for k in self.keys()]
+
+    iterkeys = __iter__
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def __reduce__(self):
+        return MetaData, (dict(dict.items(self)), self.shared)
+
+
+def share_meta_data(resource):
+    """Move the class invariant ``_meta_data`` entries of ``resource`` into
+    a dict shared with the other instances of its class.
+    """
+    meta = resource._meta_data
+    if type(meta) is not dict:
+        return
+    shared = dict((k, meta[k]) for k in SHARED_META_DATA_KEYS if k in meta)
+    cls = type(resource)
+    variants = cls.__dict__.get('_shared_meta_data')
+    if variants is None:
+        variants = []
+        setattr(cls, '_shared_meta_data', variants)
+    for variant in variants:
+        if variant == shared:
+            shared = variant
+            break
+    else:
+        if len(variants) >= MAX_VARIANTS:
+            return
+        variants.append(shared)
+    local = dict((k, v) for k, v in iteritems(meta) if k not in shared)
+    resource._meta_data = MetaData(local, shared)
+
+
+def peek(meta, key, default=None):
+    """Read ``key`` of a ``_meta_data`` without copying a shared value."""
+    if isinstance(meta, MetaData):
+        return meta.peek(key, default)
+    return meta.get(key, default)
+
+
+def compact_values(rdict):
+    """Intern the short strings of a decoded JSON dict, in place.
+
+    Hydrated objects repeat the same short values (``kind``, partition,
+    states, monitor names, ...) many times over; interning them keeps one
+    copy of each.
+    """
+    for key, value in iteritems(rdict):
+        kind = type(value)
+        if kind is str:
+            if len(value) <= INTERN_MAX_LENGTH:
+                rdict[key] = intern(value)
+        elif kind is dict:
+            compact_values(value)
+        elif kind is list:
+            _compact_list(value)
+    return rdict
+
+
+def _compact_list(values):
+    for index, value in enumerate(values):
+        kind = type(value)
+        if kind is str:
+            if len(value) <= INTERN_MAX_LENGTH:
+                values[index] = intern(value)
+        elif kind is dict:
+            compact_values(value)
+        elif kind is list:
+            _compact_list(value)
@@ -27,11 +27,13 @@ except ImportError:
                    "orderreddict external dependency installed.")
         raise exc(message)
 
-from distutils.version import LooseVersion
 from six import iteritems
 
+import functools
 import logging
+import re
 
+from f5.bigip.metadata import peek
 from f5.sdk_exception import EmptyContent
 from f5.sdk_exception import InvalidCommand
 from f5.sdk_exception import LazyAttributesRequired
@@ -39,6 +41,7 @@ from f5.sdk_exception import MissingHttpHeader
 from f5.sdk_exception import UnsupportedMethod
 from f5.sdk_exception import UnsupportedTmosVersion
 from f5.sdk_exception import UtilError
+from f5.utils.metrics import endpoint_template
 
 
 class ToDictMixin(object):
@@ -54,6 +57,12 @@ class ToDictMixin(object):
         result = self._traverse_dict(self.__dict__)
         return result
 
+    def _attributes_to_dict(self, names):
+        """Like ``to_dict`` but only for the attributes in ``names``."""
+        ToDictMixin.traversed = {}
+        return self._traverse_dict(
+            dict((name, self.__dict__[name]) for name in names))
+
     def _traverse_dict(self, instance_dict):
         output = {}
 
@@ -84,6 +93,30 @@ class ToDictMixin(object):
             return value
 
 
+_LAZY_ATTRIBUTE_MAPS = {}
+_VERSION_COMPONENT = re.compile(r'(\d+|[a-z]+|\.)', re.IGNORECASE)
+_VERSION_KEYS = {}
+
+
+def version_key(version):
+    """Return a tuple that orders TMOS versions like ``LooseVersion`` does.
+
+    Numeric components compare as numbers and sort before alphabetic ones,
+    so the keys are comparable on Python 3 as well.  Results are memoized
+    because the same handful of versions is compared on every lazy
+    attribute access.
+    """
+    key = _VERSION_KEYS.get(version)
+    if key is None:
+        key = []
+        for part in _VERSION_COMPONENT.split(str(version)):
+            if not part or part == '.':
+                continue
+            key.append((0, int(part)) if part.isdigit() else (1, part))
+        key = _VERSION_KEYS.setdefault(version, tuple(key))
+    return key
+
+
 class LazyAttributeMixin(object):
     """Allow attributes to be created lazily based on the allowed values"""
     def __getattr__(container, name):
@@ -95,8 +128,8 @@ class LazyAttributeMixin(object):
             raise LazyAttributesRequired(error_message)
 
         # ensure the requested attr is present
-        attr_names = container.transform_attr_names()
-        if name not in attr_names:
+        lazy_attribute = container._lazy_attribute_map().get(name)
+        if lazy_attribute is None:
             error_message = "'%s' object has no attribute '%s'"\
                 % (container.__class__, name)
             raise AttributeError(error_message)
@@ -105,26 +138,43 @@ class LazyAttributeMixin(object):
         # Issue #112 -- Only call setattr here if the lazy attribute
         # is NOT a `Resource`.  This should allow for only 1 ltm attribute
         # but many nat attributes just like the BIGIP device.
-        for lazy_attribute in container._meta_data['allowed_lazy_attributes']:
-            if name == lazy_attribute.__name__.lower():
-                attribute = lazy_attribute(container)
-                bases = [base.__name__ for base in lazy_attribute.__bases__]
-                # Doing version check per each resource
-                container._check_supported_versions(container, attribute)
-                if 'Resource' not in bases:
-                    setattr(container, name, attribute)
-                return attribute
+        attribute = lazy_attribute(container)
+        # Doing version check per each resource
+        container._check_supported_versions(container, attribute)
+        if not _is_resource_class(lazy_attribute):
+            setattr(container, name, attribute)
+        return attribute
+
+    def _lazy_attribute_map(self):
+        """Map lowercased names of the allowed lazy attributes to classes.
+
+        The map is shared by every container with the same allowed classes
+        and remembered in ``_meta_data`` until the allowed list is replaced
+        or resized.
+        """
+        allowed = peek(self._meta_data, 'allowed_lazy_attributes')
+        cached = self._meta_data.get('lazy_attribute_map')
+        if cached is None or cached[0] is not allowed \
+                or cached[1] != len(allowed):
+            key = tuple(allowed)
+            mapping = _LAZY_ATTRIBUTE_MAPS.get(key)
+            if mapping is None:
+                mapping = {}
+                for lazy_attribute in allowed:
+                    mapping.setdefault(
+                        lazy_attribute.__name__.lower(), lazy_attribute)
+                mapping = _LAZY_ATTRIBUTE_MAPS.setdefault(key, mapping)
+            cached = (allowed, len(allowed), mapping)
+            self._meta_data['lazy_attribute_map'] = cached
+        return cached[2]
 
     def transform_attr_names(self):
-        attr_names = \
-            [la.__name__.lower() for la in
-             self._meta_data['allowed_lazy_attributes']]
-        return attr_names
+        return list(self._lazy_attribute_map())
 
     def _check_supported_versions(self, container, attribute):
         tmos_v = container._meta_data['bigip'].tmos_version
         minimum = attribute._meta_data['minimum_version']
-        if LooseVersion(tmos_v) < LooseVersion(minimum):
+        if version_key(tmos_v) < version_key(minimum):
             error = "There was an attempt to access resource: \n{}\n which " \
                     "is not implemented in the device's TMOS version: {}. " \
                     "The minimum TMOS version in which this resource *is* " \
@@ -144,7 +194,7 @@ class LazyAttributeMixin(object):
                 UnsupportedTmosVersion
         """
         tmos_v = container._meta_data['bigip'].tmos_version
-        if LooseVersion(tmos_v) < LooseVersion(method_version):
+        if version_key(tmos_v) < version_key(method_version):
             error = "There was an attempt to use a method which " \
                     "has not been implemented or supported " \
                     "in the device's TMOS version: %s. " \
@@ -153,6 +203,18 @@ class LazyAttributeMixin(object):
             raise UnsupportedTmosVersion(error)
 
 
+_RESOURCE_CLASSES = {}
+
+
+def _is_resource_class(cls):
+    """True if a direct base of ``cls`` is named ``Resource``."""
+    result = _RESOURCE_CLASSES.get(cls)
+    if result is None:
+        result = _RESOURCE_CLASSES.setdefault(
+            cls, 'Resource' in [base.__name__ for base in cls.__bases__])
+    return result
+
+
 class ExclusiveAttributesMixin(object):
     """Overrides ``__setattr__`` to remove exclusive attrs from the object."""
     def __setattr__(self, key, value):
@@ -164,7 +226,7 @@ class ExclusiveAttributesMixin(object):
         """
         if '_meta_data' in self.__dict__:
             # Sometimes this is called prior to full object construction
-            for attr_set in self._meta_data['exclusive_attributes']:
+            for attr_set in peek(self._meta_data, 'exclusive_attributes', ()):
                 if key in attr_set:
                     new_set = set(attr_set) - set([key])
                     [self.__dict__.pop(n, '') for n in new_set]
@@ -252,62 +314,104 @@ class CommandExecutionMixin(object):
         kwargs['command'] = command
         self._check_exclusive_parameters(**kwargs)
         requests_params = self._handle_requests_params(kwargs)
-        session = self._meta_data['bigip']._meta_data['icr_session']
-        response = session.post(
-            self._meta_data['uri'], json=kwargs, **requests_params)
+        response = self._request(
+            'post', self._meta_data['uri'], json=kwargs, **requests_params)
         new_instance = self._stamp_out_core()
-        new_instance._local_update(response.json())
+        new_instance._local_update(self._decode(response))
         if 'commandResult' in new_instance.__dict__:
             new_instance._check_command_result()
 
         return new_instance
 
 
+def _transfer_verb(resource, method):
+    """Session verb for the files below ``resource``, see _request.
+
+    The requests are retried and recorded by the ``RequestMetrics`` like
+    any other, under a single endpoint template for all the files.
+    """
+    endpoint = endpoint_template(resource._meta_data['uri']) + '/{name}'
+    return functools.partial(resource._request, method, use_cache=False,
+                             endpoint=endpoint)
+
+
+def _upload(resource, fileinterface, kwargs):
+    """Upload for FileUploadMixin and AsmFileMixin, see ChunkedUpload."""
+    # Imported here so that importing f5.bigip does not need the futures
+    # backport on Python 2
+    from f5.bigip.transfer import ChunkedUpload
+
+    requests_params = resource._handle_requests_params(kwargs)
+    chunk_size = kwargs.pop('chunk_size', None)
+    upload = ChunkedUpload(
+        _transfer_verb(resource, 'post'), resource.file_bound_uri,
+        fileinterface,
+        size=kwargs.pop('size', None),
+        chunk_size=chunk_size or ChunkedUpload.DEFAULT_CHUNK_SIZE,
+        adaptive=kwargs.pop('adaptive', chunk_size is None),
+        max_in_flight=kwargs.pop('max_in_flight', 1),
+        progress=kwargs.pop('progress', None),
+        requests_params=requests_params
+    )
+    upload.run()
+
+
 class FileUploadMixin(object):
     def _upload_file(self, filepathname, **kwargs):
         with open(filepathname, 'rb') as fileobj:
             self._upload(fileobj, **kwargs)
 
     def _upload(self, fileinterface, **kwargs):
-        size = len(fileinterface.read())
-        fileinterface.seek(0)
-        requests_params = self._handle_requests_params(kwargs)
-        session = self._meta_data['icr_session']
-        chunk_size = kwargs.pop('chunk_size', 512 * 1024)
-        start = 0
-        while True:
-            file_slice = fileinterface.read(chunk_size)
-            if not file_slice:
-                break
+        """Upload a file-like object or an iterable of bytes in chunks.
 
-            current_bytes = len(file_slice)
-            if current_bytes < chunk_size:
-                end = size
-            else:
-                end = start + current_bytes
-            headers = {
-                'Content-Range': '%s-%s/%s' % (start, end - 1, size),
-                'Content-Type': 'application/octet-stream'}
-            data = {
-                'data': file_slice,
-                'headers': headers,
-                'verify': False
-            }
-            logging.debug(data)
-            requests_params.update(data)
-            session.post(self.file_bound_uri,
-                         **requests_params)
-            start += current_bytes
+        The data is streamed one chunk at a time.  Pass ``size`` when
+        ``fileinterface`` is a generator or another non-seekable source.
+
+        :param chunk_size: int -- bytes per request.  When it is not given
+                           the chunk size adapts to the measured throughput.
+        :param adaptive: bool -- adapt the chunk size even if one is given
+        :param max_in_flight: int -- requests sent concurrently
+        :param progress: callable -- called as ``progress(sent, total)``
+                         after every chunk
+        """
+        _upload(self, fileinterface, kwargs)
 
 
 class FileDownloadMixin(object):
     def _download_file(self, src, dest, **kwargs):
-        with open(dest, 'wb') as fileobj:
-            self._download(src, fileobj, **kwargs)
+        """Download ``src`` from the file transfer worker to ``dest``.
+
+        The ranges of the file are written straight into their place in
+        ``dest``.  The ranges already written are tracked in
+        ``dest + '.part.json'``, so that after a failure, calling this again
+        fetches only what is missing.
+
+        :param chunk_size: int -- bytes requested per range
+        :param max_workers: int -- ranges downloaded concurrently
+        :param checksum: str -- hex digest the finished file must match
+        :param checksum_algorithm: str -- ``hashlib`` name, ``'sha256'``
+                                   by default (use ``'md5'`` with the
+                                   checksums published for BIG-IP images)
+        :param resume: bool -- set to False to ignore an earlier attempt
+        :raises: FileDownloadChecksumMismatch
+        """
+        from f5.bigip.transfer import RangedDownload
+
+        requests_params = self._handle_requests_params(kwargs)
+        download = RangedDownload(
+            _transfer_verb(self, 'get'), self._meta_data['uri'] + src, dest,
+            chunk_size=kwargs.pop('chunk_size', 512 * 1024),
+            max_workers=kwargs.pop('max_workers', 1),
+            requests_params=requests_params,
+            checksum=kwargs.pop('checksum', None),
+            checksum_algorithm=kwargs.pop('checksum_algorithm', 'sha256'),
+            resume=kwargs.pop('resume', True)
+        )
+        download.run()
 
     def _download(self, src, fileinterface, **kwargs):
         requests_params = self._handle_requests_params(kwargs)
-        session = self._meta_data['icr_session']
+        get = _transfer_verb(self, 'get')
         chunk_size = kwargs.pop('chunk_size', 512 * 1024)
         self.file_bound_uri = self._meta_data['uri'] + src
         start = 0
@@ -328,8 +432,7 @@ class FileDownloadMixin(object):
             }
             logging.debug(data)
             requests_params.update(data)
-            response = session.get(self.file_bound_uri,
-                                   **requests_params)
+            response = get(self.file_bound_uri, **requests_params)
             if response.status_code == 200:
                 # If the size is zero, then this is the first time through
                 # the loop and we don't want to write data because we
@@ -399,33 +502,7 @@ class AsmFileMixin(object):
             self._upload(fileobj, **kwargs)
 
     def _upload(self, fileinterface, **kwargs):
-        size = len(fileinterface.read())
-        fileinterface.seek(0)
-        requests_params = self._handle_requests_params(kwargs)
-        session = self._meta_data['icr_session']
-        chunk_size = kwargs.pop('chunk_size', 512 * 1024)
-        start = 0
-        while True:
-            file_slice = fileinterface.read(chunk_size)
-            if not file_slice:
-                break
-
-            current_bytes = len(file_slice)
-            if current_bytes < chunk_size:
-                end = size
-            else:
-                end = start + current_bytes
-            headers = {
-                'Content-Range': '%s-%s/%s' % (start, end - 1, size),
-                'Content-Type': 'application/octet-stream'}
-            data = {'data': file_slice,
-                    'headers': headers,
-                    'verify': False}
-            logging.debug(data)
-            requests_params.update(data)
-            session.post(self.file_bound_uri,
-                         **requests_params)
-            start += current_bytes
+        _upload(self, fileinterface, kwargs)
 
 
 class DeviceMixin(object):
@@ -447,23 +524,31 @@ class DeviceMixin(object):
 class CheckExistenceMixin(object):
     '''In 11.6.0 some items return True on exists whether they exist or not'''
 
-    def _check_existence_by_collection(self, container, item_name):
+    def _check_existence_by_collection(self, container, item_name,
+                                       partition=None):
         '''Check existnce of item based on get collection call.
 
-        :param collection: container object -- capable of get_collection()
+        Only the names of the items are requested from the device.
+
+        :param collection: container object -- capable of query()
         :param item_name: str -- name of item to search for in collection
+        :param partition: str -- only search this partition
         '''
 
-        coll = container.get_collection()
-        for item in coll:
-            if item.name == item_name:
-                return True
-        return False
+        return self._find_in_collection(
+            container, item_name, partition, ('name',)) is not None
 
-    def _return_object(self, container, item_name):
+    def _return_object(self, container, item_name, partition=None):
         """Helper method to retrieve the object"""
-        coll = container.get_collection()
-        for item in coll:
+        return self._find_in_collection(container, item_name, partition)
+
+    @staticmethod
+    def _find_in_collection(container, item_name, partition=None, fields=()):
+        query = container.query().select(*fields)
+        if partition is not None:
+            query = query.where(partition=partition)
+        # The device may not honour every filter, so match the name here.
+        for item in query.get():
             if item.name == item_name:
                 return item
 
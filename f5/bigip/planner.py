@@ -0,0 +1,305 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Apply a large change set as a pipeline of small transactions.
+
+A single transaction holding thousands of commands is slow to commit, can
+time out, and when it fails the device names one culprit for the lot.  A
+:class:`TransactionPlanner` collects the changes, possibly on several
+collections, and splits them into transactions of at most ``chunk_size``
+commands:
+
+* A change may depend on earlier ones.  Changes are grouped in stages so
+  that every change is in a later stage than the changes it depends on.
+* The transactions of a stage are built and validated (``validateOnly``)
+  concurrently, then committed one after the other, in order.
+* Every change reports its own ``status``, and the ``commandId`` and
+  ``evalOrder`` the device gave it, from the transaction's commands.
+
+A change whose transaction fails is not applied, and neither are the
+changes that depend on it.  The other transactions still commit.
+
+Example:
+
+.. code-block:: python
+
+    >>> plan = mgmt.tm.transactions.plan(chunk_size=500)
+    >>> nodes = [plan.create(mgmt.tm.ltm.nodes, partition='Common',
+    ...                      name=address, address=address)
+    ...          for address in addresses]
+    >>> plan.create(mgmt.tm.ltm.pools, partition='Common', name='web',
+    ...             members=['%s:80' % a for a in addresses],
+    ...             depends_on=nodes)
+    >>> for item in plan.submit():
+    ...     if not item.succeeded:
+    ...         print(item, item.status, item.error)
+"""
+
+import logging
+
+from f5.bigip.batch import Batch
+from f5.bigip.batch import BatchItem
+from f5.bigip.contexts import TransactionContextManager
+from f5.sdk_exception import InvalidTransactionPlan
+from f5.sdk_exception import TransactionSubmitException
+
+
+PENDING = 'pending'
+VALIDATED = 'validated'
+COMMITTED = 'committed'
+FAILED = 'failed'
+ROLLED_BACK = 'rolled_back'
+SKIPPED = 'skipped'
+
+
+class PlannedChange(BatchItem):
+    """A change queued on a :class:`TransactionPlanner`.
+
+    Attributes:
+        collection (Collection): The collection the change applies to.
+        depends_on (list): The changes that must be applied first.
+        stage (int): The stage the change is applied in, from 0.
+        status (str): ``pending``, then ``validated`` and ``committed``,
+            or ``failed``, ``rolled_back`` (another command of the
+            transaction failed) or ``skipped`` (a change it depends on was
+            not applied).
+        command (dict): The ``tm:transaction:commandsstate`` of the change,
+            with its ``commandId`` and ``evalOrder``, once queued.
+        transaction_id: The ``transId`` of its transaction, once queued.
+    """
+    def __init__(self, action, kwargs, collection, depends_on, batch):
+        super(PlannedChange, self).__init__(action, kwargs)
+        self.collection = collection
+        self.depends_on = list(depends_on)
+        self.stage = 1 + max([d.stage for d in self.depends_on] or [-1])
+        self.status = PENDING
+        self.command = None
+        self.transaction_id = None
+        self._batch = batch
+
+    @property
+    def succeeded(self):
+        return self.status == COMMITTED
+
+
+class TransactionPlanner(object):
+    """Split a large change set into chunked, validated transactions.
+
+    Use :meth:`~f5.bigip.tm.transaction.Transactions.plan` rather than
+    instantiating this class directly.
+
+    Args:
+        transactions (Transactions): The transactions collection of the
+            BIG-IP® the changes are applied to.
+        chunk_size (int): Maximum number of commands per transaction.
+        max_workers (int): Number of transactions built and validated at
+            the same time.
+    """
+    def __init__(self, transactions, chunk_size=500, max_workers=4):
+        if chunk_size < 1 or max_workers < 1:
+            raise InvalidTransactionPlan(
+                'chunk_size and max_workers must be at least 1')
+        self._transactions = transactions
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.items = []
+        self._batches = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def _add(self, action, collection, kwargs):
+        resource_class = kwargs.pop('resource_class', None)
+        depends_on = kwargs.pop('depends_on', ())
+        if isinstance(depends_on, PlannedChange):
+            depends_on = [depends_on]
+        known = set(id(item) for item in self.items)
+        for dependency in depends_on:
+            if id(dependency) not in known:
+                raise InvalidTransactionPlan(
+                    'A change can only depend on changes already in the '
+                    'plan, got %r' % (dependency,))
+        key = (id(collection), resource_class)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = Batch(collection, resource_class=resource_class)
+            self._batches[key] = batch
+        if action != 'create':
+            batch._check_identifier(kwargs)
+        item = PlannedChange(action, kwargs, collection, depends_on, batch)
+        self.items.append(item)
+        return item
+
+    def create(self, collection, **kwargs):
+        r"""Plan a ``create`` in ``collection``.
+
+        Args:
+            collection (Collection): Where to create the resource.
+            resource_class (type): As for ``Collection.batch``.
+            depends_on (list): Changes that must be applied first.
+            \*\*kwargs (dict): The creation parameters.
+        """
+        return self._add('create', collection, kwargs)
+
+    def modify(self, collection, **kwargs):
+        """Plan a ``modify`` (PATCH) of a resource of ``collection``.
+
+        Takes the same arguments as :meth:`create`; ``name``, with
+        ``partition`` and ``subPath`` where needed, identifies the resource.
+        """
+        return self._add('modify', collection, kwargs)
+
+    def delete(self, collection, **kwargs):
+        """Plan a ``delete`` of a resource of ``collection``."""
+        return self._add('delete', collection, kwargs)
+
+    def stages(self):
+        """Return the chunks of the plan, grouped by stage.
+
+        :returns: list of stages, each a list of chunks of changes
+        """
+        by_stage = {}
+        for item in self.items:
+            by_stage.setdefault(item.stage, []).append(item)
+        result = []
+        for stage in sorted(by_stage):
+            items = by_stage[stage]
+            result.append([items[i:i + self.chunk_size]
+                           for i in range(0, len(items), self.chunk_size)])
+        return result
+
+    def submit(self, validate_only=False):
+        """Validate and commit the plan.
+
+        Args:
+            validate_only (bool): Only validate the transactions, do not
+                commit any of them.  Stages after the first are validated
+                against the current configuration, without the changes of
+                the stages before them.
+
+        Returns:
+            list: The :class:`PlannedChange` objects, in the order they were
+            planned, with ``status``, ``result`` and ``error`` filled in.
+        """
+        # Imported here so that importing f5.bigip does not need the
+        # futures backport on Python 2
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for chunks in self.stages():
+                chunks = [self._skip_orphans(chunk) for chunk in chunks]
+                chunks = [chunk for chunk in chunks if chunk]
+                prepared = list(executor.map(self._prepare, chunks))
+                for chunk, context in zip(chunks, prepared):
+                    if context is not None and not validate_only:
+                        self._commit(chunk, context)
+        finally:
+            executor.shutdown(wait=True)
+        return self.items
+
+    @staticmethod
+    def _skip_orphans(chunk):
+        ready = []
+        for item in chunk:
+            failed = [d for d in item.depends_on
+                      if d.status not in (COMMITTED, VALIDATED)]
+            if failed:
+                item.status = SKIPPED
+                item.error = TransactionSubmitException(
+                    'Not submitted, depends on %r which was not applied' %
+                    (failed[0],))
+            else:
+                ready.append(item)
+        return ready
+
+    def _prepare(self, chunk):
+        """Queue ``chunk`` in a new transaction and validate it.
+
+        :returns: the transaction context, or None if the chunk failed
+        """
+        transaction = self._transactions.transaction
+        context = TransactionContextManager(transaction, validate_only=True)
+        queued = []
+        culprit = None
+        try:
+            with context:
+                for item in chunk:
+                    item.transaction_id = context.transaction.transId
+                    culprit = item
+                    result = item._batch._queue(
+                        item, context.bind(item.collection))
+                    queued.append((item, result))
+                culprit = None
+                self._record_commands(chunk, context.transaction)
+        except TransactionSubmitException as ex:
+            # The device refused to validate the transaction.
+            self._fail(chunk, ex)
+            return None
+        except Exception as ex:
+            logging.debug(ex)
+            self._fail(chunk, ex, culprit)
+            return None
+        for item, result in queued:
+            item.result = result
+            item.status = VALIDATED
+        return context
+
+    @staticmethod
+    def _record_commands(chunk, transaction):
+        """Attach the device's command entries to the changes of a chunk.
+
+        Commands are listed in the order they were queued, which is the
+        order of the chunk.
+        """
+        commands = transaction.commands_s.get_collection(as_dicts=True)
+        commands = sorted(commands, key=lambda c: c.get('evalOrder', 0))
+        if len(commands) != len(chunk):
+            return
+        for item, command in zip(chunk, commands):
+            item.command = command
+
+    def _commit(self, chunk, context):
+        try:
+            context.transaction.modify(state='VALIDATING',
+                                       validateOnly=False)
+        except Exception as ex:
+            logging.debug(ex)
+            self._fail(chunk, TransactionSubmitException(ex))
+            return
+        for item in chunk:
+            item.status = COMMITTED
+
+    @staticmethod
+    def _fail(chunk, error, culprit=None):
+        """Record the failure of a chunk on each of its changes.
+
+        A failed validation or commit is attributed to the changes its
+        message names, as for a ``Batch``.  Otherwise ``culprit``, if any,
+        carries the error and the rest of the chunk is rolled back.
+        """
+        if isinstance(error, TransactionSubmitException) and culprit is None:
+            Batch._attribute_commit_error(chunk, error)
+        else:
+            for item in chunk:
+                if item is culprit or culprit is None:
+                    item.error = error
+                else:
+                    item.error = TransactionSubmitException(
+                        'Transaction not submitted: %s' % error)
+        for item in chunk:
+            item.status = FAILED if item.error is error else ROLLED_BACK
@@ -0,0 +1,206 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Build OData queries for reading a ``Collection``.
+
+A :class:`CollectionQuery` is made with ``Collection.query()`` and turned
+into the ``$filter``, ``$select``, ``$top`` and ``$skip`` query parameters
+of iControl REST, so that the device, not the SDK, does the narrowing down.
+Each builder method returns a new query, so a query can be kept and
+refined:
+
+.. code-block:: python
+
+    >>> common = mgmt.tm.ltm.pools.query().where(partition='Common')
+    >>> common.select('name', 'monitor').top(500).params()
+    {'$filter': 'partition eq Common', '$select': 'name,monitor', '$top': 500}
+    >>> for pool in common.select('name').iter(page_size=1000):
+    ...     print(pool.name)
+
+.. note::
+    Which attributes can be filtered on depends on the endpoint and the
+    BIG-IP® version; ``partition`` is supported everywhere under
+    ``/mgmt/tm``.  Check results that must be exact on the client as well.
+"""
+
+import re
+
+from f5.sdk_exception import InvalidQuery
+from six import integer_types
+from six import iteritems
+from six import string_types
+
+
+_BARE_VALUE = re.compile(r'^[\w.:/~@-]+$')
+
+
+def _literal(value):
+    """Format ``value`` as an OData literal."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, integer_types):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, string_types):
+        if _BARE_VALUE.match(value):
+            return value
+        return "'%s'" % value.replace("'", "''")
+    raise InvalidQuery('Cannot filter on a value of type %s: %r' % (
+        type(value).__name__, value))
+
+
+def _field(name):
+    """Device name of a keyword argument, as ``_check_for_python_keywords``."""
+    if name.endswith('_') and not name.startswith('_'):
+        return name[:-1]
+    return name
+
+
+class CollectionQuery(object):
+    """An immutable OData query on one ``Collection``.
+
+    Args:
+        collection (Collection): The collection to read.
+    """
+
+    def __init__(self, collection, filters=(), fields=(), top=None,
+                 skip=None):
+        self.collection = collection
+        self.filters = tuple(filters)
+        self.fields = tuple(fields)
+        self._top = top
+        self._skip = skip
+
+    def _copy(self, **changes):
+        state = dict(filters=self.filters, fields=self.fields,
+                     top=self._top, skip=self._skip)
+        state.update(changes)
+        return CollectionQuery(self.collection, **state)
+
+    def where(self, *expressions, **fields):
+        """Keep only the items matching every condition.
+
+        Keyword arguments are equality tests, with a trailing ``_``
+        removed from names such as ``partition_`` as for ``create``.
+        Positional arguments are raw OData expressions, such as
+        ``"name ne 'test'"``, for anything else.  All conditions are joined
+        with ``and``, including those of earlier calls.
+        """
+        filters = list(self.filters)
+        for expression in expressions:
+            if not isinstance(expression, string_types) or \
+                    not expression.strip():
+                raise InvalidQuery('Expected an OData expression, got %r' %
+                                   (expression,))
+            filters.append(expression)
+        for name, value in sorted(iteritems(fields)):
+            filters.append('%s eq %s' % (_field(name), _literal(value)))
+        return self._copy(filters=filters)
+
+    def select(self, *fields):
+        """Only request these attributes of each item."""
+        selected = list(self.fields)
+        selected.extend(_field(f) for f in fields if _field(f) not in selected)
+        return self._copy(fields=selected)
+
+    def top(self, count):
+        """Return at most ``count`` items."""
+        return self._copy(top=self._count('top', count))
+
+    def skip(self, count):
+        """Start after the first ``count`` matching items."""
+        return self._copy(skip=self._count('skip', count))
+
+    @staticmethod
+    def _count(name, count):
+        if isinstance(count, bool) or not isinstance(count, integer_types) \
+                or count < 0:
+            raise InvalidQuery('%s needs a non-negative integer, got %r' % (
+                name, count))
+        return count
+
+    def params(self):
+        """Return the query as a dict of requests ``params``."""
+        params = {}
+        if self.filters:
+            params['$filter'] = ' and '.join(self.filters)
+        if self.fields:
+            params['$select'] = ','.join(self.fields)
+        if self._top is not None:
+            params['$top'] = self._top
+        if self._skip:
+            params['$skip'] = self._skip
+        return params
+
+    def _requests_params(self, params):
+        return {'requests_params': {'params': params}}
+
+    def get(self, as_dicts=False):
+        """Run the query in a single request.
+
+        Args:
+            as_dicts (bool): As for ``Collection.get_collection``.
+
+        :returns: list of Python ``Resource`` objects, or of dicts
+        """
+        params = self.params()
+        if self.fields and not as_dicts:
+            params['$select'] = ','.join(
+                list(self.fields) + [f for f in ('kind', 'selfLink')
+                                     if f not in self.fields])
+        kwargs = self._requests_params(params)
+        if as_dicts:
+            kwargs['as_dicts'] = True
+        return self.collection.get_collection(**kwargs)
+
+    def first(self, as_dicts=False):
+        """Return the first matching item, or None."""
+        items = self.top(1).get(as_dicts=as_dicts)
+        return items[0] if items else None
+
+    def iter(self, page_size=500, as_dicts=False):
+        """Run the query a page at a time, as ``Collection.iter_collection``.
+
+        The ``top`` and ``skip`` of the query bound the items yielded
+        across all pages.
+        """
+        params = self.params()
+        for key in ('$select', '$top', '$skip'):
+            params.pop(key, None)
+        fields = list(self.fields)
+        remaining = self._top
+        if remaining is not None:
+            if remaining == 0:
+                return
+            page_size = min(page_size, remaining)
+        items = self.collection.iter_collection(
+            page_size=page_size, skip=self._skip or 0, select=fields or None,
+            as_dicts=as_dicts, **self._requests_params(params))
+        for item in items:
+            yield item
+            if remaining is not None:
+                remaining -= 1
+                if not remaining:
+                    return
+
+    def __iter__(self):
+        return self.iter()
+
+    def __repr__(self):
+        return '<CollectionQuery %s %r>' % (
+            self.collection._meta_data.get('uri'), self.params())
@@ -98,15 +98,21 @@ except ImportError:
                    "orderreddict external dependency installed.")
         raise exc(message)
 import copy
+import functools
 import keyword
 import re
-import time
 import tokenize
 try:
     import urlparse
 except ImportError:
     from urllib import parse as urlparse
 
+from f5.bigip.batch import Batch
+from f5.bigip.batch import BatchItem
+from f5.bigip.metadata import compact_values
+from f5.bigip.metadata import MetaData
+from f5.bigip.metadata import share_meta_data
+from f5.bigip.query import CollectionQuery
 from f5.bigip.mixins import LazyAttributeMixin
 from f5.bigip.mixins import ToDictMixin
 from f5.sdk_exception import AttemptedMutationOfReadOnly
@@ -114,6 +120,7 @@ from f5.sdk_exception import BooleansToReduceHaveSameValue
 from f5.sdk_exception import DeviceProvidesIncompatibleKey
 from f5.sdk_exception import ExclusiveAttributesPresent
 from f5.sdk_exception import GenerationMismatch
+from f5.sdk_exception import InvalidConflictPolicy
 from f5.sdk_exception import InvalidForceType
 from f5.sdk_exception import InvalidResource
 from f5.sdk_exception import KindTypeMismatch
@@ -126,12 +133,35 @@ from f5.sdk_exception import UnregisteredKind
 from f5.sdk_exception import UnsupportedMethod
 from f5.sdk_exception import UnsupportedOperation
 from f5.sdk_exception import URICreationCollision
+from f5.utils.cache import ResourceCache
+from f5.utils.json_codec import JSONCodec
+from f5.utils.json_codec import STREAM_CHUNK_SIZE
+from f5.utils.metrics import endpoint_template
+from f5.utils.metrics import RequestMetrics
+from f5.utils.retry import RetryPolicy
 from icontrol.exceptions import iControlUnexpectedHTTPError
-from requests.exceptions import ConnectionError
 from requests.exceptions import HTTPError
+from six import get_unbound_function
 from six import iteritems
 from six import iterkeys
 from six import itervalues
+from six import string_types
+
+
+# Used by resources whose root object does not carry its own retry policy
+DEFAULT_RETRY_POLICY = RetryPolicy()
+DEFAULT_JSON_CODEC = JSONCodec()
+
+# What a write with force=False does when the object changed on the device.
+CONFLICT_POLICIES = ('fail', 'merge', 'last_writer_wins')
+
+# Keyword arguments of upsert that identify the object rather than set it.
+IDENTITY_KEYS = ('name', 'partition', 'subPath')
+
+_MISSING = object()
+
+# Streamed collection items are hydrated in batches of this many.
+STREAM_HYDRATE_BATCH = 500
 
 
 def _missing_required_parameters(rqset, **kwargs):
@@ -149,6 +179,131 @@ def _missing_required_parameters(rqset, **kwargs):
         return list(required_minus_received)
 
 
+def _merge_query_params(params, extra):
+    """Add extra query parameters to requests ``params``.
+
+    ``params`` is allowed to be either a dict or an already encoded query
+    string, as users commonly pass OData queries as strings.
+
+    ::returns dict or str
+    """
+    if isinstance(params, dict):
+        merged = dict(params)
+        merged.update(extra)
+        return merged
+    extra_qs = '&'.join('%s=%s' % (k, v) for k, v in sorted(iteritems(extra)))
+    if not params:
+        return extra_qs
+    return params + '&' + extra_qs
+
+
+def _split_self_link(link):
+    """Split a ``selfLink`` as ``urlsplit`` would, without the netloc.
+
+    ::returns tuple (scheme, path, query, fragment) or None
+    """
+    if not isinstance(link, string_types):
+        return None
+    scheme, sep, rest = link.partition('://')
+    if not sep:
+        return None
+    rest, _, frag = rest.partition('#')
+    rest, _, query = rest.partition('?')
+    slash = rest.find('/')
+    if slash < 0:
+        return None
+    return scheme.lower(), rest[slash:], query, frag
+
+
+def _hydrates_by_default(cls):
+    """True if ``cls`` hydrates collection items the way Resource does."""
+    for name in ('_check_keys', '_local_update', '_activate_URI'):
+        method = getattr(cls, name, None)
+        if method is None:
+            return False
+        default = get_unbound_function(getattr(Resource, name))
+        if get_unbound_function(method) is not default:
+            return False
+    return True
+
+
+def _upsert_fields(desired):
+    """Device attribute names to ``$select`` when comparing ``desired``."""
+    fields = set()
+    for attributes in desired:
+        for key in attributes:
+            if key.endswith('_') and keyword.iskeyword(key[:-1]):
+                key = key[:-1]
+            fields.add(key)
+    fields.update(IDENTITY_KEYS + ('fullPath',))
+    return sorted(fields)
+
+
+def _differences(current, desired):
+    """The items of ``desired`` whose value differs in ``current``."""
+    return dict((k, v) for k, v in iteritems(desired)
+                if current.get(k, _MISSING) != v)
+
+
+def _fingerprint(value):
+    return hash(repr(value))
+
+
+def _loaded_fingerprints(attrs):
+    """Fingerprint the list and dict attributes of a freshly loaded object.
+
+    Assignments are tracked by ``ResourceBase.__setattr__``; these catch
+    values that are changed in place, such as a list of records appended to.
+    ``*Reference`` links to subcollections are maintained by the device and
+    are skipped.
+    """
+    fingerprints = []
+    for key, value in iteritems(attrs):
+        kind = type(value)
+        if (kind is list or kind is dict) and key[:1] != '_' \
+                and not key.endswith('Reference'):
+            fingerprints.append((key, _fingerprint(value)))
+    return tuple(fingerprints)
+
+
+class _HydrationTemplate(object):
+    """Per-instance ``_meta_data`` of a hydrated item, minus its ``uri``."""
+
+    def __init__(self, instance, base_uri, local, shared):
+        self.instance = instance
+        self.base_uri = base_uri
+        self.local = local
+        self.mutable = [k for k, v in iteritems(local)
+                        if isinstance(v, (list, set, dict))]
+        self.shared = shared
+
+    @classmethod
+    def from_instance(cls, instance, base_uri):
+        meta = instance._meta_data
+        if not isinstance(meta, MetaData):
+            return None
+        local = dict((k, v) for k, v in dict.items(meta)
+                     if k not in ('uri', 'lazy_attribute_map'))
+        return cls(instance, base_uri, local, meta.shared)
+
+    def build(self, resource_class, item, path):
+        meta = dict(self.local)
+        for key in self.mutable:
+            meta[key] = copy.copy(meta[key])
+        if not path.endswith('/'):
+            path += '/'
+        meta['uri'] = self.base_uri + path
+        item['_meta_data'] = MetaData(meta, self.shared)
+        # The instance is built directly, so bypass the change tracking
+        # done by ResourceBase.__setattr__.
+        instance = resource_class.__new__(resource_class)
+        object.__setattr__(instance, '__dict__', item)
+        object.__setattr__(instance, '_dirty_attributes', None)
+        object.__setattr__(instance, '_loaded_fingerprints',
+                           _loaded_fingerprints(item))
+        return instance
+
+
 class PathElement(LazyAttributeMixin):
     """Base class to represent a URI path element that does not contain data.
 
@@ -182,6 +337,32 @@ class PathElement(LazyAttributeMixin):
         # this means that all or at least 1 need to be present during create
         self._meta_data['minimum_additional_parameters'] = set()
 
+    def _rebind(self, bigip=None, icr_session=None):
+        """Return a shallow copy of this object that talks through ``bigip``.
+
+        With no ``bigip`` the copy is a root of its own (as a
+        ``ManagementRoot`` is) that uses ``icr_session``.  Lazily created
+        children are not copied, they are created again under the copy, so
+        the original object and its children are left untouched.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        for cls in type(self).__mro__:
+            for slot in cls.__dict__.get('__slots__', ()):
+                if hasattr(self, slot):
+                    object.__setattr__(clone, slot, getattr(self, slot))
+        state = dict((k, v) for k, v in iteritems(self.__dict__)
+                     if not isinstance(v, PathElement))
+        meta = self._meta_data.copy()
+        if bigip is None:
+            bigip = clone
+        else:
+            icr_session = bigip._meta_data['icr_session']
+        meta['bigip'] = bigip
+        meta['icr_session'] = icr_session
+        state['_meta_data'] = meta
+        object.__setattr__(clone, '__dict__', state)
+        return clone
+
     def _set_meta_data_uri(self):
         base_uri = self._get_base_uri()
         endpoint = base_uri.replace('_', '-')
@@ -261,6 +442,86 @@ class PathElement(LazyAttributeMixin):
         """
         return self.__class__.__name__.lower()
 
+    def _get_retry_policy(self):
+        policy = self._meta_data['bigip']._meta_data.get('retry_policy')
+        if isinstance(policy, RetryPolicy):
+            return policy
+        return DEFAULT_RETRY_POLICY
+
+    def _get_cache(self):
+        cache = self._meta_data['bigip']._meta_data.get('cache')
+        if isinstance(cache, ResourceCache):
+            return cache
+        return None
+
+    def _get_json_codec(self):
+        codec = self._meta_data['bigip']._meta_data.get('json_codec')
+        if isinstance(codec, JSONCodec):
+            return codec
+        return DEFAULT_JSON_CODEC
+
+    def _get_metrics(self):
+        metrics = self._meta_data['bigip']._meta_data.get('metrics')
+        if isinstance(metrics, RequestMetrics):
+            return metrics
+        return None
+
+    def _endpoint_template(self, uri, kwargs):
+        """Endpoint template of a request for ``RequestMetrics``."""
+        if kwargs.get('uri_as_parts') and kwargs.get('name'):
+            # The session appends the object's path to the URI.
+            return endpoint_template(uri) + '/{name}' + \
+                kwargs.get('suffix', '').rstrip('/')
+        return endpoint_template(uri, self.__dict__.get('name'))
+
+    def _decode(self, response):
+        """Decode a JSON response with the ``ManagementRoot``'s codec."""
+        return self._get_json_codec().decode(response)
+
+    def _request(self, method, uri, use_cache=True, endpoint=None,
+                 **kwargs):
+        """Send an HTTP request for this object through the icr_session.
+
+        The request is retried according to the ``RetryPolicy`` of the
+        ``ManagementRoot`` this object belongs to.  If that ``ManagementRoot``
+        has a ``ResourceCache``, GETs are served through it and any other
+        verb invalidates the entries it affects.  A ``json`` body is encoded
+        with the ``ManagementRoot``'s JSON codec.  Requests that reach the
+        session are recorded by the ``ManagementRoot``'s ``RequestMetrics``.
+
+        :param method: str -- name of the session verb, e.g. ``'get'``
+        :param uri: str -- URI passed to the session verb
+        :param use_cache: bool -- set to False for a GET that must reach
+                          the device
+        :param endpoint: str -- endpoint template recorded by the
+                         ``RequestMetrics``, derived from ``uri`` if None
+        :returns: the response of the session verb
+        """
+        session = self._meta_data['bigip']._meta_data['icr_session']
+        codec = self._get_json_codec()
+        if kwargs.get('json') is not None and not codec.is_stdlib:
+            kwargs['data'] = codec.dumps(kwargs.pop('json'))
+        metrics = self._get_metrics()
+        if metrics is None:
+            send = functools.partial(self._get_retry_policy().call, method,
+                                     getattr(session, method))
+        else:
+            send = functools.partial(
+                metrics.measure, method,
+                endpoint or self._endpoint_template(uri, kwargs),
+                self._get_retry_policy().call, getattr(session, method))
+        cache = self._get_cache()
+        if cache is None:
+            return send(uri, **kwargs)
+        if method == 'get':
+            if not use_cache:
+                return send(uri, **kwargs)
+            return cache.get(send, uri, **kwargs)
+        try:
+            return send(uri, **kwargs)
+        finally:
+            cache.invalidate(uri, method=method, **kwargs)
+
     def _check_command_parameters(self, **kwargs):
         """Params given to exec_cmd should satisfy required params.
 
@@ -278,16 +539,28 @@ class PathElement(LazyAttributeMixin):
             raise InvalidForceType("force parameter must be type bool")
         return force
 
+    def _check_conflict_arg(self, conflict):
+        if conflict not in CONFLICT_POLICIES:
+            raise InvalidConflictPolicy(
+                "conflict parameter must be one of %s" % (CONFLICT_POLICIES,))
+        return conflict
+
     def _check_generation(self):
         """Check that the generation on the BIG-IP® matches the object
 
         This will do a get to the objects URI and check that the generation
         returned in the JSON matches the one the object currently has.  If it
         does not it will raise the `GenerationMismatch` exception.
+
+        Under ``/mgmt/tm/`` only the generation is requested
+        (``$select=generation``), not the whole object.
         """
-        session = self._meta_data['bigip']._meta_data['icr_session']
-        response = session.get(self._meta_data['uri'])
-        current_gen = response.json().get('generation', None)
+        uri = self._meta_data['uri']
+        kwargs = {}
+        if '/mgmt/tm/' in uri:
+            kwargs['params'] = {'$select': 'generation'}
+        response = self._request('get', uri, use_cache=False, **kwargs)
+        current_gen = self._decode(response).get('generation', None)
         if current_gen is not None and current_gen != self.generation:
             error_message = ("The generation of the object on the BigIP "
                              + "(" + str(current_gen) + ")"
@@ -295,6 +568,30 @@ class PathElement(LazyAttributeMixin):
                              + "(" + str(self.generation) + ")")
             raise GenerationMismatch(error_message)
 
+    def _guard_generation(self, conflict):
+        """Check the generation before a write made with ``force=False``.
+
+        A mismatch is handled according to the ``conflict`` policy:
+
+        * ``'fail'`` raises ``GenerationMismatch``.
+        * ``'merge'`` refreshes the object and re-applies the attributes
+          changed locally since it was loaded, so the write carries the
+          other writer's changes as well as ours.
+        * ``'last_writer_wins'`` goes ahead with the write.
+
+        The refreshed object of a merge is not checked again.
+        """
+        try:
+            self._check_generation()
+        except GenerationMismatch:
+            if conflict == 'fail':
+                raise
+            if conflict == 'merge':
+                changes = self._attributes_to_dict(self._changed_attributes())
+                self._refresh()
+                for name, value in iteritems(changes):
+                    setattr(self, name, value)
+
     def _handle_requests_params(self, kwargs):
         """Validate parameters that will be passed to the requests verbs.
 
@@ -385,6 +682,40 @@ class ResourceBase(PathElement, ToDictMixin):
     that represents objects in a hierarchical relationship similar to the
     device's uri path hierarchy.
     """
+    # Change tracking for save(), kept out of __dict__ (which is replaced
+    # wholesale by _local_update) and out of _meta_data.
+    __slots__ = ('_dirty_attributes', '_loaded_fingerprints')
+
+    def __init__(self, container):
+        self._dirty_attributes = None
+        self._loaded_fingerprints = ()
+        super(ResourceBase, self).__init__(container)
+
+    def __setattr__(self, name, value):
+        """Record assignments to device attributes for :meth:`save`."""
+        super(ResourceBase, self).__setattr__(name, value)
+        if name[:1] == '_' or isinstance(value, PathElement):
+            return
+        dirty = self._dirty_attributes
+        if dirty is None:
+            self._dirty_attributes = set([name])
+        else:
+            dirty.add(name)
+
+    def _changed_attributes(self):
+        """Names of the attributes changed since the last load or refresh.
+
+        Attributes assigned to, and list or dict attributes whose contents
+        were changed in place, are both reported.
+        """
+        attrs = self.__dict__
+        changed = set(self._dirty_attributes or ())
+        for name, fingerprint in self._loaded_fingerprints:
+            if name in attrs and _fingerprint(attrs[name]) != fingerprint:
+                changed.add(name)
+        return set(name for name in changed if name in attrs
+                   and not isinstance(attrs[name], PathElement))
+
     def _modify(self, **patch):
         """Wrapped with modify, override in a subclass to customize."""
 
@@ -402,19 +733,10 @@ class ResourceBase(PathElement, ToDictMixin):
 
         patch = self._prepare_request_json(patch)
 
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                response = session.patch(patch_uri, json=patch, **requests_params)
-                break
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        response = self._request('patch', patch_uri, json=patch,
+                                 **requests_params)
 
-        self._local_update(response.json())
+        self._local_update(self._decode(response))
 
     def modify(self, **patch):
         """Modify the configuration of the resource on device based on patch
@@ -500,7 +822,7 @@ class ResourceBase(PathElement, ToDictMixin):
             error_message = "Response contains key '_meta_data' which is "\
                 "incompatible with this API!!\n Response json: %r" % rdict
             raise DeviceProvidesIncompatibleKey(error_message)
-        for x in rdict:
+        for x in list(rdict):
             if not re.match(tokenize.Name, x):
                 error_message = "Device provided %r which is disallowed"\
                     " because it's not a valid Python 2.7 identifier." % x
@@ -523,14 +845,23 @@ class ResourceBase(PathElement, ToDictMixin):
 
         :param rdict: response attributes derived from server JSON
         """
-        sanitized = self._check_keys(rdict)
+        sanitized = compact_values(self._check_keys(rdict))
         temp_meta = self._meta_data
         self.__dict__ = sanitized
         self._meta_data = temp_meta
+        self._dirty_attributes = None
+        # Inline sub-collection items only hold for the read that sent
+        # them, an expand=True read stashes them again after this update.
+        self._meta_data.pop('expanded_items', None)
+        if not isinstance(self, (Collection, OrganizingCollection)):
+            self._loaded_fingerprints = _loaded_fingerprints(sanitized)
 
     def _update(self, **kwargs):
         """wrapped with update, override that in a subclass to customize"""
 
+        if kwargs.pop('minimal', False):
+            return self._save(**kwargs)
+
         requests_params, update_uri, session, read_only = \
             self._prepare_put_or_patch(kwargs)
 
@@ -546,9 +877,10 @@ class ResourceBase(PathElement, ToDictMixin):
         # Get the current state of the object on BIG-IP® and check the
         # generation Use pop here because we don't want force in the data_dict
         force = self._check_force_arg(kwargs.pop('force', True))
+        conflict = self._check_conflict_arg(kwargs.pop('conflict', 'fail'))
         if not force:
             # generation has a known server-side error
-            self._check_generation()
+            self._guard_generation(conflict)
 
         kwargs = self._check_for_boolean_pair_reduction(kwargs)
 
@@ -583,27 +915,19 @@ class ResourceBase(PathElement, ToDictMixin):
         data_dict.update(kwargs)
         data_dict = self._prepare_request_json(data_dict)
 
-        # Handles ConnectionAborted errors
+        # Connection errors are retried by the RetryPolicy
         #
         # @see https://github.com/F5Networks/f5-ansible/issues/317
         # @see https://github.com/requests/requests/issues/2364
-        for i in range(0, 30):
-            try:
-                response = session.put(update_uri, json=data_dict, **requests_params)
-                self._meta_data = temp_meta
-                self._local_update(response.json())
-                break
-            except iControlUnexpectedHTTPError:
-                response = session.get(update_uri, **requests_params)
-                self._meta_data = temp_meta
-                self._local_update(response.json())
-                raise
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        self._meta_data = temp_meta
+        try:
+            response = self._request('put', update_uri, json=data_dict,
+                                     **requests_params)
+        except iControlUnexpectedHTTPError:
+            response = self._request('get', update_uri, **requests_params)
+            self._local_update(self._decode(response))
+            raise
+        self._local_update(self._decode(response))
 
     def update(self, **kwargs):
         """Update the configuration of the resource on the BIG-IP®.
@@ -624,14 +948,64 @@ class ResourceBase(PathElement, ToDictMixin):
                 If kwargs has a ``requests_params`` key the corresponding dict will
                 be passed to the underlying ``requests.session.put`` method where it will
                 be handled according to that API.
+
+                ``minimal=True`` sends only the changed attributes with
+                PATCH, see :meth:`save`.
+
+                ``force=False`` checks the generation of the object on the
+                device first; ``conflict`` chooses what to do if it changed,
+                as for :meth:`save`.
         """
         # Need to implement checking for valid params here.
         self._update(**kwargs)
 
+    def _save(self, **kwargs):
+        """wrapped with save, override that in a subclass to customize"""
+
+        requests_params = self._handle_requests_params(kwargs)
+        force = self._check_force_arg(kwargs.pop('force', True))
+        conflict = self._check_conflict_arg(kwargs.pop('conflict', 'fail'))
+        read_only = self._meta_data.get('read_only_attributes', [])
+        read_only_mutations = [attr for attr in read_only if attr in kwargs]
+        if read_only_mutations:
+            msg = 'Attempted to mutate read-only attribute(s): %s' \
+                  % read_only_mutations
+            raise AttemptedMutationOfReadOnly(msg)
+
+        if not kwargs and not self._changed_attributes():
+            return
+        if not force:
+            self._guard_generation(conflict)
+        changed = self._changed_attributes().difference(read_only)
+        patch = self._attributes_to_dict(changed)
+        patch.update(kwargs)
+        if requests_params:
+            patch['requests_params'] = requests_params
+        self.modify(**patch)
+
+    def save(self, **kwargs):
+        """Send the attributes changed since the last load to the BIG-IP®.
+
+        Only the attributes assigned to, or changed in place, since the
+        object was last loaded, refreshed or updated are sent, using HTTP
+        PATCH, so the request is as small as the change.  Nothing is sent
+        if nothing changed.
+
+        Args:
+            kwargs (dict): Further attributes to change, as for
+                :meth:`update`.  With ``force=False`` the request is only
+                sent if the generation of the object on the device still
+                matches the one loaded.  If it does not, ``conflict``
+                decides what happens: ``'fail'`` (the default) raises
+                ``GenerationMismatch``, ``'merge'`` reloads the object and
+                re-applies the local changes and ``'last_writer_wins'``
+                sends the changes anyway.
+        """
+        self._save(**kwargs)
+
     def _refresh(self, **kwargs):
         """wrapped by `refresh` override that in a subclass to customize"""
         requests_params = self._handle_requests_params(kwargs)
-        refresh_session = self._meta_data['bigip']._meta_data['icr_session']
 
         if self._meta_data['uri'].endswith('/stats/'):
             # Slicing off the trailing slash here for Stats enpoints because
@@ -643,19 +1017,9 @@ class ResourceBase(PathElement, ToDictMixin):
         else:
             uri = self._meta_data['uri']
 
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                response = refresh_session.get(uri, **requests_params)
-                break
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        response = self._request('get', uri, **requests_params)
 
-        self._local_update(response.json())
+        self._local_update(self._decode(response))
 
     def refresh(self, **kwargs):
         """Use this to make the device resource be represented by self.
@@ -705,7 +1069,7 @@ class ResourceBase(PathElement, ToDictMixin):
         '''Generate a new self, which is an instance of the self.'''
         new_instance = self._stamp_out_core()
         # Post-process the response
-        new_instance._local_update(response.json())
+        new_instance._local_update(self._decode(response))
 
         # Allow for example files, which are KindTypeMismatches
         if hasattr(new_instance, 'selfLink'):
@@ -760,6 +1124,25 @@ class ResourceBase(PathElement, ToDictMixin):
             config_dict.pop(key2)
         return config_dict
 
+    def _stash_expanded_items(self):
+        """Move sub-collection items sent inline into ``_meta_data``.
+
+        With ``expandSubcollections=true`` the device sends the items of
+        each sub-collection in the ``items`` of its ``*Reference``.  They
+        are kept, by sub-collection path, for the next ``get_collection``
+        of that sub-collection, and the reference is left as an unexpanded
+        response would have it.
+        """
+        expanded = {}
+        for name, value in iteritems(self.__dict__):
+            if name.endswith('Reference') and isinstance(value, dict) and \
+                    isinstance(value.get('items'), list) and \
+                    'link' in value:
+                path = urlparse.urlsplit(value['link']).path
+                expanded[path.rstrip('/') + '/'] = value.pop('items')
+        if expanded:
+            self._meta_data['expanded_items'] = expanded
+
     @property
     def attrs(self):
         no_meta_dict = {k: v for k, v in iteritems(self.__dict__)
@@ -804,7 +1187,7 @@ class Collection(ResourceBase):
     """
 
     def get_collection(self, **kwargs):
-        """Get an iterator of Python ``Resource`` objects that represent URIs.
+        r"""Get an iterator of Python ``Resource`` objects that represent URIs.
 
         The returned objects are Pythonic `Resource`s that map to the most
         recently `refreshed` state of uris-resources published by the device.
@@ -816,30 +1199,353 @@ class Collection(ResourceBase):
             This method implies a single REST transaction with the
             Collection subclass URI.
 
+        Args:
+            select (list): Only request these attributes of each item from
+                the device (sent as ``$select``).  ``kind`` and ``selfLink``
+                are added when Resource objects are to be built.
+            as_dicts (bool): Return the items as plain dicts, exactly as
+                the device sent them, without building ``Resource`` objects.
+                This is much cheaper for read-only consumers.
+            stream (bool): Parse the response as it arrives and build each
+                item as soon as it is parsed, instead of decoding the whole
+                body first.  This bounds the memory used for very large
+                collections.  The response bypasses the ``ResourceCache``.
+            expand (bool): Ask the device to send the items of each
+                item's sub-collections inline (``expandSubcollections``).
+                The first ``get_collection()`` of such a sub-collection,
+                for example ``pool.members_s``, then builds its objects
+                from those items without another request.
+            \*\*kwargs (dict): If kwargs has a ``requests_params`` key the
+                corresponding dict will be passed to the underlying
+                ``requests.session.get`` method.
+
         :raises: UnregisteredKind
         :returns: list of reference dicts and Python ``Resource`` objects
         """
-        list_of_contents = []
-        self.refresh(**kwargs)
-        if 'items' in self.__dict__:
-            for item in self.items:
-                # It's possible to have non-"kind" JSON returned. We just
-                # append the corresponding dict. PostProcessing is the caller's
-                # responsibility.
-                if 'kind' not in item:
-                    list_of_contents.append(item)
-                    continue
-                kind = item['kind']
-                if kind in self._meta_data['attribute_registry']:
-                    # If it has a kind, it must be registered.
-                    instance = self._meta_data['attribute_registry'][kind](self)
-                    instance._local_update(item)
-                    instance._activate_URI(instance.selfLink)
-                    list_of_contents.append(instance)
-                else:
-                    error_message = '%r is not registered!' % kind
-                    raise UnregisteredKind(error_message)
-        return list_of_contents
+        select = kwargs.pop('select', None)
+        as_dicts = kwargs.pop('as_dicts', False)
+        stream = kwargs.pop('stream', False)
+        expand = kwargs.pop('expand', False)
+        if not (select or stream or expand or kwargs):
+            items = self._take_expanded_items()
+            if items is not None:
+                if as_dicts:
+                    return items
+                return self._expand_items(self._hydrate_items(items))
+        if select:
+            self._add_select_param(kwargs, select, as_dicts)
+        if expand:
+            self._add_query_params(kwargs, {'expandSubcollections': 'true'})
+        if stream:
+            result = self._stream_collection(as_dicts, **kwargs)
+        elif as_dicts:
+            return self._get_collection_items(**kwargs)
+        else:
+            self.refresh(**kwargs)
+            if 'items' not in self.__dict__:
+                return []
+            # refresh already compacted the items along with the collection
+            result = self._hydrate_items(self.items, compact=False)
+        if expand and not as_dicts:
+            self._expand_items(result)
+        return result
+
+    @classmethod
+    def _add_select_param(cls, kwargs, select, as_dicts):
+        fields = list(select)
+        if not as_dicts:
+            fields += [f for f in ('kind', 'selfLink') if f not in fields]
+        cls._add_query_params(kwargs, {'$select': ','.join(fields)})
+
+    @staticmethod
+    def _add_query_params(kwargs, extra):
+        requests_params = dict(kwargs.get('requests_params', {}))
+        kwargs['requests_params'] = requests_params
+        requests_params['params'] = _merge_query_params(
+            requests_params.get('params', {}), extra)
+
+    def _take_expanded_items(self):
+        """Return the items of this collection sent inline with its
+        container, if it was read with ``expand=True``, only once.
+        """
+        expanded = self._meta_data['container']._meta_data.get(
+            'expanded_items')
+        if not isinstance(expanded, dict):
+            return None
+        path = urlparse.urlsplit(self._meta_data['uri']).path
+        return expanded.pop(path, None)
+
+    @staticmethod
+    def _expand_items(instances):
+        for instance in instances:
+            if isinstance(instance, ResourceBase):
+                instance._stash_expanded_items()
+        return instances
+
+    def _get_collection_items(self, **kwargs):
+        """Fetch the raw ``items`` of the collection without hydrating them."""
+        requests_params = self._handle_requests_params(kwargs)
+        response = self._request('get', self._meta_data['uri'], **requests_params)
+        return self._decode(response).get('items', [])
+
+    def _stream_collection(self, as_dicts, **kwargs):
+        """Fetch the collection, building items while the body streams in.
+
+        The top level attributes of the collection other than ``items``
+        update the collection itself, as :meth:`refresh` would.
+        """
+        requests_params = self._handle_requests_params(kwargs)
+        response = self._request('get', self._meta_data['uri'],
+                                 use_cache=False, stream=True,
+                                 **requests_params)
+        try:
+            stream = self._get_json_codec().iter_items(
+                response.iter_content(STREAM_CHUNK_SIZE))
+            if as_dicts:
+                return list(stream)
+            result = []
+            batch = []
+            for item in stream:
+                batch.append(item)
+                if len(batch) == STREAM_HYDRATE_BATCH:
+                    result.extend(self._hydrate_items(batch))
+                    batch = []
+            result.extend(self._hydrate_items(batch))
+        finally:
+            response.close()
+        self._local_update(stream.extra)
+        return result
+
+    def _instantiate_item(self, item):
+        """Build the Python object for a single collection item."""
+        # It's possible to have non-"kind" JSON returned. We just
+        # return the corresponding dict. PostProcessing is the caller's
+        # responsibility.
+        if 'kind' not in item:
+            return item
+        kind = item['kind']
+        if kind in self._meta_data['attribute_registry']:
+            # If it has a kind, it must be registered.
+            instance = self._meta_data['attribute_registry'][kind](self)
+            instance._local_update(item)
+            instance._activate_URI(instance.selfLink)
+            return instance
+        error_message = '%r is not registered!' % kind
+        raise UnregisteredKind(error_message)
+
+    def _hydrate_items(self, items, compact=True):
+        """Build the Python objects for a list of collection items.
+
+        This gives the same result as calling :meth:`_instantiate_item` on
+        each item, but the first item of each kind is used as a template:
+        the constructor, the lazy attribute list, the shared ``_meta_data``
+        and the base of the URI are worked out once and reused for the
+        other items, whose ``selfLink`` only needs its path cut out.  Keys
+        already validated by ``_check_keys`` are not checked again.
+
+        Kinds whose class customizes hydration, and items with an unusual
+        ``selfLink``, go through :meth:`_instantiate_item`.
+        """
+        registry = self._meta_data['attribute_registry']
+        netloc = urlparse.urlsplit(
+            str(self._meta_data['bigip']._meta_data['uri'])).netloc
+        templates = {}
+        eligible = {}
+        valid_keys = set()
+        result = []
+        for item in items:
+            kind = item.get('kind')
+            cls = eligible.get(kind)
+            if cls is None and kind not in eligible:
+                cls = registry.get(kind) if kind is not None else None
+                if cls is not None and not _hydrates_by_default(cls):
+                    cls = None
+                eligible[kind] = cls
+            link = _split_self_link(item.get('selfLink'))
+            if link is None or cls is None:
+                result.append(self._instantiate_item(item))
+                continue
+            scheme, path, query, frag = link
+            key = (kind, scheme, query, frag)
+            if key not in templates:
+                instance = self._instantiate_item(item)
+                templates[key] = _HydrationTemplate.from_instance(
+                    instance, scheme + '://' + netloc)
+                valid_keys.update(instance.__dict__)
+                valid_keys.discard('_meta_data')
+                result.append(instance)
+                continue
+            template = templates[key]
+            if template is None:
+                result.append(self._instantiate_item(item))
+                continue
+            if not valid_keys.issuperset(item):
+                item = template.instance._check_keys(item)
+                valid_keys.update(item)
+            if compact:
+                compact_values(item)
+            result.append(template.build(cls, item, path))
+        return result
+
+    def iter_collection(self, page_size=500, skip=0, **kwargs):
+        r"""Lazily iterate over the collection, one page at a time.
+
+        Unlike :meth:`get_collection` this does not hold the whole collection
+        in memory.  The collection is requested in pages of ``page_size``
+        items using the ``$top`` and ``$skip`` query parameters, and items
+        are yielded as each page arrives.  When the device answers with a
+        ``nextLink`` that link is followed instead, otherwise paging stops
+        at ``totalPages`` or on the first short page.
+
+        .. note::
+            Each page is a separate REST transaction, so the collection can
+            change on the device between pages.
+
+        Args:
+            page_size (int): Number of items requested per page.
+            skip (int): Number of items to skip before the first page.
+            select (list): As for :meth:`get_collection`.
+            as_dicts (bool): As for :meth:`get_collection`.
+            \*\*kwargs (dict): If kwargs has a ``requests_params`` key the
+                corresponding dict will be passed to the underlying
+                ``requests.session.get`` method.  Its ``params`` may be
+                a dict or a query string, e.g. ``'$filter=partition eq Common'``.
+
+        :raises: UnregisteredKind
+        :returns: generator of reference dicts and Python ``Resource`` objects
+        """
+        select = kwargs.pop('select', None)
+        as_dicts = kwargs.pop('as_dicts', False)
+        if select:
+            self._add_select_param(kwargs, select, as_dicts)
+        requests_params = self._handle_requests_params(kwargs)
+        base_params = requests_params.pop('params', {})
+        netloc = urlparse.urlsplit(
+            str(self._meta_data['bigip']._meta_data['uri'])).netloc
+        uri = self._meta_data['uri']
+        params = _merge_query_params(
+            base_params, {'$top': page_size, '$skip': skip})
+        while True:
+            response = self._request('get', uri, params=params, **requests_params)
+            page = self._decode(response)
+            items = page.get('items', [])
+            if as_dicts:
+                for item in items:
+                    yield item
+            else:
+                for instance in self._hydrate_items(items):
+                    yield instance
+            if not items:
+                break
+            skip += len(items)
+            if page.get('nextLink'):
+                (scheme, domain, path, qarg, frag) = \
+                    urlparse.urlsplit(page['nextLink'])
+                next_uri = urlparse.urlunsplit(
+                    (scheme, netloc, path, qarg, ''))
+                if next_uri == uri:
+                    # A page that links to itself would be fetched forever
+                    break
+                uri = next_uri
+                params = None
+                continue
+            if 'totalPages' in page and 'pageIndex' in page:
+                if page['pageIndex'] >= page['totalPages']:
+                    break
+            elif len(items) < page_size:
+                break
+            params = _merge_query_params(
+                base_params, {'$top': page_size, '$skip': skip})
+
+    def query(self):
+        """Start a :class:`~f5.bigip.query.CollectionQuery` on this collection.
+
+        The query is sent as OData ``$filter``, ``$select``, ``$top`` and
+        ``$skip`` parameters, so the device only returns what was asked for.
+
+        Example:
+            >>> pools = mgmt.tm.ltm.pools
+            >>> pools.query().where(partition='Common').select(
+            ...     'name', 'monitor').top(500).get()
+
+        Returns:
+            CollectionQuery: a query matching the whole collection.
+        """
+        return CollectionQuery(self)
+
+    def batch(self, resource_class=None):
+        """Start a :class:`~f5.bigip.batch.Batch` of operations on this collection.
+
+        Intents queued on the returned object are sent together, inside
+        iControl REST transactions, when ``submit`` is called on it.  This
+        avoids one round trip per ``create``, ``modify`` or ``delete`` when
+        working with large numbers of resources.
+
+        Args:
+            resource_class (type): The ``Resource`` subclass to operate on,
+                only needed when this collection registers several kinds.
+
+        Returns:
+            Batch: an empty batch bound to this collection.
+        """
+        return Batch(self, resource_class=resource_class)
+
+    def upsert(self, desired, resource_class=None, chunk_size=500,
+               validate_only=False):
+        """Bring many resources of this collection to a desired state.
+
+        The bulk form of :meth:`Resource.upsert`.  The collection is read
+        once, selecting only the attributes named in ``desired``, then
+        missing resources are created and resources that differ are
+        patched with the differing attributes, in a
+        :class:`~f5.bigip.batch.Batch`.  Resources already in the desired
+        state cost no request at all.
+
+        Args:
+            desired (list): One dict of keyword arguments per resource, as
+                for ``create``.  ``name``, with ``partition`` and
+                ``subPath`` where the device reports them, identifies the
+                resource.
+            resource_class (type): As for :meth:`batch`.
+            chunk_size (int): Maximum number of writes per transaction.
+            validate_only (bool): Ask the device to validate, not commit.
+
+        Returns:
+            list: One :class:`~f5.bigip.batch.BatchItem` per entry of
+            ``desired``, in order.  Entries that needed no change have the
+            action ``unchanged`` and the device's attributes as ``result``.
+        """
+        desired = [dict(attributes) for attributes in desired]
+        select = None
+        if '/mgmt/tm/' in self._meta_data['uri']:
+            select = _upsert_fields(desired)
+        existing = {}
+        for item in self.get_collection(select=select, as_dicts=True):
+            existing[tuple(item.get(k) for k in IDENTITY_KEYS)] = item
+
+        batch = self.batch(resource_class=resource_class)
+        results = []
+        for attributes in desired:
+            key = tuple(attributes.get(k) for k in IDENTITY_KEYS)
+            current = existing.get(key)
+            if current is None:
+                results.append(batch.create(**attributes))
+                continue
+            changes = _differences(
+                current, self._check_for_python_keywords(dict(
+                    (k, v) for k, v in iteritems(attributes)
+                    if k not in IDENTITY_KEYS)))
+            if not changes:
+                item = BatchItem('unchanged', attributes)
+                item.result = current
+                results.append(item)
+                continue
+            changes.update((k, attributes[k]) for k in IDENTITY_KEYS
+                           if k in attributes)
+            results.append(batch.modify(**changes))
+        if len(batch):
+            batch.submit(chunk_size=chunk_size, validate_only=validate_only)
+        return results
 
     def _delete_collection(self, **kwargs):
         """wrapped with delete_collection, override that in a sublcass to customize """
@@ -852,19 +1558,8 @@ class Collection(ResourceBase):
 
         requests_params = self._handle_requests_params(kwargs)
         delete_uri = self._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
 
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                session.delete(delete_uri, **requests_params)
-                break
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        self._request('delete', delete_uri, **requests_params)
 
     def delete_collection(self, **kwargs):
         """One can not simply delete a collection.
@@ -980,6 +1675,7 @@ class Resource(ResourceBase):
                                 'creation_uri_qargs': qargs,
                                 'creation_uri_frag': frag,
                                 'allowed_lazy_attributes': attrs})
+        share_meta_data(self)
 
     def _assign_stats(self, attrs):
         if self._meta_data['object_has_stats']:
@@ -1040,22 +1736,12 @@ class Resource(ResourceBase):
 
         # Make convenience variable with short names for this method.
         _create_uri = self._meta_data['container']._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
 
         kwargs = self._prepare_request_json(kwargs)
 
         # Invoke the REST operation on the device.
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                response = session.post(_create_uri, json=kwargs, **requests_params)
-                break
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        response = self._request('post', _create_uri, json=kwargs,
+                                 **requests_params)
 
         # Make new instance of self
         result = self._produce_instance(response)
@@ -1115,30 +1801,26 @@ class Resource(ResourceBase):
                     "resource, the _meta_data['uri'] is %s and it should"\
                     " not be changed." % (self._meta_data['uri'])
             raise URICreationCollision(error)
+        expand = kwargs.pop('expand', False)
+        if expand:
+            Collection._add_query_params(
+                kwargs, {'expandSubcollections': 'true'})
         requests_params = self._handle_requests_params(kwargs)
         self._check_load_parameters(**kwargs)
         kwargs['uri_as_parts'] = True
-        refresh_session = self._meta_data['bigip']._meta_data['icr_session']
         base_uri = self._meta_data['container']._meta_data['uri']
         kwargs.update(requests_params)
         for key1, key2 in self._meta_data['reduction_forcing_pairs']:
             kwargs = self._reduce_boolean_pair(kwargs, key1, key2)
         kwargs = self._check_for_python_keywords(kwargs)
 
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                response = refresh_session.get(base_uri, **kwargs)
-                break
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        response = self._request('get', base_uri, **kwargs)
 
         # Make new instance of self
-        return self._produce_instance(response)
+        instance = self._produce_instance(response)
+        if expand:
+            instance._stash_expanded_items()
+        return instance
 
     def load(self, **kwargs):
         r"""Load an already configured service into this instance.
@@ -1159,34 +1841,93 @@ class Resource(ResourceBase):
 
                 Use the method above to pass query args
 
+                If kwargs has ``expand=True`` the items of the resource's
+                sub-collections are requested along with it, and the first
+                ``get_collection()`` of each sub-collection needs no
+                request of its own.
+
         Returns:
             Resource: A Resource Instance with a populated ``_meta_data['uri']``
         """
         return self._load(**kwargs)
 
+    def _load_selected(self, identity, desired, requests_params):
+        """Load the resource with only the attributes ``upsert`` compares."""
+        requests_params = dict(requests_params)
+        if '/mgmt/tm/' in self._meta_data['container']._meta_data['uri']:
+            fields = _upsert_fields([desired]) + [
+                'generation', 'kind', 'selfLink']
+            requests_params['params'] = _merge_query_params(
+                requests_params.get('params', {}),
+                {'$select': ','.join(fields)})
+        return self.load(requests_params=requests_params, **identity)
+
+    def _upsert(self, **kwargs):
+        """wrapped with upsert, override that in a subclass to customize"""
+        requests_params = kwargs.pop('requests_params', {})
+        identity = dict((k, kwargs[k]) for k in IDENTITY_KEYS if k in kwargs)
+        desired = dict((k, v) for k, v in iteritems(kwargs)
+                       if k not in identity)
+        try:
+            current = self._load_selected(identity, desired, requests_params)
+        except HTTPError as err:
+            if err.response.status_code != 404:
+                raise
+            try:
+                return self.create(requests_params=dict(requests_params),
+                                   **kwargs), True
+            except HTTPError as err:
+                # Created by someone else since the load
+                if err.response.status_code != 409:
+                    raise
+            current = self._load_selected(identity, desired, requests_params)
+
+        changes = _differences(current.__dict__, desired)
+        if not changes:
+            return current, False
+        current.modify(requests_params=dict(requests_params), **changes)
+        return current, True
+
+    def upsert(self, **kwargs):
+        r"""Create the resource, or make an existing one match ``kwargs``.
+
+        The resource named by ``name`` (and ``partition``/``subPath``) is
+        loaded, selecting only the attributes given in ``kwargs``.  If it
+        does not exist it is created with ``kwargs``.  If it exists, only
+        the attributes whose value differs are sent, with PATCH, and
+        nothing is sent when none differ.  A resource created by someone
+        else between the load and the create (409) is loaded again and
+        patched.
+
+        Values are compared as given, so a value the device reports in a
+        different form (for example a name without its partition) is
+        always sent.
+
+        Args:
+            \*\*kwargs (dict): Identity and desired attributes, as for
+                :meth:`create`.  A ``requests_params`` dict is passed to
+                every request made.
+
+        Returns:
+            tuple: ``(resource, changed)``.  When nothing changed
+            ``resource`` only holds the attributes that were compared; call
+            ``refresh`` for the rest.
+        """
+        return self._upsert(**kwargs)
+
     def _delete(self, **kwargs):
         """wrapped with delete, override that in a subclass to customize """
         requests_params = self._handle_requests_params(kwargs)
 
         delete_uri = self._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
 
         # Check the generation for match before delete
         force = self._check_force_arg(kwargs.pop('force', True))
+        conflict = self._check_conflict_arg(kwargs.pop('conflict', 'fail'))
         if not force:
-            self._check_generation()
+            self._guard_generation(conflict)
 
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                response = session.delete(delete_uri, **requests_params)
-                break
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        response = self._request('delete', delete_uri, **requests_params)
 
         if response.status_code == 200:
             self.__dict__ = {'deleted': True}
@@ -1208,6 +1949,11 @@ class Resource(ResourceBase):
                 will be handled according to that API.
 
                 Use the method above to pass query args.
+
+                ``force=False`` checks the generation of the object on the
+                device first.  ``conflict='last_writer_wins'`` (or
+                ``'merge'``) deletes it even if it changed, the default
+                ``'fail'`` raises ``GenerationMismatch``.
         """
         # Need to implement checking for ? here.
         self._delete(**kwargs)
@@ -1245,26 +1991,16 @@ class Resource(ResourceBase):
         requests_params = self._handle_requests_params(kwargs)
         self._check_load_parameters(**kwargs)
         kwargs['uri_as_parts'] = True
-        session = self._meta_data['bigip']._meta_data['icr_session']
         base_uri = self._meta_data['container']._meta_data['uri']
         kwargs.update(requests_params)
 
-        # Handles ConnectionAborted errors
-        for i in range(0, 30):
-            try:
-                session.get(base_uri, **kwargs)
-                break
-            except HTTPError as err:
-                if err.response.status_code == 404:
-                    return False
-                else:
-                    raise
-            except ConnectionError as ex:
-                if 'Connection aborted' in str(ex) and i < 29:
-                    time.sleep(1)
-                    continue
-                else:
-                    raise
+        try:
+            self._request('get', base_uri, **kwargs)
+        except HTTPError as err:
+            if err.response.status_code == 404:
+                return False
+            else:
+                raise
 
         return True
 
@@ -1358,7 +2094,6 @@ class AsmResource(Resource):
         requests_params = self._handle_requests_params(kwargs)
         self._check_load_parameters(**kwargs)
         kwargs['uri_as_parts'] = True
-        refresh_session = self._meta_data['bigip']._meta_data['icr_session']
         uri = self._meta_data['container']._meta_data['uri']
         endpoint = kwargs.pop('id', '')
         # Popping name kwarg as it will cause the uri to be invalid. We only
@@ -1368,7 +2103,7 @@ class AsmResource(Resource):
         kwargs.update(requests_params)
         for key1, key2 in self._meta_data['reduction_forcing_pairs']:
             kwargs = self._reduce_boolean_pair(kwargs, key1, key2)
-        response = refresh_session.get(base_uri, **kwargs)
+        response = self._request('get', base_uri, **kwargs)
         # Make new instance of self
         return self._produce_instance(response)
 
@@ -1400,8 +2135,7 @@ class AsmResource(Resource):
         requests_params = self._handle_requests_params(kwargs)
 
         delete_uri = self._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
-        response = session.delete(delete_uri, **requests_params)
+        response = self._request('delete', delete_uri, **requests_params)
         if response.status_code == 200 or 201:
             self.__dict__ = {'deleted': True}
 
@@ -1451,7 +2185,6 @@ class AsmResource(Resource):
         requests_params = self._handle_requests_params(kwargs)
         self._check_load_parameters(**kwargs)
         kwargs['uri_as_parts'] = True
-        session = self._meta_data['bigip']._meta_data['icr_session']
         uri = self._meta_data['container']._meta_data['uri']
         endpoint = kwargs.pop('id', '')
         # Popping name kwarg as it will cause the uri to be invalid
@@ -1459,7 +2192,7 @@ class AsmResource(Resource):
         base_uri = uri + endpoint + '/'
         kwargs.update(requests_params)
         try:
-            session.get(base_uri, **kwargs)
+            self._request('get', base_uri, **kwargs)
         except HTTPError as err:
             if err.response.status_code == 404:
                 return False
@@ -1505,9 +2238,8 @@ class AsmTaskResource(AsmResource):
             raise URICreationCollision(error)
         # Make convenience variable with short names for this method.
         _create_uri = self._meta_data['container']._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
         # Invoke the REST operation on the device.
-        response = session.post(_create_uri, json={})
+        response = self._request('post', _create_uri, json={})
         # Make new instance of self
         return self._produce_instance(response)
 
@@ -1563,7 +2295,6 @@ class TaskResource(Resource):
         requests_params = self._handle_requests_params(kwargs)
         self._check_load_parameters(**kwargs)
         kwargs['uri_as_parts'] = True
-        refresh_session = self._meta_data['bigip']._meta_data['icr_session']
         uri = self._meta_data['container']._meta_data['uri']
         endpoint = kwargs.pop('id', '')
         # Popping name kwarg as it will cause the uri to be invalid. We only
@@ -1573,7 +2304,7 @@ class TaskResource(Resource):
         kwargs.update(requests_params)
         for key1, key2 in self._meta_data['reduction_forcing_pairs']:
             kwargs = self._reduce_boolean_pair(kwargs, key1, key2)
-        response = refresh_session.get(base_uri, **kwargs)
+        response = self._request('get', base_uri, **kwargs)
         # Make new instance of self
         return self._produce_instance(response)
 
@@ -1602,8 +2333,7 @@ class TaskResource(Resource):
         requests_params = self._handle_requests_params(kwargs)
 
         delete_uri = self._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
-        response = session.delete(delete_uri, **requests_params)
+        response = self._request('delete', delete_uri, **requests_params)
         if response.status_code == 200 or 201:
             self.__dict__ = {'deleted': True}
 
@@ -1652,7 +2382,6 @@ class TaskResource(Resource):
         requests_params = self._handle_requests_params(kwargs)
         self._check_load_parameters(**kwargs)
         kwargs['uri_as_parts'] = True
-        session = self._meta_data['bigip']._meta_data['icr_session']
         uri = self._meta_data['container']._meta_data['uri']
         endpoint = kwargs.pop('id', '')
         # Popping name kwarg as it will cause the uri to be invalid
@@ -1660,7 +2389,7 @@ class TaskResource(Resource):
         base_uri = uri + endpoint + '/'
         kwargs.update(requests_params)
         try:
-            session.get(base_uri, **kwargs)
+            self._request('get', base_uri, **kwargs)
         except HTTPError as err:
             if err.response.status_code == 404:
                 return False
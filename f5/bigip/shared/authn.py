@@ -71,12 +71,12 @@ class Root(Resource):
 
         # Make convenience variable with short names for this method.
         _create_uri = self._meta_data['container']._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
 
         kwargs = self._prepare_request_json(kwargs)
 
         # Invoke the REST operation on the device.
-        response = session.post(_create_uri, json=kwargs, **requests_params)
+        response = self._request('post', _create_uri, json=kwargs,
+                                 **requests_params)
 
         # Make new instance of self
         result = self._produce_instance(response)
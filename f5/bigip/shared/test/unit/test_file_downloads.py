@@ -0,0 +1,54 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import mock
+
+from f5.bigip import ManagementRoot
+
+
+class Response(object):
+    def __init__(self, content, headers):
+        self.content = content
+        self.headers = headers
+        self.status_code = 200
+
+
+def serve(data):
+    def get(uri, **kwargs):
+        byte_range = kwargs['headers']['Content-Range'].split('/')[0]
+        start, end = [int(x) for x in byte_range.split('-')]
+        end = min(end, len(data) - 1)
+        headers = {'Content-Range': '%s-%s/%s' % (start, end, len(data))}
+        return Response(data[start:end + 1], headers)
+    return get
+
+
+def test_ucs_download_parallel(tmpdir, fakeicontrolsession):
+    data = b'0123456789' * 25
+    dest = str(tmpdir.join('backup.ucs'))
+    mr = ManagementRoot('FAKENETLOC', 'FAKENAME', 'FAKEPASSWORD')
+    mr._meta_data['icr_session'] = mock.MagicMock()
+    mr._meta_data['icr_session'].get.side_effect = serve(data)
+    ucs = mr.shared.file_transfer.ucs_downloads
+    ucs.download_file('backup.ucs', dest, chunk_size=40, max_workers=3,
+                      checksum=hashlib.sha256(data).hexdigest())
+    with open(dest, 'rb') as fh:
+        assert fh.read() == data
+    calls = mr._meta_data['icr_session'].get.call_args_list
+    assert len(calls) == 7
+    assert calls[0][0][0] == \
+        'https://FAKENETLOC:443/mgmt/shared/file-transfer/ucs-downloads/' \
+        'backup.ucs'
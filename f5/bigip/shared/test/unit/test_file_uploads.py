@@ -24,6 +24,7 @@ except ImportError:
 from f5.bigip import ManagementRoot
 from f5.bigip.shared.file_transfer import\
     FileMustNotHaveDotISOExtension
+from f5.sdk_exception import FileUploadSizeError
 
 
 def test_file_upload_80a(tmpdir, fakeicontrolsession):
@@ -114,3 +115,53 @@ def test_bytes_upload_70a(tmpdir, fakeicontrolsession):
         assert d == 'aaaaaaaaaaaaaaaaaaaa'
     lchunk = session_mock.post.call_args_list[3][1]['data']
     assert 10*'a' == lchunk
+
+
+def test_file_upload_reads_one_chunk_at_a_time(tmpdir, fakeicontrolsession):
+    filepath = tmpdir.mkdir('testdir').join('fiftya.txt')
+    filepath.write(50*'a')
+    mr = ManagementRoot('FAKENETLOC', 'FAKENAME', 'FAKEPASSWORD')
+    mr._meta_data['icr_session'] = mock.MagicMock()
+    ftu = mr.shared.file_transfer.uploads
+    with open(filepath.__str__(), 'rb') as fileobj:
+        fileobj.read = mock.MagicMock(wraps=fileobj.read)
+        ftu.upload_stringio(fileobj, 'testtarget', chunk_size=20)
+    assert all(c[0][0] <= 20 for c in fileobj.read.call_args_list)
+    session_mock = mr._meta_data['icr_session']
+    ranges = [c[1]['headers']['Content-Range']
+              for c in session_mock.post.call_args_list]
+    assert ranges == ['0-19/50', '20-39/50', '40-49/50']
+
+
+def test_generator_upload_is_rechunked(tmpdir, fakeicontrolsession):
+    def pieces():
+        for size in (7, 30, 1, 12):
+            yield b'a' * size
+    mr = ManagementRoot('FAKENETLOC', 'FAKENAME', 'FAKEPASSWORD')
+    mr._meta_data['icr_session'] = mock.MagicMock()
+    ftu = mr.shared.file_transfer.uploads
+    ftu.upload_stringio(pieces(), 'testtarget', chunk_size=20, size=50)
+    session_mock = mr._meta_data['icr_session']
+    calls = session_mock.post.call_args_list
+    assert [c[1]['data'] for c in calls] == [b'a'*20, b'a'*20, b'a'*10]
+    assert calls[-1][1]['headers']['Content-Range'] == '40-49/50'
+
+
+def test_generator_upload_requires_size(tmpdir, fakeicontrolsession):
+    mr = ManagementRoot('FAKENETLOC', 'FAKENAME', 'FAKEPASSWORD')
+    mr._meta_data['icr_session'] = mock.MagicMock()
+    ftu = mr.shared.file_transfer.uploads
+    with pytest.raises(FileUploadSizeError) as ex:
+        ftu.upload_stringio(iter([b'a']), 'testtarget')
+    assert 'size=' in str(ex.value)
+    assert mr._meta_data['icr_session'].post.call_count == 0
+
+
+def test_upload_size_mismatch(tmpdir, fakeicontrolsession):
+    mr = ManagementRoot('FAKENETLOC', 'FAKENAME', 'FAKEPASSWORD')
+    mr._meta_data['icr_session'] = mock.MagicMock()
+    ftu = mr.shared.file_transfer.uploads
+    with pytest.raises(FileUploadSizeError):
+        ftu.upload_stringio([b'a' * 30], 'testtarget', chunk_size=20, size=25)
+    with pytest.raises(FileUploadSizeError):
+        ftu.upload_stringio([b'a' * 30], 'testtarget', chunk_size=20, size=40)
@@ -0,0 +1,55 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Compare the cost of the ways of reading a collection."""
+
+from __future__ import print_function
+
+import json
+
+from f5.bigip.test.benchmark.utils import best_of
+from f5.bigip.test.benchmark.utils import fake_management_root
+from f5.bigip.test.benchmark.utils import pool_items
+from f5.bigip.test.benchmark.utils import report
+
+
+def main(sizes=(1000, 10000)):
+    for size in sizes:
+        items = pool_items(size)
+        full = json.dumps({'items': items})
+        projected = json.dumps({'items': [
+            {'name': i['name'], 'fullPath': i['fullPath']} for i in items]})
+
+        def router(method, uri, **kwargs):
+            if '$select' in str(kwargs.get('params')):
+                return projected
+            return full
+
+        pools = fake_management_root(router).tm.ltm.pools
+
+        rows = [
+            ('get_collection()',
+             best_of(lambda: pools.get_collection())),
+            ('get_collection(as_dicts=True)',
+             best_of(lambda: pools.get_collection(as_dicts=True))),
+            ("get_collection(select=[...], as_dicts=True)",
+             best_of(lambda: pools.get_collection(
+                 select=['name', 'fullPath'], as_dicts=True))),
+        ]
+        report('Collection read, %d items' % size, rows)
+
+
+if __name__ == '__main__':
+    main()
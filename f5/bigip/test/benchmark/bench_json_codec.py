@@ -0,0 +1,76 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Compare the ways a collection body can be decoded.
+
+The "text, then json" row is what ``requests.Response.json`` does: build a
+str from the body, then parse it.  The peak memory table compares decoding
+the whole body with streaming it in 64 kB chunks.  Requires Python 3 for
+``tracemalloc``; the ``orjson`` row is skipped when it is not installed.
+"""
+
+from __future__ import print_function
+
+import json
+import tracemalloc
+
+from f5.bigip.test.benchmark.utils import best_of
+from f5.bigip.test.benchmark.utils import pool_items
+from f5.bigip.test.benchmark.utils import report
+from f5.utils.json_codec import get_codec
+from f5.utils.json_codec import JSONCodec
+from f5.utils.json_codec import STREAM_CHUNK_SIZE
+
+
+def chunked(body):
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[start:start + STREAM_CHUNK_SIZE]
+
+
+def peak(func):
+    tracemalloc.start()
+    func()
+    result = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def main(count=20000):
+    body = json.dumps({'items': pool_items(count)}).encode('utf-8')
+    rows = [
+        ('text, then json', best_of(
+            lambda: json.loads(body.decode('utf-8')))),
+        ('json from bytes', best_of(lambda: JSONCodec().loads(body))),
+    ]
+    orjson = get_codec('orjson')
+    if not orjson.is_stdlib:
+        rows.append(('orjson from bytes', best_of(lambda: orjson.loads(body))))
+    rows.append(('streamed items', best_of(
+        lambda: list(JSONCodec().iter_items(chunked(body))))))
+    report('decode %d pools (%d kB)' % (count, len(body) // 1024), rows)
+
+    def count_items(items):
+        return sum(1 for _ in items)
+
+    whole = peak(lambda: count_items(json.loads(body.decode('utf-8'))['items']))
+    streamed = peak(lambda: count_items(
+        JSONCodec().iter_items(chunked(body))))
+    print('Peak memory while visiting every item once')
+    print('  %-32s %10d kB' % ('decode whole body', whole // 1024))
+    print('  %-32s %10d kB' % ('streamed items', streamed // 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Compare lazy attribute lookup with the linear scan it replaced.
+
+The first row of each table reproduces the previous ``__getattr__``: build
+the list of lowercased class names, scan ``allowed_lazy_attributes`` for a
+match, then compare versions with two fresh ``LooseVersion`` parses.
+"""
+
+from __future__ import print_function
+
+from distutils.version import LooseVersion
+import mock
+
+from f5.bigip.mixins import LazyAttributeMixin
+from f5.bigip.test.benchmark.utils import best_of
+from f5.bigip.test.benchmark.utils import fake_management_root
+from f5.bigip.test.benchmark.utils import report
+from f5.bigip.tm.ltm.profile import Profile
+
+
+def linear_getattr(container, name):
+    attr_names = [la.__name__.lower() for la in
+                  container._meta_data['allowed_lazy_attributes']]
+    if name not in attr_names:
+        raise AttributeError(name)
+    for lazy_attribute in container._meta_data['allowed_lazy_attributes']:
+        if name == lazy_attribute.__name__.lower():
+            attribute = lazy_attribute(container)
+            bases = [base.__name__ for base in lazy_attribute.__bases__]
+            tmos_v = container._meta_data['bigip'].tmos_version
+            minimum = attribute._meta_data['minimum_version']
+            LooseVersion(tmos_v) < LooseVersion(minimum)
+            if 'Resource' not in bases:
+                setattr(container, name, attribute)
+            return attribute
+
+
+def main(number=2000):
+    mgmt = fake_management_root(lambda method, uri, **kwargs: {})
+    ltm = mgmt.tm.ltm
+    pools = ltm.pools
+    profile_names = sorted(ltm.profile.transform_attr_names())
+
+    def previous_chain():
+        linear_getattr(pools, 'pool')
+
+    def current_chain():
+        pools.pool
+
+    report('mgmt.tm.ltm.pools.pool, %d lookups' % number, [
+        ('linear scan', best_of(
+            lambda: [previous_chain() for _ in range(number)])),
+        ('dispatch map', best_of(
+            lambda: [current_chain() for _ in range(number)])),
+    ])
+
+    def walk(getter):
+        profile = Profile(ltm)
+        for name in profile_names:
+            getter(profile, name)
+
+    with mock.patch.object(LazyAttributeMixin, '__getattr__', linear_getattr):
+        previous = best_of(lambda: walk(getattr), number=20)
+    report('every child of a new ltm.profile (%d names)' % len(profile_names), [
+        ('linear scan', previous),
+        ('dispatch map', best_of(lambda: walk(getattr), number=20)),
+    ])
+
+
+if __name__ == '__main__':
+    main()
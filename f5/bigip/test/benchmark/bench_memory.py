@@ -0,0 +1,65 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Measure the memory held by each hydrated Resource.
+
+The "private _meta_data" row disables the shared metadata and string
+interning applied when a resource is hydrated, which is how every resource
+was stored before.  Requires Python 3 for ``tracemalloc``.
+"""
+
+from __future__ import print_function
+
+import gc
+import json
+import mock
+import tracemalloc
+
+from f5.bigip.test.benchmark.utils import fake_management_root
+from f5.bigip.test.benchmark.utils import pool_items
+
+
+def bytes_per_resource(pools, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    resources = pools.get_collection()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(resources) == count
+    return (after - before) / float(count)
+
+
+def main(count=20000):
+    body = json.dumps({'items': pool_items(count)})
+    pools = fake_management_root(lambda method, uri, **kwargs: body) \
+        .tm.ltm.pools
+    pools.get_collection()
+
+    with mock.patch('f5.bigip.resource.share_meta_data'):
+        with mock.patch('f5.bigip.resource.compact_values',
+                        side_effect=lambda rdict: rdict):
+            private = bytes_per_resource(pools, count)
+    shared = bytes_per_resource(pools, count)
+
+    print('Memory per hydrated Pool, %d pools' % count)
+    print('  %-32s %10.0f bytes' % ('private _meta_data', private))
+    print('  %-32s %10.0f bytes  %5.1f%% less' % (
+        'shared _meta_data', shared, 100 * (1 - shared / private)))
+
+
+if __name__ == '__main__':
+    main()
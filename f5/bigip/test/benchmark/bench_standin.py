@@ -0,0 +1,316 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""End-to-end benchmarks against the in-process stand-in server.
+
+Every scenario talks HTTP to a :class:`StandInServer`, so the numbers
+include ``requests``, the session and the JSON codec as well as the SDK.
+Each operation is timed on its own to report its p50 and p99.  The
+operations are then run a second time under ``tracemalloc`` to report the
+peak memory, which includes the stand-in server since it runs in the same
+process.  Requires Python 3 for ``tracemalloc``.
+
+Save the results of a release and compare a change against them::
+
+    python -m f5.bigip.test.benchmark.bench_standin --save before.json
+    python -m f5.bigip.test.benchmark.bench_standin --compare before.json
+
+``--compare`` exits with status 1 when the p50 of a scenario got slower by
+more than ``--tolerance``.
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from f5.bigip.contexts import TransactionContextManager
+from f5.bigip.test.benchmark.server import StandInDevice
+from f5.bigip.test.benchmark.server import StandInServer
+from f5.utils.responses.sampler import StatsSampler
+
+
+POOLS = 'tm/ltm/pool'
+MIB = 1024 * 1024
+
+
+class Result(object):
+    def __init__(self, name, latencies, peak=None):
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.elapsed = sum(latencies)
+        self.peak = peak
+
+    @property
+    def ops(self):
+        return len(self.latencies)
+
+    @property
+    def rate(self):
+        return self.ops / self.elapsed if self.elapsed else 0
+
+    def percentile(self, percent):
+        """Nearest-rank percentile of the latencies, in seconds."""
+        rank = max(int(round(percent / 100.0 * self.ops + 0.5)) - 1, 0)
+        return self.latencies[min(rank, self.ops - 1)]
+
+    def to_dict(self):
+        return {'ops': self.ops, 'ops_per_second': self.rate,
+                'p50': self.percentile(50), 'p99': self.percentile(99),
+                'peak_bytes': self.peak}
+
+
+def run(name, prepare, memory=True):
+    """Time the operations returned by ``prepare()``.
+
+    ``prepare`` is called once per pass and returns a list of callables;
+    it must leave the device ready for another pass.
+    """
+    latencies = []
+    timer = timeit.default_timer
+    for operation in prepare():
+        began = timer()
+        operation()
+        latencies.append(timer() - began)
+    peak = None
+    if memory:
+        operations = prepare()
+        gc.collect()
+        tracemalloc.start()
+        for operation in operations:
+            operation()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return Result(name, latencies, peak)
+
+
+def crud(mgmt, device, count):
+    """Create, load, modify and delete ``count`` pools, one at a time."""
+    pools = mgmt.tm.ltm.pools
+    names = ['crud_%d' % i for i in range(count)]
+    loaded = {}
+
+    def create():
+        for name in names:
+            device.remove(POOLS, name)
+        return [lambda n=n: pools.pool.create(name=n, partition='Common')
+                for n in names]
+
+    def load():
+        def operation(name):
+            loaded[name] = pools.pool.load(name=name, partition='Common')
+        return [lambda n=n: operation(n) for n in names]
+
+    def modify():
+        return [lambda n=n: loaded[n].modify(description='benchmark')
+                for n in names]
+
+    def delete():
+        for name in names:
+            if not pools.pool.exists(name=name, partition='Common'):
+                device.add(POOLS, {'name': name, 'partition': 'Common'})
+            loaded[name] = pools.pool.load(name=name, partition='Common')
+        return [lambda n=n: loaded[n].delete() for n in names]
+
+    yield 'crud create', create
+    yield 'crud load', load
+    yield 'crud modify', modify
+    yield 'crud delete', delete
+
+
+def collections(mgmt, device, size, repeat=3):
+    """Read a collection of ``size`` pools in each of the supported ways."""
+    device.clear(POOLS)
+    device.populate(POOLS, size)
+    pools = mgmt.tm.ltm.pools
+    reads = [
+        ('get_collection()', pools.get_collection),
+        ('get_collection(as_dicts=True)',
+         lambda: pools.get_collection(as_dicts=True)),
+        ('get_collection(stream=True)',
+         lambda: pools.get_collection(stream=True)),
+        ('iter_collection()', lambda: list(pools.iter_collection())),
+        ("query().select('name')", lambda: pools.query().select(
+            'name').get(as_dicts=True)),
+    ]
+    for label, read in reads:
+        yield ('%d pools %s' % (size, label),
+               lambda read=read: [read] * repeat)
+
+
+def files(mgmt, device, size_mib=8, repeat=3):
+    """Upload and download a file of ``size_mib`` MiB."""
+    data = os.urandom(size_mib * MIB)
+    transfer = mgmt.shared.file_transfer
+    target = 'benchmark.bin'
+    directory = tempfile.mkdtemp()
+    dest = os.path.join(directory, target)
+
+    def upload():
+        transfer.uploads.upload_stringio(io.BytesIO(data), target)
+
+    def download(workers):
+        transfer.bulk.download_file(target, dest, max_workers=workers)
+
+    try:
+        yield ('upload %d MiB' % size_mib, lambda: [upload] * repeat)
+        for workers in (1, 4):
+            yield ('download %d MiB, %d workers' % (size_mib, workers),
+                   lambda w=workers: [lambda: download(w)] * repeat)
+    finally:
+        shutil.rmtree(directory)
+
+
+def transactions(mgmt, device, count, per_transaction=50):
+    """Commit ``count`` pools in transactions, by hand and planned."""
+    names = ['tx_%d' % i for i in range(count)]
+
+    def forget():
+        for name in names:
+            device.remove(POOLS, name)
+
+    def commit(chunk):
+        with TransactionContextManager(
+                mgmt.tm.transactions.transaction) as api:
+            for name in chunk:
+                api.tm.ltm.pools.pool.create(name=name, partition='Common')
+
+    def by_hand():
+        forget()
+        chunks = [names[i:i + per_transaction]
+                  for i in range(0, count, per_transaction)]
+        return [lambda c=c: commit(c) for c in chunks]
+
+    def planned():
+        forget()
+        plan = mgmt.tm.transactions.plan(chunk_size=per_transaction)
+        for name in names:
+            plan.create(mgmt.tm.ltm.pools, name=name, partition='Common')
+        return [plan.submit]
+
+    yield ('transaction of %d creates' % per_transaction, by_hand)
+    yield ('plan of %d creates' % count, planned)
+    forget()
+
+
+def stats(mgmt, device, size, repeat=20):
+    """Sample the statistics of a collection of ``size`` pools."""
+    device.clear(POOLS)
+    device.populate(POOLS, size)
+
+    def sample():
+        sampler = StatsSampler(mgmt.tm.ltm.pools, ['clientside.bitsIn',
+                                                   'clientside.curConns'])
+        return [sampler.sample] * repeat
+
+    yield ('stats of %d pools' % size, sample)
+
+
+def scenarios(mgmt, device, args):
+    yield crud(mgmt, device, args.count)
+    for size in args.sizes:
+        yield collections(mgmt, device, size)
+    yield files(mgmt, device, args.file_size)
+    yield transactions(mgmt, device, args.count)
+    yield stats(mgmt, device, min(args.sizes))
+
+
+def report(results, baseline=None):
+    print('%-48s %6s %10s %9s %9s %9s' % (
+        'scenario', 'ops', 'ops/s', 'p50 ms', 'p99 ms', 'peak MiB'))
+    for result in results:
+        peak = '-' if result.peak is None else '%.1f' % (
+            result.peak / float(MIB))
+        line = '%-48s %6d %10.1f %9.2f %9.2f %9s' % (
+            result.name, result.ops, result.rate,
+            result.percentile(50) * 1000, result.percentile(99) * 1000, peak)
+        if baseline and result.name in baseline:
+            before = baseline[result.name]['p50']
+            line += '  %+6.1f%%' % (
+                100 * (result.percentile(50) / before - 1) if before else 0)
+        print(line)
+
+
+def regressions(results, baseline, tolerance):
+    slower = []
+    for result in results:
+        before = baseline.get(result.name)
+        if before and result.percentile(50) > before['p50'] * (
+                1 + tolerance):
+            slower.append(result.name)
+    return slower
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000],
+                        help='sizes of the collections read')
+    parser.add_argument('--count', type=int, default=200,
+                        help='objects written by the CRUD and transaction '
+                             'scenarios')
+    parser.add_argument('--file-size', type=int, default=8,
+                        help='MiB uploaded and downloaded')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the server waits before answering')
+    parser.add_argument('--only', help='run the scenarios whose name '
+                                       'contains this text')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip the tracemalloc pass')
+    parser.add_argument('--save', help='write the results to this file')
+    parser.add_argument('--compare', help='results saved by an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='slowdown of p50 reported as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    device = StandInDevice(latency=args.latency)
+    results = []
+    with StandInServer(device) as server:
+        mgmt = server.management_root()
+        for scenario in scenarios(mgmt, device, args):
+            for name, prepare in scenario:
+                if args.only and args.only not in name:
+                    continue
+                results.append(run(name, prepare, memory=args.memory))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    report(results, baseline)
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump(dict((r.name, r.to_dict()) for r in results), fh,
+                      indent=2, sort_keys=True)
+    if baseline:
+        slower = regressions(results, baseline, args.tolerance)
+        for name in slower:
+            print('Regression: %s' % name)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
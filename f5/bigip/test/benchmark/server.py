@@ -0,0 +1,571 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""An in-process stand-in for the iControl REST API of a BIG-IP.
+
+The micro-benchmarks in this package replace the session with a canned
+router, so they leave out the HTTP stack.  :class:`StandInServer` serves a
+:class:`StandInDevice` over real HTTP on the loopback interface instead,
+so a ``ManagementRoot`` connected to it goes through ``requests``, the
+connection pool and the socket like it would against a device:
+
+.. code-block:: python
+
+    >>> device = StandInDevice(latency=0.002)
+    >>> device.populate('tm/ltm/pool', 10000)
+    >>> with StandInServer(device) as server:
+    ...     mgmt = server.management_root()
+    ...     pools = mgmt.tm.ltm.pools.get_collection()
+
+The device is seeded with the objects of the JSON files in
+``devtools/device_configs`` when they are available, and understands:
+
+* ``GET``, ``POST``, ``PUT``, ``PATCH`` and ``DELETE`` on any collection
+  below ``/mgmt/tm/`` whose objects are addressed as ``~Partition~name``,
+  including subcollections, with ``$select``, ``$top``, ``$skip`` and a
+  ``partition eq`` ``$filter``;
+* the ``stats`` of those collections and objects, whose counters grow
+  every time they are read;
+* transactions: requests with an ``X-F5-REST-Coordination-Id`` header are
+  queued, and applied when the transaction is PATCHed to ``VALIDATING``;
+* chunked uploads to and ranged downloads from ``/mgmt/shared/file-transfer``
+  and ``/mgmt/cm/autodeploy``, with ``Content-Range`` headers.
+
+HTTPS is not served; the ``ManagementRoot`` returned by
+:meth:`StandInServer.management_root` sends its requests over plain HTTP.
+"""
+
+import copy
+import itertools
+import json
+import os
+import re
+import threading
+import time
+
+from collections import OrderedDict
+
+import requests
+from six import iteritems
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib.parse import parse_qs
+from six.moves.urllib.parse import unquote
+from six.moves.urllib.parse import urlsplit
+
+import f5
+from f5.bigip import ManagementRoot
+
+
+DEVICE_CONFIGS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(f5.__file__))),
+    'devtools', 'device_configs')
+COORDINATION_HEADER = 'X-F5-REST-Coordination-Id'
+FILE_PATHS = ('shared/file-transfer/', 'cm/autodeploy/')
+LOCALHOST = 'https://localhost/mgmt/'
+
+
+class DeviceError(Exception):
+    def __init__(self, status, message):
+        super(DeviceError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+    def body(self):
+        return {'code': self.status, 'message': self.message,
+                'errorStack': [], 'apiError': 3}
+
+
+def _kind(collection, suffix='state'):
+    parts = [p for p in collection.split('/') if not p.startswith('~')]
+    return '%s:%s%s' % (':'.join(parts), parts[-1], suffix)
+
+
+def _key(item):
+    """The ``~Partition~name`` path segment of an object."""
+    parts = [item.get('partition', 'Common')]
+    if item.get('subPath'):
+        parts.append(item['subPath'])
+    parts.append(item['name'])
+    return '~' + '~'.join(parts)
+
+
+def _full_path(key):
+    return key.replace('~', '/')
+
+
+def _content_range(header):
+    match = re.match(r'\s*(\d+)-(\d+)/(\d+)', header or '')
+    if match is None:
+        raise DeviceError(400, 'Content-Range header is required')
+    return tuple(int(group) for group in match.groups())
+
+
+class StandInDevice(object):
+    """The configuration held by a :class:`StandInServer`.
+
+    Args:
+        latency (float): Seconds each request waits before it is answered.
+        tmos_version (str): Version reported in the ``selfLink`` of every
+            response.
+        seed_dir (str): Directory of ``*_GET.json`` device responses to
+            load objects from, ``None`` to start empty.
+    """
+
+    def __init__(self, latency=0.0, tmos_version='13.1.0',
+                 seed_dir=DEVICE_CONFIGS):
+        self.latency = latency
+        self.tmos_version = tmos_version
+        self.collections = {}
+        self.files = {}
+        self.transactions = OrderedDict()
+        self._transaction_ids = itertools.count(1)
+        self.requests = 0
+        self._templates = {}
+        self._bodies = {}
+        self._stats_reads = 0
+        self._lock = threading.RLock()
+        if seed_dir and os.path.isdir(seed_dir):
+            self.seed(seed_dir)
+
+    def _link(self, path):
+        return '%s%s?ver=%s' % (LOCALHOST, path, self.tmos_version)
+
+    def _collection(self, path):
+        collection = self.collections.get(path)
+        if collection is None:
+            collection = self.collections[path] = OrderedDict()
+        return collection
+
+    def _changed(self, path):
+        self._bodies.pop(path, None)
+
+    def add(self, collection, item):
+        """Store ``item`` in ``collection``, e.g. ``'tm/ltm/pool'``."""
+        item = dict(item)
+        key = _key(item)
+        item.setdefault('partition', 'Common')
+        item.setdefault('fullPath', _full_path(key))
+        item.setdefault('kind', _kind(collection))
+        item.setdefault('generation', 1)
+        item['selfLink'] = self._link('%s/%s' % (collection, key))
+        with self._lock:
+            self._collection(collection)[key] = item
+            self._templates.setdefault(collection, item)
+            self._changed(collection)
+        return item
+
+    def remove(self, collection, name, partition='Common'):
+        with self._lock:
+            self.collections.get(collection, {}).pop(
+                _key({'name': name, 'partition': partition}), None)
+            self._changed(collection)
+
+    def clear(self, collection):
+        with self._lock:
+            self.collections.pop(collection, None)
+            self._changed(collection)
+
+    def seed(self, directory):
+        """Add the objects found in the device responses of ``directory``."""
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.json') or '_POST' in filename:
+                continue
+            with open(os.path.join(directory, filename)) as fh:
+                try:
+                    body = json.load(fh)
+                except ValueError:
+                    continue
+            for item in body.get('items', [body]):
+                link = item.get('selfLink', '')
+                path = urlsplit(link).path
+                if not path.startswith('/mgmt/tm/') or 'name' not in item:
+                    continue
+                collection, _, key = path[len('/mgmt/'):].rpartition('/')
+                if key.startswith('~'):
+                    self.add(collection, item)
+
+    def populate(self, collection, count, partition='Common', prefix=None):
+        """Add ``count`` objects to ``collection``.
+
+        The objects are copies of the first one the collection held, or
+        carry only a name when it was empty.
+        """
+        prefix = prefix or collection.rstrip('/').rsplit('/', 1)[-1]
+        template = self._templates.get(collection, {})
+        for index in range(count):
+            item = copy.deepcopy(template)
+            item.pop('fullPath', None)
+            item.pop('subPath', None)
+            item.update(name='%s_%d' % (prefix, index), partition=partition)
+            self.add(collection, item)
+
+    def add_file(self, name, data):
+        with self._lock:
+            self.files[name] = bytearray(data)
+
+    def handle(self, method, uri, headers, body):
+        """Answer a request.
+
+        :returns: ``(status, response headers, body)``, where body is
+                  bytes or an object to encode as JSON
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        split = urlsplit(uri)
+        path = unquote(split.path)
+        params = parse_qs(split.query, keep_blank_values=True)
+        with self._lock:
+            self.requests += 1
+        if not path.startswith('/mgmt/'):
+            return 404, {}, DeviceError(404, 'Not found: %s' % path).body()
+        path = path[len('/mgmt/'):].strip('/')
+        try:
+            if path.startswith(FILE_PATHS):
+                return self._file(method, path, headers, body)
+            if path == 'tm/sys':
+                return 200, {}, {'kind': 'tm:sys:syscollectionstate',
+                                 'selfLink': self._link('tm/sys'),
+                                 'items': []}
+            if path.startswith('tm/transaction'):
+                return 200, {}, self._transaction(method, path, body)
+            body = json.loads(body.decode('utf-8')) if body else {}
+            transaction = headers.get(COORDINATION_HEADER)
+            if transaction:
+                return 200, {}, self._queue(transaction, method, path, body)
+            with self._lock:
+                return 200, {}, self._config(method, path, params, body)
+        except DeviceError as ex:
+            return ex.status, {}, ex.body()
+
+    def _locate(self, path):
+        """Split ``path`` into its collection and object key."""
+        collection, _, key = path.rpartition('/')
+        if key.startswith('~'):
+            return collection, key
+        return path, None
+
+    def _config(self, method, path, params, body):
+        stats = path.endswith('/stats')
+        if stats:
+            path = path[:-len('/stats')]
+        collection, key = self._locate(path)
+        if stats and method == 'GET':
+            return self._stats(collection, key)
+        if key is None:
+            if method == 'GET':
+                return self._read_collection(collection, params)
+            if method == 'POST':
+                return self._create(collection, body)
+            raise DeviceError(405, 'Method not allowed on a collection')
+        items = self.collections.get(collection, {})
+        item = items.get(key)
+        if item is None:
+            raise DeviceError(404, '01020036:3: The requested object (%s) '
+                                   'was not found.' % _full_path(key))
+        if method == 'GET':
+            return self._select(item, params)
+        if method == 'DELETE':
+            del items[key]
+            children = '%s/%s/' % (collection, key)
+            for sub in list(self.collections):
+                if sub.startswith(children):
+                    del self.collections[sub]
+            self._changed(collection)
+            return {}
+        if method == 'PUT':
+            update = dict((k, v) for k, v in iteritems(item)
+                          if k in ('kind', 'name', 'partition', 'subPath',
+                                   'fullPath', 'selfLink'))
+            update.update(body)
+            body = update
+            item.clear()
+        item.update(body)
+        item['generation'] = item.get('generation', 1) + 1
+        self._changed(collection)
+        return item
+
+    def _create(self, collection, body):
+        if 'name' not in body:
+            raise DeviceError(400, 'Missing name')
+        if _key(body) in self.collections.get(collection, {}):
+            raise DeviceError(409, '01020066:3: The requested object (%s) '
+                                   'already exists.' % _full_path(_key(body)))
+        return self.add(collection, body)
+
+    def _read_collection(self, collection, params):
+        simple = not params or list(params) == ['ver']
+        if simple:
+            cached = self._bodies.get(collection)
+            if cached is not None:
+                return cached
+        items = list(self.collections.get(collection, {}).values())
+        match = re.match(r"partition eq '?([^' ]+)'?$",
+                         params.get('$filter', [''])[0])
+        if match:
+            items = [i for i in items if i.get('partition') == match.group(1)]
+        skip = int(params.get('$skip', ['0'])[0])
+        top = params.get('$top')
+        items = items[skip:skip + int(top[0]) if top else None]
+        if '$select' in params:
+            items = [self._select(i, params) for i in items]
+        result = {'kind': _kind(collection, 'collectionstate'),
+                  'selfLink': self._link(collection)}
+        if items:
+            result['items'] = items
+        if simple:
+            result = json.dumps(result).encode('utf-8')
+            self._bodies[collection] = result
+        return result
+
+    @staticmethod
+    def _select(item, params):
+        if '$select' not in params:
+            return item
+        fields = params['$select'][0].split(',')
+        return dict((k, v) for k, v in iteritems(item) if k in fields)
+
+    def _stats(self, collection, key):
+        self._stats_reads += 1
+        items = self.collections.get(collection, {})
+        keys = list(items) if key is None else [key]
+        entries = {}
+        for index, name in enumerate(keys):
+            if name not in items:
+                raise DeviceError(404, 'The requested object (%s) was not '
+                                       'found.' % _full_path(name))
+            link = '%s%s/%s/stats' % (LOCALHOST, collection, name)
+            volume = self._stats_reads * (index + 1)
+            entries[link] = {'nestedStats': {'entries': {
+                'clientside.bitsIn': {'value': volume * 8000},
+                'clientside.bitsOut': {'value': volume * 64000},
+                'clientside.curConns': {'value': index % 50},
+                'clientside.totConns': {'value': volume},
+                'serverside.bitsIn': {'value': volume * 64000},
+                'serverside.curConns': {'value': index % 50},
+                'status.availabilityState': {'description': 'available'},
+                'tmName': {'description': _full_path(name)}}}}
+        suffix = '' if key is None else '/' + key
+        return {'kind': _kind(collection, 'collectionstats'),
+                'selfLink': self._link(collection + suffix + '/stats'),
+                'entries': entries}
+
+    def _transaction(self, method, path, body):
+        body = json.loads(body.decode('utf-8')) if body else {}
+        parts = path.split('/')
+        with self._lock:
+            if len(parts) == 2 and method == 'POST':
+                trans_id = str(next(self._transaction_ids))
+                self.transactions[trans_id] = {
+                    'state': 'STARTED', 'commands': []}
+                return self._transaction_state(trans_id)
+            transaction = self.transactions.get(parts[2])
+            if transaction is None:
+                raise DeviceError(404, 'Transaction %s not found' % parts[2])
+            if len(parts) == 4 and method == 'GET':
+                return self._commands(parts[2])
+            if method == 'PATCH' and body.get('state') == 'VALIDATING':
+                self._commit(transaction, body.get('validateOnly', False))
+            if method == 'DELETE':
+                del self.transactions[parts[2]]
+                return {}
+            return self._transaction_state(parts[2])
+
+    def _transaction_state(self, trans_id):
+        return {'kind': 'tm:transactionstate', 'transId': int(trans_id),
+                'state': self.transactions[trans_id]['state'],
+                'selfLink': self._link('tm/transaction/%s' % trans_id)}
+
+    def _commands(self, trans_id):
+        commands = self.transactions[trans_id]['commands']
+        items = []
+        for number, (method, path, body) in enumerate(commands, 1):
+            items.append({
+                'kind': 'tm:transaction:commandsstate',
+                'commandId': number, 'evalOrder': number,
+                'method': method, 'uri': LOCALHOST + path,
+                'selfLink': self._link('tm/transaction/%s/commands/%d' % (
+                    trans_id, number))})
+        result = {'kind': 'tm:transaction:commandscollectionstate',
+                  'selfLink': self._link('tm/transaction/%s/commands' %
+                                         trans_id)}
+        if items:
+            result['items'] = items
+        return result
+
+    def _queue(self, trans_id, method, path, body):
+        with self._lock:
+            transaction = self.transactions.get(trans_id)
+            if transaction is None or transaction['state'] != 'STARTED':
+                raise DeviceError(400, 'Transaction %s is not started' %
+                                  trans_id)
+            transaction['commands'].append((method, path, body))
+            collection, key = self._locate(path)
+            if key is None:
+                key = _key(body)
+                result = dict(body, kind=_kind(collection))
+            else:
+                result = dict(self.collections.get(collection, {}).get(
+                    key, {'kind': _kind(collection)}), **body)
+            result['selfLink'] = self._link('%s/%s' % (collection, key))
+            return result
+
+    def _commit(self, transaction, validate_only):
+        """Run the commands of a transaction, all of them or none."""
+        # Check every command against the configuration it will meet.
+        present = {}
+        for method, path, body in transaction['commands']:
+            collection, key = self._locate(path)
+            if key is None:
+                key = _key(body)
+            location = (collection, key)
+            exists = present.get(
+                location, key in self.collections.get(collection, {}))
+            if method == 'POST' and exists:
+                transaction['state'] = 'FAILED'
+                raise DeviceError(409, '01020066:3: The requested object '
+                                       '(%s) already exists.' %
+                                  _full_path(key))
+            if method != 'POST' and not exists:
+                transaction['state'] = 'FAILED'
+                raise DeviceError(404, '01020036:3: The requested object '
+                                       '(%s) was not found.' %
+                                  _full_path(key))
+            present[location] = method != 'DELETE'
+        if validate_only:
+            return
+        for method, path, body in transaction['commands']:
+            self._config(method, path, {}, body)
+        transaction['state'] = 'COMPLETED'
+
+    def _file(self, method, path, headers, body):
+        name = path.rsplit('/', 1)[-1]
+        start, end, total = _content_range(headers.get('Content-Range'))
+        with self._lock:
+            if method == 'POST':
+                data = self.files.get(name)
+                if data is None or start == 0:
+                    data = self.files[name] = bytearray(total)
+                elif len(data) < total:
+                    data.extend(bytearray(total - len(data)))
+                data[start:start + len(body)] = body
+                return 200, {}, {
+                    'remainingByteCount': max(total - end - 1, 0),
+                    'usedChunks': {str(start): len(body)},
+                    'totalByteCount': total,
+                    'localFilePath': '/var/config/rest/downloads/%s' % name,
+                    'temporaryFilePath':
+                        '/var/config/rest/downloads/tmp/%s' % name,
+                    'generation': 0,
+                    'lastUpdateMicros': int(time.time() * 1000000)}
+            data = self.files.get(name)
+            if data is None:
+                raise DeviceError(404, 'File %s not found' % name)
+            end = min(end, len(data) - 1)
+            chunk = bytes(data[start:end + 1])
+        return 200, {'Content-Range': '%d-%d/%d' % (start, end, len(data)),
+                     'Content-Type': 'application/octet-stream'}, chunk
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, do not let Nagle's
+    # algorithm hold the body back until the client acknowledges them.
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, payload = self.server.device.handle(
+            self.command, self.path, self.headers, body)
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json')
+        self.send_response(status)
+        for name, value in iteritems(headers):
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _PlainHTTPAdapter(requests.adapters.HTTPAdapter):
+    """Send the ``https://`` requests of the session over plain HTTP."""
+
+    def send(self, request, **kwargs):
+        request.url = 'http' + request.url[len('https'):]
+        return super(_PlainHTTPAdapter, self).send(request, **kwargs)
+
+
+class StandInServer(object):
+    """Serve a :class:`StandInDevice` on a free port of the loopback.
+
+    Use it as a context manager, or call :meth:`start` and :meth:`stop`.
+    """
+
+    def __init__(self, device=None, host='127.0.0.1', port=0):
+        self.device = device or StandInDevice()
+        self._server = _HTTPServer((host, port), _Handler)
+        self._server.device = self.device
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.stop()
+
+    def management_root(self, pool_size=10, **kwargs):
+        """Connect a ``ManagementRoot`` to the server.
+
+        Args:
+            pool_size (int): Connections kept open to the server.
+            **kwargs: Passed to ``ManagementRoot``.
+        """
+        adapter = _PlainHTTPAdapter(pool_connections=1,
+                                    pool_maxsize=pool_size)
+        prefix = 'https://%s:%s/' % (self.host, self.port)
+
+        class StandInManagementRoot(ManagementRoot):
+            def _get_icr_session(self, *args, **kw):
+                session = super(StandInManagementRoot,
+                                self)._get_icr_session(*args, **kw)
+                session.session.mount(prefix, adapter)
+                return session
+
+        return StandInManagementRoot(self.host, 'admin', 'admin',
+                                     port=self.port, **kwargs)
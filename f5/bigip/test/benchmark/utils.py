@@ -0,0 +1,131 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Helpers shared by the micro-benchmarks in this package.
+
+The benchmarks exercise the SDK's client-side code paths against a canned
+in-memory session, so they measure object construction and bookkeeping
+rather than the network.  Run any of them directly, for example::
+
+    python -m f5.bigip.test.benchmark.bench_collection
+"""
+
+from __future__ import print_function
+
+import json
+import mock
+import timeit
+
+from f5.bigip import ManagementRoot
+
+
+class FakeResponse(object):
+    """A response whose body is decoded from JSON text on every call.
+
+    Routers may return pre-encoded JSON text so that each request pays the
+    decoding cost a real response would, without paying to encode it.
+    """
+    def __init__(self, body, status_code=200):
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        self.text = body
+        self.status_code = status_code
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeSession(object):
+    """Answer every request with the result of ``router(method, uri)``."""
+    def __init__(self, router):
+        self.router = router
+        self.debug = False
+
+    def _respond(self, method, uri, **kwargs):
+        return FakeResponse(self.router(method, uri, **kwargs))
+
+    def get(self, uri, **kwargs):
+        return self._respond('GET', uri, **kwargs)
+
+    def post(self, uri, **kwargs):
+        return self._respond('POST', uri, **kwargs)
+
+    def put(self, uri, **kwargs):
+        return self._respond('PUT', uri, **kwargs)
+
+    def patch(self, uri, **kwargs):
+        return self._respond('PATCH', uri, **kwargs)
+
+    def delete(self, uri, **kwargs):
+        return self._respond('DELETE', uri, **kwargs)
+
+
+def fake_management_root(router, tmos_version='13.1.0'):
+    session = FakeSession(router)
+    with mock.patch('f5.bigip.iControlRESTSession', return_value=session):
+        with mock.patch.object(ManagementRoot, 'post_configuration_setup'):
+            mgmt = ManagementRoot('bench.local', 'admin', 'admin')
+    mgmt._meta_data['tmos_version'] = tmos_version
+    return mgmt
+
+
+def pool_items(count, partition='Common'):
+    items = []
+    for i in range(count):
+        name = 'pool_%d' % i
+        items.append({
+            'kind': 'tm:ltm:pool:poolstate',
+            'name': name,
+            'partition': partition,
+            'fullPath': '/%s/%s' % (partition, name),
+            'generation': 1,
+            'selfLink': 'https://localhost/mgmt/tm/ltm/pool/~%s~%s'
+                        '?ver=13.1.0' % (partition, name),
+            'allowNat': 'yes',
+            'allowSnat': 'yes',
+            'ignorePersistedWeight': 'disabled',
+            'loadBalancingMode': 'round-robin',
+            'minActiveMembers': 0,
+            'minUpMembers': 0,
+            'minUpMembersAction': 'failover',
+            'minUpMembersChecking': 'disabled',
+            'monitor': '/Common/http ',
+            'queueDepthLimit': 0,
+            'queueOnConnectionLimit': 'disabled',
+            'queueTimeLimit': 0,
+            'reselectTries': 0,
+            'serviceDownAction': 'none',
+            'slowRampTime': 10,
+            'membersReference': {
+                'link': 'https://localhost/mgmt/tm/ltm/pool/~%s~%s/members'
+                        '?ver=13.1.0' % (partition, name),
+                'isSubcollection': True
+            }
+        })
+    return items
+
+
+def best_of(func, repeat=5, number=1):
+    """Return the best wall-clock time, in seconds, of ``func()``."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def report(title, rows):
+    """Print ``(label, seconds)`` rows relative to the first one."""
+    print(title)
+    baseline = rows[0][1]
+    for label, seconds in rows:
+        print('  %-48s %10.2f ms  %6.1fx' % (
+            label, seconds * 1000, baseline / seconds if seconds else 0))
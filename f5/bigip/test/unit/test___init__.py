@@ -14,6 +14,9 @@
 
 import mock
 import pytest
+import requests
+import subprocess
+import sys
 try:
     import urlparse
 except ImportError:
@@ -31,6 +34,10 @@ from f5.bigip.tm.shared import Shared
 from f5.bigip.tm.sys import Sys
 from f5.bigip.tm.util import Util
 from f5.bigip.tm.vcmp import Vcmp
+from f5.utils.cache import ResourceCache
+from f5.utils.json_codec import JSONCodec
+from f5.utils.metrics import RequestMetrics
+from f5.utils.retry import RetryPolicy
 
 
 @pytest.fixture
@@ -98,3 +105,72 @@ def test_non_default_port_number(FakeBigIPWithPort):
 def test_proxy(FakeBigIPWithProxy):
     proxy = FakeBigIPWithProxy._meta_data['proxies']
     assert proxy == {"https": "https://127.0.0.1:8080"}
+
+
+def test_retry_policy(fakeicontrolsession):
+    default = ManagementRoot('FakeHostName', 'admin', 'admin')
+    assert isinstance(default.retry_policy, RetryPolicy)
+    policy = RetryPolicy(max_attempts=2)
+    custom = ManagementRoot('FakeHostName', 'admin', 'admin',
+                            retry_policy=policy)
+    assert custom.retry_policy is policy
+    assert custom.tm.ltm.pools._get_retry_policy() is policy
+
+
+def test_cache(fakeicontrolsession):
+    assert ManagementRoot('FakeHostName', 'admin', 'admin').cache is None
+    cache = ResourceCache()
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin', cache=cache)
+    assert mgmt.cache is cache
+    assert mgmt.tm.ltm.pools._get_cache() is cache
+    assert cache.codec is mgmt.json_codec
+
+
+def test_json_codec(fakeicontrolsession):
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin')
+    assert mgmt.json_codec.is_stdlib
+    codec = JSONCodec()
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin', json_codec=codec)
+    assert mgmt.tm.ltm.pools._get_json_codec() is codec
+
+
+def test_metrics(fakeicontrolsession):
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin')
+    assert isinstance(mgmt.metrics, RequestMetrics)
+    session = mgmt._meta_data['icr_session']
+    session.get.return_value = mock.MagicMock(
+        status_code=200, content=b'{"kind": "tm:ltm:pool:poolstate", '
+                                 b'"selfLink": "https://localhost/mgmt/tm/'
+                                 b'ltm/pool/~Common~web"}')
+    events = []
+    mgmt.add_request_hook(after=events.append)
+    mgmt.tm.ltm.pools.pool.load(name='web', partition='Common')
+    mgmt.remove_request_hook(events.append)
+    mgmt.tm.ltm.pools.pool.load(name='web', partition='Common')
+    assert [(e.method, e.endpoint) for e in events] == [
+        ('get', 'tm/ltm/pool/{name}')]
+    assert mgmt.metrics.histogram('tm/ltm/pool/{name}', 'get').count == 2
+
+
+def test_debug_history(fakeicontrolsession):
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin', debug_history=2)
+    hook = mgmt.icrs.session.hooks['response'].append.call_args[0][0]
+    request = requests.Request(
+        'GET', 'https://FakeHostName/mgmt/tm/ltm/pool/').prepare()
+    hook(mock.MagicMock(request=request))
+    assert mgmt.debug_output == []
+    mgmt.debug = True
+    for _ in range(3):
+        hook(mock.MagicMock(request=request))
+    assert mgmt.debug_output == [
+        'curl -k -X GET https://fakehostname/mgmt/tm/ltm/pool/'] * 2
+    # The session's own, unbounded, trace stays off.
+    assert mgmt.icrs.debug is not True
+
+
+def test_import_does_not_need_futures():
+    # concurrent.futures is a backport on Python 2, only transfers and
+    # transaction plans use it.
+    script = ('import sys, f5.bigip, f5.bigip.mixins; '
+              'sys.exit("concurrent.futures" in sys.modules)')
+    assert subprocess.call([sys.executable, '-c', script]) == 0
@@ -0,0 +1,159 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+import threading
+import time
+
+from f5.bigip import ManagementRoot
+from f5.bigip.tm.ltm.pool import Pool
+from f5.bigip.tm.ltm.pool import Pools
+from f5.multi_device.fleet import RateLimitedAdapter
+from f5.multi_device.fleet import RateLimiter
+from requests.adapters import HTTPAdapter
+
+asyncio = pytest.importorskip('asyncio')
+aio = pytest.importorskip('f5.bigip.aio')
+
+
+class Response(object):
+    def __init__(self, body):
+        self.body = body
+        self.status_code = 200
+
+    def json(self):
+        return dict(self.body)
+
+
+def pool_json(name):
+    return {'kind': 'tm:ltm:pool:poolstate', 'name': name,
+            'partition': 'Common', 'generation': 1,
+            'selfLink': 'https://localhost/mgmt/tm/ltm/pool/~Common~%s'
+                        '?ver=11.6.0' % name}
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+@pytest.fixture
+def amgmt(fakeicontrolsession):
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin')
+    amgmt = aio.AsyncManagementRoot(mgmt, max_workers=2)
+    yield amgmt
+    amgmt.close()
+
+
+def test_proxies_object_tree(amgmt):
+    pools = amgmt.tm.ltm.pools
+    assert isinstance(pools, aio.AsyncProxy)
+    assert isinstance(pools.sync, Pools)
+    assert isinstance(pools.pool.sync, Pool)
+    assert pools.sync._meta_data['uri'].endswith('/mgmt/tm/ltm/pool/')
+
+
+def test_connection_pool_sized_to_workers(fakeicontrolsession):
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin')
+    session = mgmt._meta_data['icr_session'].session
+    adapter = HTTPAdapter()
+    session.get_adapter.return_value = adapter
+    aio.AsyncManagementRoot(mgmt, max_workers=2).close()
+    assert session.mount.call_count == 0
+    assert adapter._pool_maxsize == 2
+    assert adapter._pool_block is True
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == 2
+
+
+def test_connection_pool_keeps_wrapping_adapter(fakeicontrolsession):
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin')
+    session = mgmt._meta_data['icr_session'].session
+    adapter = HTTPAdapter()
+    session.get_adapter.return_value = RateLimitedAdapter(
+        adapter, RateLimiter(10))
+    aio.AsyncManagementRoot(mgmt, max_workers=2).close()
+    assert session.mount.call_count == 0
+    assert adapter._pool_maxsize == 2
+
+
+def test_load_returns_awaitable(amgmt, loop):
+    session = amgmt.sync._meta_data['icr_session']
+    session.get.return_value = Response(pool_json('web'))
+    pool = loop.run_until_complete(
+        amgmt.tm.ltm.pools.pool.load(name='web', partition='Common'))
+    assert isinstance(pool, aio.AsyncProxy)
+    assert isinstance(pool.sync, Pool)
+    assert pool.name == 'web'
+    pool.description = 'set through the proxy'
+    assert pool.sync.description == 'set through the proxy'
+
+
+def test_concurrent_requests_bounded_by_workers(amgmt, loop):
+    session = amgmt.sync._meta_data['icr_session']
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    def get(uri, **kwargs):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.01)
+        with lock:
+            state['active'] -= 1
+        return Response(pool_json(kwargs['name']))
+    session.get.side_effect = get
+    pool = amgmt.tm.ltm.pools.pool
+    names = ['p%s' % i for i in range(8)]
+    loaded = loop.run_until_complete(asyncio.gather(
+        *[pool.load(name=n, partition='Common') for n in names]))
+    assert [p.name for p in loaded] == names
+    assert state['peak'] == 2
+
+
+def test_errors_propagate(amgmt, loop):
+    session = amgmt.sync._meta_data['icr_session']
+    session.get.side_effect = ValueError('boom')
+    with pytest.raises(ValueError):
+        loop.run_until_complete(
+            amgmt.tm.ltm.pools.pool.load(name='web', partition='Common'))
+
+
+def test_iter_collection_async_iterator(amgmt, loop):
+    session = amgmt.sync._meta_data['icr_session']
+    session.get.return_value = Response(
+        {'items': [pool_json('a'), pool_json('b')]})
+    iterator = amgmt.tm.ltm.pools.iter_collection(page_size=10)
+    assert iterator.__aiter__() is iterator
+    names = []
+    while True:
+        try:
+            names.append(loop.run_until_complete(iterator.__anext__()).name)
+        except StopAsyncIteration:  # NOQA
+            break
+    assert names == ['a', 'b']
+
+
+def test_connect(loop, fakeicontrolsession):
+    with mock.patch.object(ManagementRoot, 'post_configuration_setup'):
+        amgmt = loop.run_until_complete(aio.AsyncManagementRoot.connect(
+            'FakeHostName', 'admin', 'admin', max_workers=4))
+    assert isinstance(amgmt, aio.AsyncManagementRoot)
+    assert isinstance(amgmt.sync, ManagementRoot)
+    amgmt.close()
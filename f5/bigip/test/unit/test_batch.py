@@ -0,0 +1,211 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+
+from f5.bigip.batch import Batch
+from f5.bigip.resource import Collection
+from f5.bigip.resource import Resource
+from f5.sdk_exception import MissingRequiredReadParameter
+from f5.sdk_exception import TransactionSubmitException
+from f5.sdk_exception import UnsupportedOperation
+
+
+class MockResponse(object):
+    def __init__(self, attr_dict):
+        self.__dict__ = attr_dict
+        self.status_code = 200
+
+    def json(self):
+        return dict(self.__dict__)
+
+
+COMMAND = {'kind': 'tm:transaction:commandsstate',
+           'selfLink': 'https://localhost/mgmt/tm/transaction/1/commands/1'}
+
+
+class Element(Resource):
+    def __init__(self, container):
+        super(Element, self).__init__(container)
+        self._meta_data['allowed_lazy_attributes'] = []
+        self._meta_data['required_json_kind'] = 'tm:elementstate'
+
+
+class FakeTransactionContext(object):
+    commit_error = None
+    entered = 0
+
+    def __init__(self, transaction, validate_only=False):
+        self.validate_only = validate_only
+        self.bigip = transaction._meta_data['bigip']
+
+    def __enter__(self):
+        FakeTransactionContext.entered += 1
+        return self.bigip
+
+    def bind(self, resource):
+        return resource._rebind(self.bigip)
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        if exc_tb is None and self.commit_error:
+            raise TransactionSubmitException(self.commit_error)
+
+
+def element_collection():
+    """A collection of Elements whose writes all succeed."""
+    c = Collection(mock.MagicMock())
+    c._meta_data['attribute_registry'] = {'tm:elementstate': Element}
+    c._meta_data['uri'] = 'https://TESTDOMAIN:443/mgmt/tm/elements/'
+    attrs = {'post.return_value': MockResponse(COMMAND),
+             'patch.return_value': MockResponse(COMMAND),
+             'delete.return_value': MockResponse(COMMAND)}
+    session = mock.MagicMock(**attrs)
+    c._meta_data['bigip']._meta_data = {
+        'icr_session': session,
+        'hostname': 'TESTDOMAINNAME',
+        'uri': 'https://TESTDOMAIN:443/mgmt/tm/'
+    }
+    c._meta_data['bigip'].tm.transactions.transaction._meta_data = {
+        'bigip': c._meta_data['bigip']}
+    return c
+
+
+@pytest.fixture
+def fake_collection(monkeypatch):
+    FakeTransactionContext.commit_error = None
+    FakeTransactionContext.entered = 0
+    monkeypatch.setattr('f5.bigip.batch.TransactionContextManager',
+                        FakeTransactionContext)
+    return element_collection()
+
+
+def test_batch_from_collection(fake_collection):
+    b = fake_collection.batch()
+    assert isinstance(b, Batch)
+    assert len(b) == 0
+
+
+def test_batch_ambiguous_resource_class(fake_collection):
+    fake_collection._meta_data['attribute_registry']['tm:other'] = Resource
+    with pytest.raises(UnsupportedOperation):
+        fake_collection.batch()
+    b = fake_collection.batch(resource_class=Element)
+    assert len(b) == 0
+
+
+def test_batch_requires_name(fake_collection):
+    b = fake_collection.batch()
+    with pytest.raises(MissingRequiredReadParameter):
+        b.modify(partition='Common', description='no name')
+    with pytest.raises(MissingRequiredReadParameter):
+        b.delete(partition='Common')
+
+
+def test_batch_submit(fake_collection):
+    session = fake_collection._meta_data['bigip']._meta_data['icr_session']
+    b = fake_collection.batch()
+    b.create(partition='Common', name='a')
+    b.modify(partition='Common', name='b', description='changed')
+    b.delete(partition='Common', name='c')
+    items = b.submit()
+    assert FakeTransactionContext.entered == 1
+    assert all(item.succeeded for item in items)
+    assert session.post.call_args[0][0] == \
+        'https://TESTDOMAIN:443/mgmt/tm/elements/'
+    assert session.post.call_args[1]['json'] == \
+        {'partition': 'Common', 'name': 'a'}
+    assert session.patch.call_args[0][0] == \
+        'https://TESTDOMAIN:443/mgmt/tm/elements/~Common~b/'
+    assert session.patch.call_args[1]['json'] == {'description': 'changed'}
+    assert session.delete.call_args[0][0] == \
+        'https://TESTDOMAIN:443/mgmt/tm/elements/~Common~c/'
+
+
+def test_batch_submit_chunked(fake_collection):
+    b = fake_collection.batch()
+    for i in range(5):
+        b.create(partition='Common', name='n%s' % i)
+    b.submit(chunk_size=2)
+    assert FakeTransactionContext.entered == 3
+
+
+def test_batch_commit_error_is_attributed(fake_collection):
+    FakeTransactionContext.commit_error = \
+        '400 Unexpected Error: transaction failed: 01020036:3: ' \
+        'The requested node (/Common/b) was not found.'
+    b = fake_collection.batch()
+    first = b.create(partition='Common', name='a')
+    second = b.modify(partition='Common', name='b', description='x')
+    b.submit()
+    assert not first.succeeded
+    assert not second.succeeded
+    assert 'Rolled back' in str(first.error)
+    assert '/Common/b' in str(second.error)
+
+
+def test_batch_commit_error_matches_whole_path(fake_collection):
+    FakeTransactionContext.commit_error = \
+        '400 Unexpected Error: transaction failed: 01070734:3: ' \
+        'Configuration error: invalid monitor for /Common/pool10.'
+    b = fake_collection.batch()
+    short = b.create(partition='Common', name='pool1')
+    full = b.create(partition='Common', name='pool10')
+    b.submit()
+    assert 'Rolled back' in str(short.error)
+    assert '/Common/pool10' in str(full.error)
+    assert 'Rolled back' not in str(full.error)
+
+
+def test_batch_queue_error_aborts_chunk(fake_collection):
+    b = fake_collection.batch()
+    first = b.create(partition='Common', name='a')
+    bad = b.create(partition='Common')
+    b.submit()
+    assert first.result is None
+    assert isinstance(first.error, TransactionSubmitException)
+    assert 'Missing required params' in str(bad.error)
+
+
+def test_collection_upsert(fake_collection):
+    session = fake_collection._meta_data['bigip']._meta_data['icr_session']
+    session.get.return_value = MockResponse({'items': [
+        {'partition': 'Common', 'name': 'same', 'description': 'd'},
+        {'partition': 'Common', 'name': 'old', 'description': 'd',
+         'global': 1}]})
+    items = fake_collection.upsert([
+        {'partition': 'Common', 'name': 'same', 'description': 'd'},
+        {'partition': 'Common', 'name': 'old', 'description': 'x',
+         'global_': 1},
+        {'partition': 'Common', 'name': 'new', 'description': 'd'}])
+    assert [item.action for item in items] == \
+        ['unchanged', 'modify', 'create']
+    assert all(item.succeeded for item in items)
+    assert session.get.call_count == 1
+    assert session.get.call_args[1]['params']['$select'] == \
+        'description,fullPath,global,name,partition,subPath'
+    assert session.patch.call_args[1]['json'] == {'description': 'x'}
+    assert session.post.call_args[1]['json'] == \
+        {'partition': 'Common', 'name': 'new', 'description': 'd'}
+    assert FakeTransactionContext.entered == 1
+
+
+def test_collection_upsert_nothing_to_do(fake_collection):
+    session = fake_collection._meta_data['bigip']._meta_data['icr_session']
+    session.get.return_value = MockResponse({'items': [
+        {'partition': 'Common', 'name': 'same'}]})
+    items = fake_collection.upsert([{'partition': 'Common', 'name': 'same'}])
+    assert items[0].result == {'partition': 'Common', 'name': 'same'}
+    assert FakeTransactionContext.entered == 0
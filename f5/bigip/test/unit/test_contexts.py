@@ -0,0 +1,100 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+
+from f5.bigip import ManagementRoot
+from f5.bigip.contexts import TransactionContextManager
+from f5.sdk_exception import TransactionSubmitException
+
+
+class MockResponse(object):
+    def __init__(self, attr_dict):
+        self.__dict__ = attr_dict
+        self.status_code = 200
+
+    def json(self):
+        return dict(self.__dict__)
+
+
+@pytest.fixture
+def mgmt(fakeicontrolsession):
+    b = ManagementRoot('192.168.1.1', 'admin', 'admin')
+    session = b._meta_data['icr_session']
+    session.get = mock.MagicMock(return_value=MockResponse({'items': []}))
+    return b
+
+
+def _transaction(bigip, trans_id):
+    tx = mock.MagicMock()
+    tx._meta_data = {'bigip': bigip}
+    tx.create.return_value.transId = trans_id
+    return tx
+
+
+def _headers(session):
+    return session.get.call_args[1].get('headers')
+
+
+def test_requests_are_scoped_to_the_transaction(mgmt):
+    session = mgmt._meta_data['icr_session']
+    tx1 = _transaction(mgmt, 1)
+    tx2 = _transaction(mgmt, 2)
+    with TransactionContextManager(tx1) as api1:
+        with TransactionContextManager(tx2) as api2:
+            assert api1 is not mgmt
+            api1.tm.ltm.pools.get_collection()
+            assert _headers(session) == {'X-F5-REST-Coordination-Id': '1'}
+            api2.tm.ltm.pools.get_collection()
+            assert _headers(session) == {'X-F5-REST-Coordination-Id': '2'}
+            mgmt.tm.ltm.pools.get_collection()
+            assert _headers(session) is None
+    assert not session.session.headers.update.called
+    tx1.create.return_value.modify.assert_called_once_with(
+        state='VALIDATING', validateOnly=False)
+    # The transaction's objects act as ordinary ones afterwards.
+    api1.tm.ltm.pools.get_collection()
+    assert _headers(session) == {}
+
+
+def test_bind(mgmt):
+    session = mgmt._meta_data['icr_session']
+    pools = mgmt.tm.ltm.pools
+    context = TransactionContextManager(_transaction(mgmt, 7))
+    with context:
+        bound = context.bind(pools)
+        bound.get_collection()
+        assert _headers(session) == {'X-F5-REST-Coordination-Id': '7'}
+        pools.get_collection()
+        assert _headers(session) is None
+    assert bound._meta_data['uri'] == pools._meta_data['uri']
+    assert pools._meta_data['bigip'] is mgmt
+
+
+def test_commit_failure(mgmt):
+    tx = _transaction(mgmt, 3)
+    tx.create.return_value.modify.side_effect = ValueError('invalid')
+    with pytest.raises(TransactionSubmitException):
+        with TransactionContextManager(tx):
+            pass
+
+
+def test_no_commit_on_error(mgmt):
+    tx = _transaction(mgmt, 4)
+    with pytest.raises(KeyError):
+        with TransactionContextManager(tx):
+            raise KeyError('x')
+    assert not tx.create.return_value.modify.called
@@ -0,0 +1,101 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import copy
+import mock
+import pytest
+
+from f5.bigip.metadata import compact_values
+from f5.bigip.metadata import MetaData
+from f5.bigip.metadata import peek
+from f5.bigip.tm.ltm.pool import Pools
+
+
+@pytest.fixture
+def meta():
+    return MetaData({'uri': 'u'}, {'allowed_commands': ['run'],
+                                   'minimum_version': '11.5.0'})
+
+
+def test_reads_fall_back_to_shared(meta):
+    assert meta['minimum_version'] == '11.5.0'
+    assert 'allowed_commands' in meta
+    assert meta.get('missing', 1) == 1
+    with pytest.raises(KeyError):
+        meta['missing']
+    assert sorted(meta) == ['allowed_commands', 'minimum_version', 'uri']
+    assert len(meta) == 3
+    assert meta == {'uri': 'u', 'allowed_commands': ['run'],
+                    'minimum_version': '11.5.0'}
+
+
+def test_mutable_values_are_copied_on_read(meta):
+    shared = meta.shared['allowed_commands']
+    assert peek(meta, 'allowed_commands') is shared
+    meta['allowed_commands'].append('load')
+    assert meta['allowed_commands'] == ['run', 'load']
+    assert shared == ['run']
+
+
+def test_writes_and_deletes_stay_local(meta):
+    shared = meta.shared
+    meta['minimum_version'] = '12.0.0'
+    assert shared['minimum_version'] == '11.5.0'
+    meta.pop('minimum_version')
+    del meta['allowed_commands']
+    assert 'minimum_version' not in meta
+    assert 'allowed_commands' not in meta
+    assert shared == {'allowed_commands': ['run'],
+                      'minimum_version': '11.5.0'}
+    assert meta.setdefault('minimum_version', '13.0.0') == '13.0.0'
+
+
+def test_copies(meta):
+    assert copy.deepcopy(meta) == meta
+    duplicate = meta.copy()
+    duplicate['uri'] = 'other'
+    assert meta['uri'] == 'u'
+
+
+def test_compact_values_interns_short_strings():
+    first = compact_values({'state': ''.join(['up']),
+                            'nested': {'list': [''.join(['up']), 1]}})
+    second = compact_values({'state': ''.join(['up'])})
+    assert first['state'] is second['state']
+    assert first['nested']['list'][0] is second['state']
+
+
+def _loaded_pools(names):
+    ltm = mock.MagicMock()
+    ltm._meta_data = {'bigip': mock.MagicMock(), 'icontrol_version': '',
+                      'icr_session': mock.MagicMock(),
+                      'uri': 'https://host/mgmt/tm/ltm/'}
+    pools = Pools(ltm)
+    return [pools._instantiate_item({
+        'kind': 'tm:ltm:pool:poolstate', 'name': name,
+        'selfLink': 'https://localhost/mgmt/tm/ltm/pool/~Common~%s'
+                    '?ver=13.1.0' % name}) for name in names]
+
+
+def test_hydrated_resources_share_meta_data():
+    first, second = _loaded_pools(['a', 'b'])
+    assert isinstance(first._meta_data, MetaData)
+    assert first._meta_data.shared is second._meta_data.shared
+    assert 'required_creation_parameters' not in dict.keys(first._meta_data)
+    assert first._meta_data['uri'].endswith('~Common~a/')
+    assert first._meta_data['creation_uri_qargs'] == {'ver': ['13.1.0']}
+    first._meta_data['required_creation_parameters'].update(('x',))
+    assert 'x' not in second._meta_data['required_creation_parameters']
+    assert first.members_s._meta_data['uri'].endswith('~Common~a/members/')
@@ -23,10 +23,12 @@ import struct
 from f5.bigip.mixins import AsmFileMixin
 from f5.bigip.mixins import CommandExecutionMixin
 from f5.bigip.mixins import ToDictMixin
+from f5.bigip.mixins import version_key
 from f5.bigip.resource import Resource
 from f5.sdk_exception import EmptyContent
 from f5.sdk_exception import MissingHttpHeader
 from f5.sdk_exception import UnsupportedMethod
+from f5.sdk_exception import UnsupportedTmosVersion
 
 from requests import HTTPError
 
@@ -238,3 +240,46 @@ class TestAsmFileMixin(object):
             dwnld._download_file('fakefile.txt')
             msg = "The Content-Length header is not present."
             assert err.value.message == msg
+
+
+def test_version_key_orders_like_loose_version():
+    ordered = ['11.5.4', '11.6.0', '11.6.0.1', '12.0.0', '12.1.0a',
+               '12.1.1', '13.1.0', '13.1.0.5']
+    assert sorted(reversed(ordered), key=version_key) == ordered
+    assert version_key('11.6.0') == version_key(u'11.6.0')
+
+
+class TestLazyAttributeMixin(object):
+    def _pools(self, tmos_version='13.1.0'):
+        from f5.bigip.tm.ltm.pool import Pools
+        bigip = mock.MagicMock()
+        bigip.tmos_version = tmos_version
+        ltm = mock.MagicMock()
+        ltm._meta_data = {'bigip': bigip, 'icr_session': mock.MagicMock(),
+                          'uri': 'https://host/mgmt/tm/ltm/',
+                          'icontrol_version': '', 'minimum_version': '11.5.0'}
+        return Pools(ltm)
+
+    def test_dispatch_map_is_shared(self):
+        first, second = self._pools(), self._pools()
+        assert first.pool.__class__.__name__ == 'Pool'
+        assert first._lazy_attribute_map() is second._lazy_attribute_map()
+        assert 'pool' in first.transform_attr_names()
+        with pytest.raises(AttributeError):
+            first.nonexistent
+
+    def test_dispatch_map_follows_allowed_list(self):
+        pools = self._pools()
+        pools._lazy_attribute_map()
+        pools._meta_data['allowed_lazy_attributes'] = []
+        with pytest.raises(AttributeError):
+            pools.pool
+
+    def test_minimum_version_enforced(self):
+        pools = self._pools('11.4.0')
+        attribute = mock.MagicMock()
+        attribute._meta_data = {'minimum_version': '11.5.0', 'uri': 'u'}
+        with pytest.raises(UnsupportedTmosVersion):
+            pools._check_supported_versions(pools, attribute)
+        pools._meta_data['bigip'].tmos_version = '11.5.0'
+        pools._check_supported_versions(pools, attribute)
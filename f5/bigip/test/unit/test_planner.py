@@ -0,0 +1,157 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+import threading
+
+from f5.bigip.planner import TransactionPlanner
+from f5.bigip.test.unit.test_batch import element_collection
+from f5.bigip.test.unit.test_batch import \
+    FakeTransactionContext as BatchTransactionContext
+from f5.bigip.tm.transaction import Transactions
+from f5.sdk_exception import InvalidTransactionPlan
+from f5.sdk_exception import TransactionSubmitException
+
+
+class FakeTransactionContext(BatchTransactionContext):
+    """Validates only, one per transaction, with the commands it queued."""
+    lock = threading.Lock()
+    opened = []
+    validation_errors = {}
+
+    def __init__(self, transaction, validate_only=False):
+        assert validate_only
+        super(FakeTransactionContext, self).__init__(transaction,
+                                                     validate_only)
+        with self.lock:
+            trans_id = len(self.opened) + 1
+            self.opened.append(self)
+        self.commands = []
+        self.transaction = mock.MagicMock(transId=trans_id)
+        self.transaction.commands_s.get_collection.side_effect = \
+            lambda as_dicts: [{'commandId': i + 1, 'evalOrder': i + 1}
+                              for i in range(len(self.commands))]
+
+    def bind(self, resource):
+        self.commands.append(resource)
+        return super(FakeTransactionContext, self).bind(resource)
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        error = self.validation_errors.get(self.transaction.transId)
+        if exc_tb is None and error:
+            raise TransactionSubmitException(error)
+
+
+@pytest.fixture
+def plan(monkeypatch):
+    FakeTransactionContext.opened = []
+    FakeTransactionContext.validation_errors = {}
+    monkeypatch.setattr('f5.bigip.planner.TransactionContextManager',
+                        FakeTransactionContext)
+    c = element_collection()
+    transactions = mock.MagicMock()
+    transactions.transaction._meta_data = {'bigip': c._meta_data['bigip']}
+    return TransactionPlanner(transactions, chunk_size=2), c
+
+
+def test_plan_from_transactions():
+    transactions = Transactions(mock.MagicMock())
+    planner = transactions.plan(chunk_size=10, max_workers=2)
+    assert isinstance(planner, TransactionPlanner)
+    assert planner.chunk_size == 10
+    with pytest.raises(InvalidTransactionPlan):
+        transactions.plan(chunk_size=0)
+
+
+def test_stages_keep_dependency_order(plan):
+    planner, c = plan
+    a = planner.create(c, partition='Common', name='a')
+    b = planner.create(c, partition='Common', name='b')
+    d = planner.modify(c, partition='Common', name='d', depends_on=[a])
+    e = planner.delete(c, partition='Common', name='e', depends_on=d)
+    f = planner.create(c, partition='Common', name='f')
+    assert planner.stages() == [[[a, b], [f]], [[d]], [[e]]]
+    with pytest.raises(InvalidTransactionPlan):
+        planner.create(c, name='x', depends_on=[object()])
+
+
+def test_submit(plan):
+    planner, c = plan
+    a = planner.create(c, partition='Common', name='a')
+    planner.create(c, partition='Common', name='b')
+    planner.create(c, partition='Common', name='c')
+    planner.modify(c, partition='Common', name='a', description='x',
+                   depends_on=[a])
+    items = planner.submit()
+    assert [item.status for item in items] == ['committed'] * 4
+    assert all(item.succeeded for item in items)
+    contexts = FakeTransactionContext.opened
+    assert len(contexts) == 3
+    for context in contexts:
+        context.transaction.modify.assert_called_once_with(
+            state='VALIDATING', validateOnly=False)
+    assert items[1].command == {'commandId': 2, 'evalOrder': 2}
+    assert items[3].transaction_id == 3
+
+
+def test_validate_only(plan):
+    planner, c = plan
+    planner.create(c, partition='Common', name='a')
+    items = planner.submit(validate_only=True)
+    assert items[0].status == 'validated'
+    assert not FakeTransactionContext.opened[0].transaction.modify.called
+
+
+def test_validation_failure(plan):
+    planner, c = plan
+    FakeTransactionContext.validation_errors = {
+        1: '01020066:3: The requested Pool (/Common/b) already exists'}
+    a = planner.create(c, partition='Common', name='a')
+    planner.create(c, partition='Common', name='b')
+    planner.create(c, partition='Common', name='c')
+    planner.modify(c, partition='Common', name='a', depends_on=[a])
+    items = planner.submit()
+    assert [item.status for item in items] == [
+        'rolled_back', 'failed', 'committed', 'skipped']
+    assert 'already exists' in str(items[1].error)
+    assert not FakeTransactionContext.opened[0].transaction.modify.called
+
+
+def test_queue_failure(plan):
+    planner, c = plan
+    session = c._meta_data['bigip']._meta_data['icr_session']
+    session.patch.side_effect = ValueError('bad patch')
+    planner.create(c, partition='Common', name='a')
+    planner.modify(c, partition='Common', name='b', description='x')
+    items = planner.submit()
+    assert [item.status for item in items] == ['rolled_back', 'failed']
+    assert str(items[1].error) == 'bad patch'
+
+
+def test_commit_failure(plan):
+    planner, c = plan
+    planner.create(c, partition='Common', name='a')
+    original = FakeTransactionContext.__init__
+
+    def failing_commit(self, transaction, validate_only=False):
+        original(self, transaction, validate_only)
+        self.transaction.modify.side_effect = ValueError('timeout')
+
+    with mock.patch.object(FakeTransactionContext, '__init__',
+                           failing_commit):
+        items = planner.submit()
+    assert items[0].status == 'failed'
+    assert 'timeout' in str(items[0].error)
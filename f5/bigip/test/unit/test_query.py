@@ -0,0 +1,133 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+
+from f5.bigip.mixins import CheckExistenceMixin
+from f5.bigip.query import CollectionQuery
+from f5.bigip.resource import Collection
+from f5.bigip.resource import Resource
+from f5.sdk_exception import InvalidQuery
+
+
+class MockResponse(object):
+    def __init__(self, attr_dict):
+        self.__dict__ = attr_dict
+        self.status_code = 200
+
+    def json(self):
+        return dict(self.__dict__)
+
+
+class Element(Resource, CheckExistenceMixin):
+    def __init__(self, container):
+        super(Element, self).__init__(container)
+        self._meta_data['allowed_lazy_attributes'] = []
+        self._meta_data['required_json_kind'] = 'tm:elementstate'
+
+
+def _items(*names):
+    return [{'kind': 'tm:elementstate', 'name': name, 'partition': 'Common',
+             'selfLink': 'https://localhost/mgmt/tm/elements/~Common~%s' %
+             name} for name in names]
+
+
+def _collection(*pages):
+    c = Collection(mock.MagicMock())
+    c._meta_data['attribute_registry'] = {'tm:elementstate': Element}
+    c._meta_data['uri'] = 'https://TESTDOMAIN:443/mgmt/tm/elements/'
+    c._meta_data['icontrol_version'] = ''
+    session = mock.MagicMock()
+    session.get.side_effect = [MockResponse(p) for p in pages]
+    c._meta_data['bigip']._meta_data = {
+        'icr_session': session,
+        'hostname': 'TESTDOMAINNAME',
+        'uri': 'https://TESTDOMAIN:443/mgmt/tm/'
+    }
+    return c, session
+
+
+def test_params():
+    c, session = _collection()
+    query = c.query().where(partition='Common').select('name', 'monitor')
+    assert isinstance(query, CollectionQuery)
+    assert query.top(500).params() == {'$filter': 'partition eq Common',
+                                       '$select': 'name,monitor',
+                                       '$top': 500}
+    assert query.params() == {'$filter': 'partition eq Common',
+                              '$select': 'name,monitor'}
+    assert c.query().params() == {}
+
+
+def test_where_literals():
+    query = CollectionQuery(None).where(
+        "name ne 'x'", partition_='Common', enabled=True, ratio=2,
+        description="it's on")
+    assert query.params()['$filter'] == (
+        "name ne 'x' and description eq 'it''s on' and enabled eq true "
+        "and partition eq Common and ratio eq 2")
+
+
+@pytest.mark.parametrize('call', [
+    lambda q: q.where(members=['a']),
+    lambda q: q.where(''),
+    lambda q: q.top(-1),
+    lambda q: q.skip('10'),
+])
+def test_invalid(call):
+    with pytest.raises(InvalidQuery):
+        call(CollectionQuery(None))
+
+
+def test_get():
+    c, session = _collection({'items': _items('a', 'b')})
+    result = c.query().where(partition='Common').select('name').get()
+    assert [r.name for r in result] == ['a', 'b']
+    assert session.get.call_args[1]['params'] == {
+        '$filter': 'partition eq Common',
+        '$select': 'name,kind,selfLink'}
+
+
+def test_first_as_dicts():
+    c, session = _collection({'items': _items('a')}, {'items': []})
+    assert c.query().select('name').first(as_dicts=True)['name'] == 'a'
+    assert session.get.call_args[1]['params'] == {'$select': 'name',
+                                                  '$top': 1}
+    assert c.query().first() is None
+
+
+def test_iter_pages_within_top_and_skip():
+    c, session = _collection({'items': _items('c', 'd')},
+                             {'items': _items('e', 'f')})
+    query = c.query().where(partition='Common').skip(2).top(3)
+    assert [r.name for r in query.iter(page_size=2)] == ['c', 'd', 'e']
+    params = [call[1]['params'] for call in session.get.call_args_list]
+    assert params == [
+        {'$filter': 'partition eq Common', '$top': 2, '$skip': 2},
+        {'$filter': 'partition eq Common', '$top': 2, '$skip': 4}]
+
+
+def test_check_existence_selects_names():
+    c, session = _collection({'items': _items('a', 'b')},
+                             {'items': _items('a', 'b')})
+    element = Element(c)
+    assert element._check_existence_by_collection(c, 'b', partition='Common')
+    assert session.get.call_args[1]['params'] == {
+        '$filter': 'partition eq Common',
+        '$select': 'name,kind,selfLink'}
+    # Items the device did not filter out are still checked by name.
+    assert element._return_object(c, 'z') is None
+    assert session.get.call_args[1]['params'] == {}
@@ -21,11 +21,14 @@ except ImportError as exc:
         message = ("Maybe you're using Python < 2.7 and do not have the "
                    "orderreddict external dependency installed.")
         raise exc(message)
+import json
 import mock
 import pytest
 import requests
 
+from f5.bigip import ManagementRoot
 from f5.bigip.resource import _missing_required_parameters
+from f5.bigip.resource import DEFAULT_RETRY_POLICY
 from f5.bigip.resource import AsmResource
 from f5.bigip.resource import Collection
 from f5.bigip.resource import OrganizingCollection
@@ -45,6 +48,7 @@ from f5.sdk_exception import BooleansToReduceHaveSameValue
 from f5.sdk_exception import DeviceProvidesIncompatibleKey
 from f5.sdk_exception import ExclusiveAttributesPresent
 from f5.sdk_exception import GenerationMismatch
+from f5.sdk_exception import InvalidConflictPolicy
 from f5.sdk_exception import InvalidForceType
 from f5.sdk_exception import InvalidResource
 from f5.sdk_exception import KindTypeMismatch
@@ -56,6 +60,9 @@ from f5.sdk_exception import UnregisteredKind
 from f5.sdk_exception import UnsupportedMethod
 from f5.sdk_exception import UnsupportedOperation
 from f5.sdk_exception import URICreationCollision
+from f5.utils.cache import ResourceCache
+from f5.utils.json_codec import get_codec
+from f5.utils.retry import RetryPolicy
 from icontrol.exceptions import iControlUnexpectedHTTPError
 
 
@@ -559,6 +566,107 @@ class TestResource_modify(object):
         assert msg == str(ex.value)
 
 
+class TestResource_save(object):
+    def _loaded(self, fake_rsrc):
+        fake_rsrc._local_update({'generation': 1, 'description': 'old',
+                                 'records': [{'name': 'a'}],
+                                 'READONLY': 'x'})
+        session = fake_rsrc._meta_data['bigip']._meta_data['icr_session']
+        session.patch.return_value = MockResponse({'generation': 2})
+        return fake_rsrc, session
+
+    def test_nothing_changed(self, fake_rsrc):
+        r, session = self._loaded(fake_rsrc)
+        r.save()
+        assert not session.patch.called
+
+    def test_sends_only_changed_attributes(self, fake_rsrc):
+        r, session = self._loaded(fake_rsrc)
+        r.description = 'new'
+        r.records.append({'name': 'b'})
+        r.READONLY = 'y'
+        r.contained = Collection(mock.MagicMock())
+        assert r._changed_attributes() == \
+            set(['description', 'records', 'READONLY'])
+        r.save(priority=3)
+        assert session.patch.call_args[1]['json'] == {
+            'description': 'new', 'records': [{'name': 'a'}, {'name': 'b'}],
+            'priority': 3}
+        assert r.generation == 2
+        assert r._changed_attributes() == set()
+
+    def test_update_minimal(self, fake_rsrc):
+        r, session = self._loaded(fake_rsrc)
+        r.description = 'new'
+        r.update(minimal=True)
+        assert session.patch.call_args[1]['json'] == {'description': 'new'}
+        assert not session.put.called
+
+    def test_generation_precondition(self, fake_rsrc):
+        r, session = self._loaded(fake_rsrc)
+        r.description = 'new'
+        with pytest.raises(GenerationMismatch):
+            r.save(force=False)
+        assert not session.patch.called
+
+    def test_read_only_kwarg(self, fake_rsrc):
+        r, session = self._loaded(fake_rsrc)
+        with pytest.raises(AttemptedMutationOfReadOnly):
+            r.save(READONLY='y')
+
+
+class TestResource_conflict(object):
+    def _changed_on_device(self, fake_rsrc):
+        fake_rsrc._local_update({'generation': 1, 'description': 'old',
+                                 'ratio': 1})
+        session = fake_rsrc._meta_data['bigip']._meta_data['icr_session']
+        session.get.return_value = MockResponse(
+            {'generation': 5, 'description': 'old', 'ratio': 7})
+        session.patch.return_value = MockResponse({'generation': 6})
+        session.delete.return_value = mock.MagicMock(status_code=200)
+        fake_rsrc.description = 'new'
+        return fake_rsrc, session
+
+    def test_merge(self, fake_rsrc):
+        r, session = self._changed_on_device(fake_rsrc)
+        r.update(force=False, conflict='merge')
+        assert session.put.call_args[1]['json'] == {
+            'generation': 5, 'description': 'new', 'ratio': 7}
+        assert session.get.call_count == 2
+
+    def test_merge_save(self, fake_rsrc):
+        r, session = self._changed_on_device(fake_rsrc)
+        r.save(force=False, conflict='merge')
+        assert session.patch.call_args[1]['json'] == {'description': 'new'}
+
+    def test_last_writer_wins(self, fake_rsrc):
+        r, session = self._changed_on_device(fake_rsrc)
+        r.update(force=False, conflict='last_writer_wins')
+        assert session.put.call_args[1]['json'] == {
+            'generation': 1, 'description': 'new', 'ratio': 1}
+        assert session.get.call_count == 1
+
+    def test_delete(self, fake_rsrc):
+        r, session = self._changed_on_device(fake_rsrc)
+        with pytest.raises(GenerationMismatch):
+            r.delete(force=False)
+        r.delete(force=False, conflict='last_writer_wins')
+        assert r.__dict__ == {'deleted': True}
+
+    def test_invalid_policy(self, fake_rsrc):
+        r, session = self._changed_on_device(fake_rsrc)
+        with pytest.raises(InvalidConflictPolicy):
+            r.update(force=False, conflict='ignore')
+
+    def test_generation_only_read(self, fake_rsrc):
+        r, session = self._changed_on_device(fake_rsrc)
+        r._meta_data['uri'] = 'https://host/mgmt/tm/ltm/pool/~Common~p/'
+        session.get.return_value = MockResponse({'generation': 1})
+        r.save(force=False)
+        assert session.get.call_args[1]['params'] == {
+            '$select': 'generation'}
+
+
 class TestResource_delete(object):
     def test_success(self):
         r = Resource(mock.MagicMock())
@@ -590,6 +698,23 @@ class Element(Resource):
         self._meta_data['allowed_lazy_attributes'] = []
 
 
+def _element_collection(**get):
+    """A Collection of Elements and its session, whose ``get`` is a
+    MagicMock built from ``get``, e.g. ``return_value=...``.
+    """
+    c = Collection(mock.MagicMock())
+    c._meta_data['attribute_registry'] = {'tm:': Element}
+    c._meta_data['uri'] = 'https://TESTDOMAIN:443/mgmt/tm/elements/'
+    session = mock.MagicMock()
+    session.get = mock.MagicMock(**get)
+    c._meta_data['bigip']._meta_data = {
+        'icr_session': session,
+        'hostname': 'TESTDOMAINNAME',
+        'uri': 'https://TESTDOMAIN:443/mgmt/tm/'}
+    c._meta_data['icontrol_version'] = ''
+    return c, session
+
+
 class TestCollection_get_collection(object):
     def test_success(self):
         c = Collection(mock.MagicMock())
@@ -629,6 +754,392 @@ class TestCollection_get_collection(object):
             "'tm:' is not registered!"
 
 
+class TestCollection_get_collection_projection(object):
+    def _collection(self, items):
+        return _element_collection(
+            return_value=MockResponse({"items": items}))
+
+    def test_as_dicts(self):
+        items = [{'name': 'a', 'fullPath': '/Common/a'},
+                 {'name': 'b', 'fullPath': '/Common/b'}]
+        c, session = self._collection(items)
+        result = c.get_collection(select=['name', 'fullPath'], as_dicts=True)
+        assert result == items
+        assert session.get.call_args[1]['params'] == \
+            {'$select': 'name,fullPath'}
+        assert 'items' not in c.__dict__
+
+    def test_select_keeps_kind_for_resources(self):
+        items = [{'kind': 'tm:', 'name': 'a',
+                  'selfLink': 'https://localhost/mgmt/tm/elements/a'}]
+        c, session = self._collection(items)
+        requests_params = {'params': '$filter=partition+eq+Common'}
+        result = c.get_collection(select=['name'],
+                                  requests_params=requests_params)
+        assert isinstance(result[0], Element)
+        assert session.get.call_args[1]['params'] == \
+            '$filter=partition+eq+Common&$select=name,kind,selfLink'
+        assert requests_params == {'params': '$filter=partition+eq+Common'}
+
+
+def _element_items():
+    return [{'kind': 'tm:', 'name': 'e%s' % i, 'global': 'yes',
+             'selfLink': 'https://localhost/mgmt/tm/elements/e%s'
+                         '?ver=13.1.0' % i} for i in range(3)] + \
+        [{'kind': 'tm:', 'name': 'e3',
+          'selfLink': 'https://localhost/mgmt/tm/elements/e3#frag'},
+         {'reference': {'link': 'https://...'}}]
+
+
+class TestCollection_hydrate_items(object):
+    def test_same_result_as_instantiate_item(self):
+        c, session = _element_collection()
+        fast = c._hydrate_items(_element_items())
+        slow = [c._instantiate_item(item) for item in _element_items()]
+        assert fast[-1] == slow[-1] == {'reference': {'link': 'https://...'}}
+        for got, expected in zip(fast[:-1], slow[:-1]):
+            assert type(got) is type(expected)
+            assert got.raw == expected.raw
+        assert fast[2].global_ == 'yes'
+        assert fast[1]._meta_data['uri'] == \
+            'https://TESTDOMAIN:443/mgmt/tm/elements/e1/'
+        assert fast[3]._meta_data['creation_uri_frag'] == 'frag'
+        assert fast[1]._meta_data.shared is fast[2]._meta_data.shared
+        fast[1]._meta_data['allowed_lazy_attributes'].append(Element)
+        assert fast[2]._meta_data['allowed_lazy_attributes'] == [Stats]
+        fast[1].global_ = 'no'
+        assert fast[1]._changed_attributes() == set(['global_'])
+        assert fast[2]._changed_attributes() == set()
+
+    def test_later_items_still_checked(self):
+        c, session = _element_collection()
+        items = _element_items()
+        items[2]['__bad'] = 1
+        with pytest.raises(DeviceProvidesIncompatibleKey):
+            c._hydrate_items(items)
+        items = _element_items()
+        items[2]['kind'] = 'tm:other'
+        with pytest.raises(UnregisteredKind):
+            c._hydrate_items(items)
+
+
+def _http_error(status_code):
+    return requests.exceptions.HTTPError(
+        response=mock.MagicMock(status_code=status_code))
+
+
+class KindElement(Element):
+    def __init__(self, container):
+        super(KindElement, self).__init__(container)
+        self._meta_data['required_json_kind'] = 'tm:'
+
+
+class TestResource_upsert(object):
+    LINK = 'https://localhost/mgmt/tm/elements/~Common~e?ver=13.1.0'
+
+    def _element(self):
+        c, session = _element_collection()
+        return KindElement(c), session
+
+    def _state(self, **attrs):
+        attrs.update(kind='tm:', name='e', partition='Common',
+                     selfLink=self.LINK)
+        return MockResponse(attrs)
+
+    def test_unchanged(self):
+        element, session = self._element()
+        session.get.return_value = self._state(description='d', global_=1)
+        result, changed = element.upsert(name='e', partition='Common',
+                                         description='d', global_=1)
+        assert not changed
+        assert result.description == 'd'
+        select = session.get.call_args[1]['params']['$select'].split(',')
+        assert 'description' in select and 'global' in select
+        assert not session.patch.called and not session.post.called
+
+    def test_patches_differences(self):
+        element, session = self._element()
+        session.get.return_value = self._state(description='d', ratio=1)
+        session.patch.return_value = self._state(description='new', ratio=1)
+        result, changed = element.upsert(name='e', partition='Common',
+                                         description='new', ratio=1)
+        assert changed
+        assert session.patch.call_args[1]['json'] == {'description': 'new'}
+        assert result.description == 'new'
+
+    def test_creates_missing(self):
+        element, session = self._element()
+        session.get.side_effect = _http_error(404)
+        session.post.return_value = self._state(description='new')
+        result, changed = element.upsert(name='e', partition='Common',
+                                         description='new')
+        assert changed
+        assert session.post.call_args[1]['json'] == {
+            'name': 'e', 'partition': 'Common', 'description': 'new'}
+
+    def test_created_concurrently(self):
+        element, session = self._element()
+        session.get.side_effect = [_http_error(404),
+                                   self._state(description='new')]
+        session.post.side_effect = _http_error(409)
+        result, changed = element.upsert(name='e', partition='Common',
+                                         description='new')
+        assert not changed
+        assert session.get.call_count == 2
+
+    def test_other_errors_raised(self):
+        element, session = self._element()
+        session.get.side_effect = _http_error(401)
+        with pytest.raises(requests.exceptions.HTTPError):
+            element.upsert(name='e', partition='Common')
+
+
+class TestCollection_json_codec(object):
+    def _collection(self):
+        body = json.dumps({'kind': 'tm:collectionstate', 'generation': 3,
+                           'items': _element_items()})
+        response = mock.MagicMock()
+        response.iter_content.return_value = [
+            body[i:i + 10].encode('utf-8') for i in range(0, len(body), 10)]
+        c, session = _element_collection(return_value=response)
+        return c, session, response
+
+    def test_stream(self):
+        c, session, response = self._collection()
+        items = c.get_collection(stream=True)
+        assert [getattr(i, 'name', None) for i in items] == \
+            ['e0', 'e1', 'e2', 'e3', None]
+        assert c.generation == 3
+        assert session.get.call_args[1]['stream'] is True
+        assert response.close.called
+
+    def test_stream_as_dicts(self):
+        c, session, response = self._collection()
+        items = c.get_collection(stream=True, as_dicts=True)
+        assert items == _element_items()
+
+    def test_codec_encodes_request_body(self):
+        orjson = pytest.importorskip('orjson')
+        c, session, response = self._collection()
+        c._meta_data['bigip']._meta_data['json_codec'] = get_codec('orjson')
+        c._request('post', c._meta_data['uri'], json={'name': 'e'})
+        assert session.post.call_args[1] == {'data': orjson.dumps(
+            {'name': 'e'})}
+
+
+class TestResource_retry_policy(object):
+    def test_default_policy_without_root_policy(self, fake_rsrc):
+        assert fake_rsrc._get_retry_policy() is DEFAULT_RETRY_POLICY
+
+    def test_root_policy_retries_connection_errors(self, fake_rsrc):
+        policy = RetryPolicy(jitter=False)
+        policy.sleep = mock.MagicMock()
+        session = fake_rsrc._meta_data['bigip']._meta_data['icr_session']
+        session.get.side_effect = [
+            requests.exceptions.ConnectionError('Connection aborted'),
+            MockResponse({"generation": 1})]
+        fake_rsrc._meta_data['bigip']._meta_data['retry_policy'] = policy
+        fake_rsrc.refresh()
+        assert fake_rsrc.generation == 1
+        assert session.get.call_count == 2
+        assert policy.stats['connection_retries'] == 1
+
+
+class TestResource_cache(object):
+    def _pool(self, fakeicontrolsession):
+        cache = ResourceCache()
+        mgmt = ManagementRoot('FakeHostName', 'admin', 'admin', cache=cache)
+        session = mgmt._meta_data['icr_session']
+        session.get.reset_mock()
+        session.get.return_value = MockResponse({
+            'kind': 'tm:ltm:pool:poolstate', 'name': 'web',
+            'partition': 'Common', 'generation': 1,
+            'selfLink': 'https://localhost/mgmt/tm/ltm/pool/~Common~web'})
+        return mgmt.tm.ltm.pools.pool, session, cache
+
+    def test_load_served_from_cache(self, fakeicontrolsession):
+        pool, session, cache = self._pool(fakeicontrolsession)
+        first = pool.load(name='web', partition='Common')
+        second = pool.load(name='web', partition='Common')
+        assert first is not second
+        assert second.name == 'web'
+        assert session.get.call_count == 1
+        assert cache.stats == dict(cache.stats, hits=1, misses=1)
+
+    def test_write_invalidates(self, fakeicontrolsession):
+        pool, session, cache = self._pool(fakeicontrolsession)
+        loaded = pool.load(name='web', partition='Common')
+        session.put.return_value = MockResponse({
+            'name': 'web', 'generation': 2, 'description': 'changed'})
+        loaded.update(description='changed')
+        pool.load(name='web', partition='Common')
+        assert session.get.call_count == 2
+        assert cache.stats['invalidations'] == 1
+
+    def test_check_generation_bypasses_cache(self, fakeicontrolsession):
+        pool, session, cache = self._pool(fakeicontrolsession)
+        loaded = pool.load(name='web', partition='Common')
+        loaded._check_generation()
+        assert session.get.call_count == 2
+        assert cache.stats['misses'] == 1
+
+
+class TestCollection_iter_collection(object):
+    def _collection(self, pages):
+        return _element_collection(
+            side_effect=[MockResponse(p) for p in pages])
+
+    def _items(self, start, count):
+        return [{'kind': 'tm:',
+                 'selfLink': 'https://localhost/mgmt/tm/elements/e%s' % i}
+                for i in range(start, start + count)]
+
+    def test_pages_until_short_page(self):
+        c, session = self._collection([{'items': self._items(0, 2)},
+                                       {'items': self._items(2, 1)}])
+        gen = c.iter_collection(page_size=2)
+        assert session.get.call_count == 0
+        result = list(gen)
+        assert len(result) == 3
+        assert all(isinstance(r, Element) for r in result)
+        assert result[2]._meta_data['uri'] == \
+            'https://TESTDOMAIN:443/mgmt/tm/elements/e2/'
+        assert session.get.call_count == 2
+        assert session.get.call_args_list[0][1]['params'] == \
+            {'$top': 2, '$skip': 0}
+        assert session.get.call_args_list[1][1]['params'] == \
+            {'$top': 2, '$skip': 2}
+
+    def test_follows_next_link(self):
+        next_link = 'https://localhost/mgmt/tm/elements?$top=2&$skip=2'
+        c, session = self._collection([
+            {'items': self._items(0, 2), 'nextLink': next_link,
+             'pageIndex': 1, 'totalPages': 2},
+            {'items': self._items(2, 2), 'pageIndex': 2, 'totalPages': 2}])
+        result = list(c.iter_collection(page_size=2))
+        assert len(result) == 4
+        assert session.get.call_args_list[1][0][0] == \
+            'https://TESTDOMAIN:443/mgmt/tm/elements?$top=2&$skip=2'
+        assert session.get.call_args_list[1][1]['params'] is None
+
+    def test_empty_page_with_next_link(self):
+        next_link = 'https://localhost/mgmt/tm/elements?$top=2&$skip=2'
+        c, session = self._collection([{'items': [], 'nextLink': next_link}])
+        assert list(c.iter_collection(page_size=2)) == []
+        assert session.get.call_count == 1
+
+    def test_next_link_to_same_page(self):
+        next_link = 'https://localhost/mgmt/tm/elements?$top=2&$skip=2'
+        c, session = self._collection([
+            {'items': self._items(0, 2), 'nextLink': next_link},
+            {'items': self._items(2, 2), 'nextLink': next_link}])
+        result = list(c.iter_collection(page_size=2))
+        assert len(result) == 4
+        assert session.get.call_count == 2
+
+    def test_string_params(self):
+        c, session = self._collection([{'items': []}])
+        result = list(c.iter_collection(
+            page_size=10,
+            requests_params={'params': '$filter=partition+eq+Common'}))
+        assert result == []
+        assert session.get.call_args[1]['params'] == \
+            '$filter=partition+eq+Common&$skip=0&$top=10'
+
+    def test_unregistered_kind(self):
+        c, session = self._collection([{'items': [{'kind': 'nope'}]}])
+        with pytest.raises(UnregisteredKind):
+            list(c.iter_collection())
+
+
+class TestResource_expand(object):
+    POOL = 'https://localhost/mgmt/tm/ltm/pool/~Common~p'
+
+    def _member(self, name):
+        return {'kind': 'tm:ltm:pool:members:membersstate', 'name': name,
+                'partition': 'Common',
+                'selfLink': self.POOL + '/members/~Common~%s?ver=13.1.0' %
+                name}
+
+    def _pool(self, **attrs):
+        pool = {'kind': 'tm:ltm:pool:poolstate', 'name': 'p',
+                'partition': 'Common', 'selfLink': self.POOL + '?ver=13.1.0',
+                'membersReference': {
+                    'link': self.POOL + '/members?ver=13.1.0',
+                    'isSubcollection': True,
+                    'items': [self._member('a:80'), self._member('b:80')]}}
+        pool.update(attrs)
+        return pool
+
+    def _session(self, *bodies):
+        b = ManagementRoot('192.168.1.1', 'admin', 'admin')
+        session = b._meta_data['icr_session']
+        session.get = mock.MagicMock(
+            side_effect=[MockResponse(body) for body in bodies])
+        return b, session
+
+    def test_load(self, fakeicontrolsession):
+        b, session = self._session(self._pool())
+        pool = b.tm.ltm.pools.pool.load(name='p', partition='Common',
+                                        expand=True)
+        assert session.get.call_args[1]['params'] == {
+            'expandSubcollections': 'true'}
+        assert pool.membersReference == {
+            'link': self.POOL + '/members?ver=13.1.0',
+            'isSubcollection': True}
+        members = pool.members_s.get_collection()
+        assert [m.name for m in members] == ['a:80', 'b:80']
+        assert members[0]._meta_data['uri'] == \
+            'https://192.168.1.1:443/mgmt/tm/ltm/pool/~Common~p/members/' \
+            '~Common~a:80/'
+        assert session.get.call_count == 1
+        # The inline items are used once, then the device is asked again.
+        session.get.side_effect = [MockResponse({'items': []})]
+        assert pool.members_s.get_collection() == []
+        assert session.get.call_count == 2
+
+    def test_refresh_drops_inline_items(self, fakeicontrolsession):
+        b, session = self._session(self._pool(), self._pool(),
+                                   {'items': []})
+        pool = b.tm.ltm.pools.pool.load(name='p', partition='Common',
+                                        expand=True)
+        pool.refresh()
+        assert 'expanded_items' not in pool._meta_data
+        assert pool.members_s.get_collection() == []
+        assert session.get.call_count == 3
+
+    def test_load_without_expand_keeps_reference(self, fakeicontrolsession):
+        b, session = self._session(self._pool())
+        pool = b.tm.ltm.pools.pool.load(name='p', partition='Common')
+        assert len(pool.membersReference['items']) == 2
+        assert 'expanded_items' not in pool._meta_data
+
+    def test_get_collection(self, fakeicontrolsession):
+        b, session = self._session({'items': [self._pool()]})
+        pools = b.tm.ltm.pools.get_collection(expand=True)
+        assert session.get.call_args[1]['params'] == {
+            'expandSubcollections': 'true'}
+        members = pools[0].members_s.get_collection(as_dicts=True)
+        assert [m['name'] for m in members] == ['a:80', 'b:80']
+        assert session.get.call_count == 1
+
+    def test_virtual_policies(self, fakeicontrolsession):
+        vs = 'https://localhost/mgmt/tm/ltm/virtual/~Common~v'
+        b, session = self._session({
+            'kind': 'tm:ltm:virtual:virtualstate', 'name': 'v',
+            'selfLink': vs + '?ver=13.1.0',
+            'policiesReference': {
+                'link': vs + '/policies?ver=13.1.0', 'isSubcollection': True,
+                'items': [{'kind': 'tm:ltm:virtual:policies:policiesstate',
+                           'name': 'pol', 'partition': 'Common',
+                           'selfLink': vs + '/policies/~Common~pol'}]}})
+        virtual = b.tm.ltm.virtuals.virtual.load(
+            name='v', partition='Common', expand=True)
+        policies = virtual.policies_s.get_collection()
+        assert [p.name for p in policies] == ['pol']
+        assert session.get.call_count == 1
+
+
 class TestResource_load(object):
     def test_missing_required_params(self):
         r = Resource(mock.MagicMock())
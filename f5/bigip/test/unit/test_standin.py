@@ -0,0 +1,111 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import io
+import json
+import os
+import pytest
+
+from f5.bigip.contexts import TransactionContextManager
+from f5.bigip.test.benchmark import bench_standin
+from f5.bigip.test.benchmark.server import StandInDevice
+from f5.bigip.test.benchmark.server import StandInServer
+from f5.sdk_exception import TransactionSubmitException
+from icontrol.exceptions import iControlUnexpectedHTTPError
+
+
+@pytest.fixture
+def server():
+    device = StandInDevice(seed_dir=None)
+    with StandInServer(device) as server:
+        yield server
+
+
+def test_crud(server):
+    mgmt = server.management_root()
+    assert mgmt.tmos_version == '13.1.0'
+    pools = mgmt.tm.ltm.pools
+    pool = pools.pool.create(name='web', partition='Common')
+    pool.modify(description='x')
+    member = pool.members_s.members.create(name='10.0.0.1:80',
+                                           partition='Common')
+    assert member.fullPath == '/Common/10.0.0.1:80'
+    loaded = pools.pool.load(name='web', partition='Common')
+    assert (loaded.description, loaded.generation) == ('x', 2)
+    assert len(loaded.members_s.get_collection()) == 1
+    with pytest.raises(iControlUnexpectedHTTPError) as error:
+        pools.pool.create(name='web', partition='Common')
+    assert error.value.response.status_code == 409
+    loaded.delete()
+    assert not pools.pool.exists(name='web', partition='Common')
+    assert 'tm/ltm/pool/~Common~web/members' not in \
+        server.device.collections
+
+
+def test_collection_queries(server):
+    server.device.populate('tm/ltm/pool', 10)
+    server.device.populate('tm/ltm/pool', 2, partition='Other', prefix='o')
+    pools = server.management_root().tm.ltm.pools
+    assert len(pools.get_collection()) == 12
+    names = pools.query().where(partition='Other').select('name').get(
+        as_dicts=True)
+    assert names == [{'name': 'o_0'}, {'name': 'o_1'}]
+    assert len(list(pools.iter_collection(page_size=5))) == 12
+
+
+def test_transaction_is_atomic(server):
+    mgmt = server.management_root()
+    mgmt.tm.ltm.pools.pool.create(name='b', partition='Common')
+    with pytest.raises(TransactionSubmitException):
+        with TransactionContextManager(
+                mgmt.tm.transactions.transaction) as api:
+            api.tm.ltm.pools.pool.create(name='a', partition='Common')
+            api.tm.ltm.pools.pool.create(name='b', partition='Common')
+    assert not mgmt.tm.ltm.pools.pool.exists(name='a', partition='Common')
+
+
+def test_file_round_trip(server, tmpdir):
+    mgmt = server.management_root()
+    data = os.urandom(300000)
+    server.device.add_file('image.iso', data)
+    dest = str(tmpdir.join('image.iso'))
+    mgmt.shared.file_transfer.bulk.download_file(
+        'image.iso', dest, chunk_size=65536, max_workers=3)
+    with open(dest, 'rb') as fh:
+        assert fh.read() == data
+    mgmt.shared.file_transfer.uploads.upload_stringio(
+        io.BytesIO(data), 'upload.bin', chunk_size=65536)
+    metrics = mgmt.metrics
+    assert metrics.histogram('shared/file-transfer/bulk/{name}',
+                             'get').count == 5
+    assert metrics.histogram('shared/file-transfer/uploads/{name}',
+                             'post').count == 5
+
+
+def test_benchmark_suite(tmpdir, capsys):
+    saved = str(tmpdir.join('results.json'))
+    argv = ['--sizes', '5', '--count', '3', '--file-size', '1',
+            '--no-memory']
+    assert bench_standin.main(argv + ['--save', saved]) == 0
+    with open(saved) as fh:
+        results = json.load(fh)
+    assert results['crud create']['ops'] == 3
+    assert results['stats of 5 pools']['ops'] == 20
+    for result in results.values():
+        result['p50'] = 1e-9
+    with open(saved, 'w') as fh:
+        json.dump(results, fh)
+    assert bench_standin.main(argv + ['--compare', saved]) == 1
+    assert 'Regression: crud create' in capsys.readouterr()[0]
@@ -0,0 +1,274 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import io
+import json
+import os
+import pytest
+import threading
+import time
+
+from requests.exceptions import ConnectionError
+
+from f5.bigip.transfer import _IterableReader
+from f5.bigip.transfer import ChunkedUpload
+from f5.bigip.transfer import RangedDownload
+from f5.sdk_exception import FileDownloadChecksumMismatch
+from f5.sdk_exception import FileDownloadError
+from f5.sdk_exception import FileUploadSizeError
+
+URI = 'https://localhost/mgmt/shared/file-transfer/ucs-downloads/a.ucs'
+DATA = bytes(bytearray(range(100)))
+
+
+class Response(object):
+    def __init__(self, content, headers):
+        self.content = content
+        self.headers = headers
+        self.status_code = 200
+
+
+class FakeWorker(object):
+    """Answer Content-Range GETs the way the file transfer worker does."""
+    def __init__(self, data, fail_at=()):
+        self.data = data
+        self.fail_at = set(fail_at)
+        self.starts = []
+        self.lock = threading.Lock()
+
+    def get(self, uri, **kwargs):
+        byte_range = kwargs['headers']['Content-Range'].split('/')[0]
+        start, end = [int(x) for x in byte_range.split('-')]
+        with self.lock:
+            self.starts.append(start)
+        if start in self.fail_at:
+            raise ConnectionError('connection dropped')
+        end = min(end, len(self.data) - 1)
+        headers = {'Content-Range': '%s-%s/%s' % (start, end,
+                                                  len(self.data))}
+        return Response(self.data[start:end + 1], headers)
+
+
+def read(path):
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+def test_download_without_probe(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(DATA)
+    RangedDownload(worker.get, URI, dest, chunk_size=30).run()
+    assert read(dest) == DATA
+    assert worker.starts == [0, 30, 60, 90]
+    assert not os.path.exists(dest + '.part.json')
+
+
+def test_download_smaller_than_chunk(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(DATA[:10])
+    RangedDownload(worker.get, URI, dest, chunk_size=30).run()
+    assert read(dest) == DATA[:10]
+    assert worker.starts == [0]
+
+
+def test_parallel_download(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(DATA)
+    RangedDownload(worker.get, URI, dest, chunk_size=7, max_workers=4).run()
+    assert read(dest) == DATA
+    assert sorted(worker.starts) == list(range(0, 100, 7))
+
+
+def test_resume_after_failure(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(DATA, fail_at=[60])
+    with pytest.raises(ConnectionError):
+        RangedDownload(worker.get, URI, dest, chunk_size=30).run()
+    with open(dest + '.part.json') as fh:
+        manifest = json.load(fh)
+    assert manifest['done'] == [[0, 1]]
+    assert manifest['size'] == 100
+    worker = FakeWorker(DATA)
+    RangedDownload(worker.get, URI, dest, chunk_size=30).run()
+    assert worker.starts == [60, 90]
+    assert read(dest) == DATA
+
+
+def test_resume_ignores_other_manifest(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(DATA, fail_at=[60])
+    with pytest.raises(ConnectionError):
+        RangedDownload(worker.get, URI, dest, chunk_size=30).run()
+    worker = FakeWorker(DATA)
+    RangedDownload(worker.get, URI, dest, chunk_size=40).run()
+    assert worker.starts == [0, 40, 80]
+    worker = FakeWorker(DATA, fail_at=[60])
+    with pytest.raises(ConnectionError):
+        RangedDownload(worker.get, URI, dest, chunk_size=30).run()
+    worker = FakeWorker(DATA)
+    RangedDownload(worker.get, URI, dest, chunk_size=30, resume=False).run()
+    assert worker.starts == [0, 30, 60, 90]
+
+
+def test_resume_after_file_changed(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(b'A' * 40, fail_at=[20])
+    with pytest.raises(ConnectionError):
+        RangedDownload(worker.get, URI, dest, chunk_size=20).run()
+    worker = FakeWorker(b'B' * 100)
+    with pytest.raises(FileDownloadError) as error:
+        RangedDownload(worker.get, URI, dest, chunk_size=20).run()
+    assert 'is now 100 bytes' in str(error.value)
+    assert not os.path.exists(dest)
+    assert not os.path.exists(dest + '.part.json')
+    RangedDownload(worker.get, URI, dest, chunk_size=20).run()
+    assert read(dest) == b'B' * 100
+
+
+def test_checksum(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    digest = hashlib.md5(DATA).hexdigest()
+    RangedDownload(FakeWorker(DATA).get, URI, dest, chunk_size=30,
+                   checksum=digest.upper(), checksum_algorithm='md5').run()
+    with pytest.raises(FileDownloadChecksumMismatch):
+        RangedDownload(FakeWorker(DATA).get, URI, dest, chunk_size=30,
+                       checksum='0' * 64).run()
+
+
+def test_short_range_is_an_error(tmpdir):
+    dest = str(tmpdir.join('a.ucs'))
+    worker = FakeWorker(DATA)
+    original = worker.get
+
+    def truncating_get(uri, **kwargs):
+        response = original(uri, **kwargs)
+        response.content = response.content[:-1]
+        return response
+    with pytest.raises(FileDownloadError):
+        RangedDownload(truncating_get, URI, dest, chunk_size=30).run()
+
+
+class FakeReceiver(object):
+    """Record Content-Range POSTs, taking ``seconds_per_byte`` for each."""
+    def __init__(self, seconds_per_byte=0.0):
+        self.seconds_per_byte = seconds_per_byte
+        self.now = 0.0
+        self.ranges = []
+        self.received = {}
+
+    def clock(self):
+        return self.now
+
+    def post(self, uri, **kwargs):
+        self.now += len(kwargs['data']) * self.seconds_per_byte
+        self.ranges.append(kwargs['headers']['Content-Range'])
+        start = int(kwargs['headers']['Content-Range'].split('-')[0])
+        self.received[start] = kwargs['data']
+
+    def data(self):
+        return b''.join(self.received[k] for k in sorted(self.received))
+
+
+def upload(receiver, data, **kwargs):
+    transfer = ChunkedUpload(receiver.post, URI, io.BytesIO(data), **kwargs)
+    transfer.clock = receiver.clock
+    transfer.run()
+    return transfer
+
+
+def test_upload_fixed_chunks():
+    receiver = FakeReceiver()
+    upload(receiver, DATA, chunk_size=30)
+    assert receiver.ranges == ['0-29/100', '30-59/100', '60-89/100',
+                               '90-99/100']
+    assert receiver.data() == DATA
+
+
+def test_upload_adaptive_grows_on_fast_link():
+    receiver = FakeReceiver(seconds_per_byte=0.001)
+    data = b'x' * 2000
+    transfer = upload(receiver, data, chunk_size=10, adaptive=True,
+                      min_chunk_size=10, max_chunk_size=400)
+    sizes = [len(receiver.received[k]) for k in sorted(receiver.received)]
+    assert sizes[:5] == [10, 20, 40, 80, 160]
+    assert max(sizes) == 400
+    assert transfer.chunk_size == 400
+    assert receiver.data() == data
+
+
+def test_upload_adaptive_shrinks_on_slow_link():
+    receiver = FakeReceiver(seconds_per_byte=0.1)
+    transfer = upload(receiver, DATA, chunk_size=40, adaptive=True,
+                      min_chunk_size=15)
+    assert receiver.ranges[:3] == ['0-39/100', '40-59/100', '60-74/100']
+    assert transfer.chunk_size == 15
+    assert receiver.data() == DATA
+
+
+def test_upload_progress():
+    calls = []
+    upload(FakeReceiver(), DATA, chunk_size=30,
+           progress=lambda sent, total: calls.append((sent, total)))
+    assert calls == [(30, 100), (60, 100), (90, 100), (100, 100)]
+
+
+def test_upload_in_flight():
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0, 'last_alone': None}
+    received = {}
+
+    def post(uri, **kwargs):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            if kwargs['headers']['Content-Range'].startswith('98-'):
+                state['last_alone'] = state['active'] == 1
+        time.sleep(0.01)
+        start = int(kwargs['headers']['Content-Range'].split('-')[0])
+        received[start] = kwargs['data']
+        with lock:
+            state['active'] -= 1
+    ChunkedUpload(post, URI, io.BytesIO(DATA), chunk_size=7,
+                  max_in_flight=3).run()
+    assert state['peak'] == 3
+    assert state['last_alone'] is True
+    assert b''.join(received[k] for k in sorted(received)) == DATA
+
+
+def test_upload_in_flight_error():
+    def post(uri, **kwargs):
+        if kwargs['headers']['Content-Range'].startswith('14-'):
+            raise ConnectionError('connection dropped')
+    with pytest.raises(ConnectionError):
+        ChunkedUpload(post, URI, io.BytesIO(DATA), chunk_size=7,
+                      max_in_flight=3).run()
+
+
+def test_upload_size_checks():
+    with pytest.raises(FileUploadSizeError):
+        ChunkedUpload(FakeReceiver().post, URI, iter([b'a']))
+    with pytest.raises(FileUploadSizeError):
+        ChunkedUpload(FakeReceiver().post, URI, [b'a' * 10], size=11).run()
+    with pytest.raises(FileUploadSizeError):
+        ChunkedUpload(FakeReceiver().post, URI, [b'a' * 10], size=9).run()
+
+
+def test_iterable_reader():
+    reader = _IterableReader([b'ab', b'cdefg', b'', b'h'])
+    assert reader.read(3) == b'abc'
+    assert reader.read(3) == b'def'
+    assert reader.read(3) == b'gh'
+    assert reader.read(3) == b''
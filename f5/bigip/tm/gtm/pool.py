@@ -283,22 +283,22 @@ class MembersResourceA(Resource):
 
             # Make convenience variable with short names for this method.
             _create_uri = self._meta_data['container']._meta_data['uri']
-            session = self._meta_data['bigip']._meta_data['icr_session']
             # This is a bit hacky but we need to do this so we are able to
             # create a resource inside SDK properly. We also include the
             # scenario where 20x range response occurs just in case this gets
             # fixed in later 12.x release.
 
             try:
-                response = session.post(
-                    _create_uri, json=kwargs, **requests_params)
+                response = self._request(
+                    'post', _create_uri, json=kwargs, **requests_params)
 
             except HTTPError as err:
                 if err.response.status_code != 404:
                     raise
                 if err.response.status_code == 404:
                     kwargs['uri_as_parts'] = True
-                    response = session.get(_create_uri, **kwargs)
+                    response = self._request(
+                        'get', _create_uri, use_cache=False, **kwargs)
                     return self._produce_instance(response)
 
             # Make new instance of self
@@ -366,22 +366,22 @@ class MembersResourceAAAA(Resource):
 
             # Make convenience variable with short names for this method.
             _create_uri = self._meta_data['container']._meta_data['uri']
-            session = self._meta_data['bigip']._meta_data['icr_session']
             # This is a bit hacky but we need to do this so we are able to
             # create a resource inside SDK properly. We also include the
             # scenario where 20x range response occurs just in case this gets
             # fixed in later 12.x release.
 
             try:
-                response = session.post(
-                    _create_uri, json=kwargs, **requests_params)
+                response = self._request(
+                    'post', _create_uri, json=kwargs, **requests_params)
 
             except HTTPError as err:
                 if err.response.status_code != 404:
                     raise
                 if err.response.status_code == 404:
                     kwargs['uri_as_parts'] = True
-                    response = session.get(_create_uri, **kwargs)
+                    response = self._request(
+                        'get', _create_uri, use_cache=False, **kwargs)
                     return self._produce_instance(response)
 
             # Make new instance of self
@@ -91,7 +91,6 @@ class Topology(Resource):
 
         # Make convenience variable with short names for this method.
         _create_uri = self._meta_data['container']._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
 
         # This is a bit hacky but we need to do this so we are able to
         # create a resource inside SDK properly. We also include the
@@ -99,15 +98,16 @@ class Topology(Resource):
         # fixed in later release.
 
         try:
-            response = session.post(
-                _create_uri, json=kwargs, **requests_params)
+            response = self._request(
+                'post', _create_uri, json=kwargs, **requests_params)
 
         except HTTPError as err:
             if err.response.status_code != 404:
                 raise
             if err.response.status_code == 404:
                 kwargs['uri_as_parts'] = True
-                response = session.get(_create_uri, **kwargs)
+                response = self._request(
+                    'get', _create_uri, use_cache=False, **kwargs)
 
         # Make new instance of self
         return self._produce_instance(response)
@@ -156,18 +156,23 @@ class Policy(Resource):
         assert self.status.lower() == 'draft'
         base_uri = self._meta_data['container']._meta_data['uri']
         requests_params = self._handle_requests_params(kwargs)
-        session = self._meta_data['bigip']._meta_data['icr_session']
         if 'command' not in kwargs:
             kwargs['command'] = 'publish'
         if 'Drafts' not in self.name:
             kwargs['name'] = self.fullPath
-        session.post(base_uri, json=kwargs, **requests_params)
+        self._request('post', base_uri, json=kwargs, **requests_params)
         get_kwargs = {
             'name': self.name, 'partition': self.partition,
             'uri_as_parts': True
         }
-        response = session.get(base_uri, **get_kwargs)
-        json_data = response.json()
+        cache = self._get_cache()
+        if cache is not None:
+            # Publishing removes the draft and replaces the published policy
+            cache.invalidate(self._meta_data['uri'])
+            cache.invalidate(base_uri, **get_kwargs)
+        response = self._request('get', base_uri, use_cache=False,
+                                 **get_kwargs)
+        json_data = self._decode(response)
         self._local_update(json_data)
         self._activate_URI(json_data['selfLink'])
 
@@ -201,9 +206,9 @@ class Policy(Resource):
             'subPath': 'Drafts'
         }
         base_uri = self._meta_data['container']._meta_data['uri']
-        session = self._meta_data['bigip']._meta_data['icr_session']
-        response = session.get(base_uri, **get_kwargs)
-        json_data = response.json()
+        response = self._request('get', base_uri, use_cache=False,
+                                 **get_kwargs)
+        json_data = self._decode(response)
         self._local_update(json_data)
         self._activate_URI(json_data['selfLink'])
 
@@ -0,0 +1,71 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+
+from f5.bigip import ManagementRoot
+from f5.utils.cache import ResourceCache
+
+
+BASE = 'https://localhost/mgmt/tm/ltm/policy/'
+
+
+class MockResponse(object):
+    def __init__(self, attr_dict):
+        self.__dict__ = attr_dict
+
+    def json(self):
+        return self.__dict__
+
+
+def _policy(status, sub_path=None):
+    path = '~Common~Drafts~web' if sub_path else '~Common~web'
+    body = {'kind': 'tm:ltm:policy:policystate', 'name': 'web',
+            'partition': 'Common', 'status': status, 'generation': 1,
+            'fullPath': '/Common/Drafts/web' if sub_path else '/Common/web',
+            'selfLink': BASE + path + '?ver=12.1.0'}
+    if sub_path:
+        body['subPath'] = sub_path
+    return body
+
+
+def _device(uri, **kwargs):
+    if kwargs.get('subPath') == 'Drafts':
+        return MockResponse(_policy('draft', 'Drafts'))
+    if kwargs.get('name') == 'web':
+        return MockResponse(_policy('published'))
+    return MockResponse({'kind': 'tm:ltm:policy:policycollectionstate',
+                         'items': [_policy('published')]})
+
+
+def test_publish_invalidates_cache(fakeicontrolsession):
+    cache = ResourceCache()
+    mgmt = ManagementRoot('FakeHostName', 'admin', 'admin', cache=cache)
+    session = mgmt._meta_data['icr_session']
+    session.get = mock.MagicMock(side_effect=_device)
+    policies = mgmt.tm.ltm.policys
+    policies.get_collection()
+    draft = policies.policy.load(name='web', partition='Common',
+                                 subPath='Drafts')
+    assert session.get.call_count == 2
+
+    draft.publish()
+    assert session.post.call_count == 1
+    assert draft.status == 'published'
+    assert session.get.call_count == 3
+
+    policies.get_collection()
+    policies.policy.load(name='web', partition='Common', subPath='Drafts')
+    assert session.get.call_count == 5
@@ -122,13 +122,15 @@ class Policies(Resource, CheckExistenceMixin):
     def exists(self, **kwargs):
         """check existence of policy under virtual."""
         return self._check_existence_by_collection(
-            self._meta_data['container'], kwargs['name'])
+            self._meta_data['container'], kwargs['name'],
+            partition=kwargs.get('partition'))
 
     def load(self, **kwargs):
         """Override load to retrieve object based on exists above."""
         tmos_v = self._meta_data['bigip']._meta_data['tmos_version']
         if self._check_existence_by_collection(
-                self._meta_data['container'], kwargs['name']):
+                self._meta_data['container'], kwargs['name'],
+                partition=kwargs.get('partition')):
             if LooseVersion(tmos_v) == LooseVersion('11.5.4'):
                 return self._load_11_5_4(**kwargs)
             else:
@@ -164,7 +166,8 @@ class Policies(Resource, CheckExistenceMixin):
                 raise
             if err.response.status_code == 404:
                 return self._return_object(self._meta_data['container'],
-                                           kwargs['name'])
+                                           kwargs['name'],
+                                           partition=kwargs.get('partition'))
         # Make new instance of self
         return self._produce_instance(response)
 
@@ -192,20 +195,20 @@ class Policies(Resource, CheckExistenceMixin):
 
             # Make convenience variable with short names for this method.
             _create_uri = self._meta_data['container']._meta_data['uri']
-            session = self._meta_data['bigip']._meta_data['icr_session']
             # We using try/except just in case some HF will fix
             # this in 11.5.4
 
             try:
-                response = session.post(
-                    _create_uri, json=kwargs, **requests_params)
+                response = self._request(
+                    'post', _create_uri, json=kwargs, **requests_params)
 
             except HTTPError as err:
                 if err.response.status_code != 404:
                     raise
                 if err.response.status_code == 404:
-                    return self._return_object(self._meta_data['container'],
-                                               kwargs['name'])
+                    return self._return_object(
+                        self._meta_data['container'], kwargs['name'],
+                        partition=kwargs.get('partition'))
             # Make new instance of self
             return self._produce_instance(response)
         else:
@@ -231,6 +234,10 @@ class Policies_s(Collection):
         :raises: UnregisteredKind
         :returns: list of reference dicts and Python ``Resource`` objects
         """
+        if not kwargs:
+            items = self._take_expanded_items()
+            if items is not None:
+                return self._hydrate_items(items)
         list_of_contents = []
         self.refresh(**kwargs)
         if 'items' in self.__dict__:
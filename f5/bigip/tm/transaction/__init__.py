@@ -24,6 +24,7 @@ REST Kind
     ``tm:transaction*``
 """
 
+from f5.bigip.planner import TransactionPlanner
 from f5.bigip.resource import Collection
 from f5.bigip.resource import Resource
 
@@ -52,9 +53,43 @@ class Transactions(Collection):
         self._meta_data['attribute_registry'] = \
             {'tm:transactionstate': Transaction}
 
+    def plan(self, chunk_size=500, max_workers=4):
+        """Start a :class:`~f5.bigip.planner.TransactionPlanner`.
+
+        Args:
+            chunk_size (int): Maximum number of commands per transaction.
+            max_workers (int): Number of transactions built and validated
+                at the same time.
+        """
+        return TransactionPlanner(self, chunk_size=chunk_size,
+                                  max_workers=max_workers)
+
 
 class Transaction(Resource):
     def __init__(self, transactions):
         super(Transaction, self).__init__(transactions)
         self._meta_data['required_json_kind'] = 'tm:transactionstate'
         self._meta_data['required_creation_parameters'] = set()
+        self._meta_data['allowed_lazy_attributes'] = [Commands_s]
+        self._meta_data['attribute_registry'] = \
+            {'tm:transaction:commandscollectionstate': Commands_s}
+
+
+class Commands_s(Collection):
+    """The commands queued in a transaction, in evaluation order."""
+    def __init__(self, transaction):
+        super(Commands_s, self).__init__(transaction)
+        self._meta_data['allowed_lazy_attributes'] = [Commands]
+        self._meta_data['attribute_registry'] = \
+            {'tm:transaction:commandsstate': Commands}
+
+
+class Commands(Resource):
+    """One command of a transaction.
+
+    ``evalOrder`` can be modified to change the order in which the
+    commands of the transaction are run.
+    """
+    def __init__(self, commands_s):
+        super(Commands, self).__init__(commands_s)
+        self._meta_data['required_json_kind'] = 'tm:transaction:commandsstate'
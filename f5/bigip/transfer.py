@@ -0,0 +1,436 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Chunked transfers against the iControl REST file transfer workers.
+
+The file transfer workers move a file as a series of requests, each carrying
+one ``Content-Range``.
+
+:class:`ChunkedUpload` streams a file-like object or an iterable of bytes to
+a worker.  It sizes each chunk after the throughput measured for the ones
+before it, optionally keeps several POSTs in flight and reports progress.
+
+:class:`RangedDownload` fetches ranges with several requests in flight,
+writes each one at its offset in a preallocated destination file and records
+the finished ranges in a sidecar manifest (``<dest>.part.json``) so that an
+interrupted download resumes where it stopped instead of starting over.
+"""
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+import hashlib
+import json
+import logging
+import os
+import stat
+import threading
+import time
+
+from f5.sdk_exception import FileDownloadChecksumMismatch
+from f5.sdk_exception import FileDownloadError
+from f5.sdk_exception import FileUploadSizeError
+from f5.sdk_exception import MissingHttpHeader
+
+
+def _upload_source_size(source):
+    """Number of bytes left to read from a file-like object, or None.
+
+    Regular files are measured with ``os.fstat``, other seekable streams by
+    seeking to their end and back.  Nothing is read.
+    """
+    try:
+        status = os.fstat(source.fileno())
+        if stat.S_ISREG(status.st_mode):
+            return status.st_size - source.tell()
+    except (AttributeError, EnvironmentError, ValueError):
+        pass
+    try:
+        position = source.tell()
+        source.seek(0, os.SEEK_END)
+        end = source.tell()
+        source.seek(position)
+        return end - position
+    except (AttributeError, EnvironmentError, ValueError):
+        return None
+
+
+class _IterableReader(object):
+    """Give an iterable of bytes (or str) pieces a ``read(size)`` method.
+
+    At most one piece beyond the requested size is buffered.
+    """
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self._buffer = None
+
+    def read(self, size):
+        pieces = [self._buffer] if self._buffer else []
+        buffered = len(self._buffer) if self._buffer else 0
+        self._buffer = None
+        while buffered < size:
+            try:
+                piece = next(self._iterator)
+            except StopIteration:
+                break
+            pieces.append(piece)
+            buffered += len(piece)
+        if not pieces:
+            return b''
+        data = pieces[0][:0].join(pieces)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class ChunkedUpload(object):
+    """Upload a file to a file transfer worker in Content-Range chunks.
+
+    With ``adaptive`` set, every full chunk is timed and the next chunk is
+    sized so that a request takes about ``target_seconds``: fast links get
+    fewer, larger requests and slow links smaller ones that are cheaper to
+    retry.  The size at most doubles or halves per chunk and stays between
+    ``min_chunk_size`` and ``max_chunk_size``.
+
+    With ``max_in_flight`` above one, that many chunks are POSTed
+    concurrently.  The worker writes each chunk at the offset given by its
+    Content-Range, but the final chunk is only sent once all others have
+    been accepted.
+
+    :param post: callable -- performs ``post(uri, **requests_params)``
+    :param uri: str -- URI of the file on the worker
+    :param source: file-like object, or iterable of bytes, read from its
+                   current position
+    :param size: int -- total bytes to send.  Required when it cannot be
+                 determined from ``source`` without reading it.
+    :param progress: callable -- called as ``progress(sent, size)`` each
+                     time a chunk has been accepted
+    """
+    DEFAULT_CHUNK_SIZE = 512 * 1024
+    MIN_CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, post, uri, source, size=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, adaptive=False,
+                 min_chunk_size=MIN_CHUNK_SIZE, max_chunk_size=MAX_CHUNK_SIZE,
+                 target_seconds=1.0, max_in_flight=1, progress=None,
+                 requests_params=None):
+        self.post = post
+        self.uri = uri
+        if size is None:
+            size = _upload_source_size(source)
+        if size is None:
+            error_message = "The size of %r cannot be determined without " \
+                            "reading it, pass it as size=" % type(source)
+            raise FileUploadSizeError(error_message)
+        self.size = size
+        self.reader = source if hasattr(source, 'read') else \
+            _IterableReader(source)
+        self.chunk_size = chunk_size
+        self.adaptive = adaptive
+        self.min_chunk_size = min(min_chunk_size, chunk_size)
+        self.max_chunk_size = max(max_chunk_size, chunk_size)
+        self.target_seconds = target_seconds
+        self.max_in_flight = max(1, max_in_flight)
+        self.progress = progress
+        self.requests_params = requests_params or {}
+        self.clock = time.time
+        self.sent = 0
+
+    def _post_chunk(self, start, chunk):
+        params = dict(self.requests_params)
+        headers = {
+            'Content-Range': '%s-%s/%s' % (
+                start, start + len(chunk) - 1, self.size),
+            'Content-Type': 'application/octet-stream'}
+        params.update({'data': chunk, 'headers': headers, 'verify': False})
+        logging.debug(headers)
+        began = self.clock()
+        self.post(self.uri, **params)
+        return len(chunk), self.clock() - began
+
+    def _adapt(self, sent, elapsed):
+        if not self.adaptive or sent < self.chunk_size or elapsed <= 0:
+            return
+        ideal = sent * self.target_seconds / elapsed
+        ideal = max(self.chunk_size // 2, min(self.chunk_size * 2, ideal))
+        self.chunk_size = int(
+            max(self.min_chunk_size, min(self.max_chunk_size, ideal)))
+
+    def _read_chunk(self, start):
+        chunk = self.reader.read(min(self.chunk_size, self.size - start))
+        if not chunk:
+            error_message = "Upload source ended after %s of the %s bytes " \
+                            "declared" % (start, self.size)
+            raise FileUploadSizeError(error_message)
+        return chunk
+
+    def _check_exhausted(self):
+        if self.reader.read(1):
+            error_message = "Upload source has more than the %s bytes " \
+                            "declared" % self.size
+            raise FileUploadSizeError(error_message)
+
+    def _submit(self, executor, start, chunk):
+        if executor is not None:
+            return executor.submit(self._post_chunk, start, chunk)
+        future = Future()
+        try:
+            future.set_result(self._post_chunk(start, chunk))
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+
+    def run(self):
+        """Send the whole source, raising the first error encountered."""
+        executor = None
+        if self.max_in_flight > 1:
+            executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        pending = set()
+        start = 0
+        try:
+            while True:
+                while start < self.size and len(pending) < self.max_in_flight:
+                    last = start + self.chunk_size >= self.size
+                    if last and pending:
+                        break
+                    chunk = self._read_chunk(start)
+                    pending.add(self._submit(executor, start, chunk))
+                    start += len(chunk)
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    sent, elapsed = future.result()
+                    self.sent += sent
+                    self._adapt(sent, elapsed)
+                    if self.progress:
+                        self.progress(self.sent, self.size)
+            self._check_exhausted()
+        finally:
+            if executor is not None:
+                for future in pending:
+                    future.cancel()
+                executor.shutdown(wait=True)
+
+
+def _parse_content_range(response):
+    """Return ``(first, last, total)`` from a response's Content-Range."""
+    if 'Content-Range' not in response.headers:
+        error_message = "The Content-Range header is not present."
+        raise MissingHttpHeader(error_message)
+    byte_range, total = response.headers['Content-Range'].split('/')
+    first, last = byte_range.split('-')
+    return int(first), int(last), int(total)
+
+
+def _compress(indexes):
+    """Collapse chunk indexes into a list of inclusive ``[first, last]``."""
+    ranges = []
+    for index in sorted(indexes):
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return ranges
+
+
+def _expand(ranges):
+    indexes = set()
+    for first, last in ranges:
+        indexes.update(range(first, last + 1))
+    return indexes
+
+
+class RangedDownload(object):
+    """Download a file from a file transfer worker in concurrent ranges.
+
+    :param get: callable -- performs ``get(uri, **requests_params)``
+    :param uri: str -- URI of the file on the worker
+    :param dest: str -- path of the local file to write
+    :param chunk_size: int -- bytes requested per range
+    :param max_workers: int -- ranges fetched at the same time
+    :param requests_params: dict -- extra arguments for every request
+    :param checksum: str -- expected hex digest of the whole file
+    :param checksum_algorithm: str -- name of the ``hashlib`` algorithm
+    :param resume: bool -- continue from a manifest left by an earlier,
+                   interrupted download of the same file.  If the file on
+                   the worker changed size since, the partial file and its
+                   manifest are removed and ``FileDownloadError`` is raised.
+    """
+
+    def __init__(self, get, uri, dest, chunk_size=512 * 1024, max_workers=1,
+                 requests_params=None, checksum=None,
+                 checksum_algorithm='sha256', resume=True):
+        self.get = get
+        self.uri = uri
+        self.dest = dest
+        self.chunk_size = chunk_size
+        self.max_workers = max(1, max_workers)
+        self.requests_params = requests_params or {}
+        self.checksum = checksum
+        self.checksum_algorithm = checksum_algorithm
+        self.resume = resume
+        self.size = None
+        self.done = set()
+        self._lock = threading.Lock()
+        self._fileobj = None
+        self._changed = False
+
+    @property
+    def manifest_path(self):
+        return self.dest + '.part.json'
+
+    @property
+    def chunk_count(self):
+        return (self.size + self.chunk_size - 1) // self.chunk_size
+
+    def _chunk_bounds(self, index):
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.size) - 1
+
+    def _fetch(self, start, end, size):
+        params = dict(self.requests_params)
+        params.update({
+            'headers': {
+                'Content-Range': '%s-%s/%s' % (start, end, size),
+                'Content-Type': 'application/octet-stream'
+            },
+            'verify': False
+        })
+        logging.debug(params['headers'])
+        response = self.get(self.uri, **params)
+        first, _, total = _parse_content_range(response)
+        return first, response.content, total
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path) as fh:
+                manifest = json.load(fh)
+        except (EnvironmentError, ValueError):
+            return False
+        if manifest.get('uri') != self.uri or \
+                manifest.get('chunk_size') != self.chunk_size:
+            return False
+        if not os.path.exists(self.dest) or \
+                os.path.getsize(self.dest) != manifest.get('size'):
+            return False
+        self.size = manifest['size']
+        self.done = _expand(manifest.get('done', []))
+        return True
+
+    def _save_manifest(self):
+        manifest = {'uri': self.uri, 'size': self.size,
+                    'chunk_size': self.chunk_size,
+                    'done': _compress(self.done)}
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as fh:
+            json.dump(manifest, fh)
+        # os.replace is atomic on every platform but missing on Python 2
+        getattr(os, 'replace', os.rename)(temp_path, self.manifest_path)
+
+    def _store(self, index, start, data):
+        expected = self._chunk_bounds(index)
+        if start != expected[0] or len(data) != expected[1] - start + 1:
+            error_message = "Range %s-%s of %s was answered with %s bytes " \
+                            "at %s" % (expected[0], expected[1], self.uri,
+                                       len(data), start)
+            raise FileDownloadError(error_message)
+        with self._lock:
+            self._fileobj.seek(start)
+            self._fileobj.write(data)
+            self._fileobj.flush()
+            self.done.add(index)
+            self._save_manifest()
+
+    def _fetch_chunk(self, index):
+        start, end = self._chunk_bounds(index)
+        first, data, total = self._fetch(start, end, self.size)
+        if total != self.size:
+            # The ranges already written belong to another version
+            self._changed = True
+            error_message = "%s is now %s bytes, it was %s bytes when the " \
+                            "download started" % (self.uri, total, self.size)
+            raise FileDownloadError(error_message)
+        self._store(index, first, data)
+
+    def _discard(self):
+        for path in (self.manifest_path, self.dest):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _start(self):
+        """Fetch the first range, which also reveals the size of the file."""
+        first, data, total = self._fetch(0, self.chunk_size - 1, 0)
+        self.size = total
+        self.done = set()
+        with open(self.dest, 'wb') as fh:
+            fh.truncate(total)
+        self._fileobj = open(self.dest, 'r+b')
+        if total:
+            self._store(0, first, data)
+        else:
+            self._save_manifest()
+
+    def _fetch_remaining(self):
+        remaining = [i for i in range(self.chunk_count)
+                     if i not in self.done]
+        if self.max_workers == 1:
+            for index in remaining:
+                self._fetch_chunk(index)
+            return
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [executor.submit(self._fetch_chunk, i)
+                       for i in remaining]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                future.result()
+        finally:
+            executor.shutdown(wait=True)
+
+    def _verify_checksum(self):
+        digest = hashlib.new(self.checksum_algorithm)
+        with open(self.dest, 'rb') as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b''):
+                digest.update(block)
+        if digest.hexdigest().lower() != self.checksum.lower():
+            error_message = "%s checksum of %s is %s, expected %s" % (
+                self.checksum_algorithm, self.dest, digest.hexdigest(),
+                self.checksum)
+            raise FileDownloadChecksumMismatch(error_message)
+
+    def run(self):
+        """Download the file, resuming an earlier attempt if possible."""
+        try:
+            if self.resume and self._load_manifest():
+                self._fileobj = open(self.dest, 'r+b')
+            else:
+                self._start()
+            self._fetch_remaining()
+        finally:
+            if self._fileobj is not None:
+                self._fileobj.close()
+                self._fileobj = None
+            if self._changed:
+                self._discard()
+        os.remove(self.manifest_path)
+        if self.checksum:
+            self._verify_checksum()
@@ -81,6 +81,8 @@ class DeviceGroup(object):
 
     The pollster is used heavliy here for 'check' and 'get' methods, since we
     are often waiting for the device or devices to respond to some action.
+    Checks that look at every device query them concurrently, and each
+    device's self-device name is looked up only once per DeviceGroup.
 
     Example:
 
@@ -98,6 +100,7 @@ class DeviceGroup(object):
 
         '''
 
+        self._device_names = {}
         if kwargs:
             self.manage_extant(**kwargs)
 
@@ -132,15 +135,40 @@ class DeviceGroup(object):
                 )
             raise UnexpectedDeviceGroupType(msg)
         queried_device_names = self._get_device_names_in_group()
-        given_device_names = []
-        for device in self.devices:
-            device_name = get_device_info(device).name
-            given_device_names.append(device_name)
+        given_device_names = self._poll_devices(self._get_device_name)
         if sorted(queried_device_names) != sorted(given_device_names):
             msg = 'Given devices does not match queried devices.'
             raise UnexpectedDeviceGroupDevices(msg)
         self.ensure_all_devices_in_sync()
 
+    def _get_device_name(self, device):
+        '''Get the self-device name of a device, looking it up only once.
+
+        :param device: ManagementRoot object -- device to inspect
+        :returns: str -- name of the device
+        '''
+
+        if device not in self._device_names:
+            self._device_names[device] = get_device_info(device).name
+        return self._device_names[device]
+
+    def _poll_devices(self, func):
+        '''Call func on every device concurrently.
+
+        :param func: callable -- invoked with a device as its only argument
+        :returns: list -- the return values, in the order of self.devices
+        :raises: the first exception raised by func, if any
+        '''
+
+        from f5.multi_device.fleet import Fleet
+
+        fleet = Fleet(self.devices, max_workers=len(self.devices))
+        results = fleet.map(func)
+        for result in results:
+            if result.error is not None:
+                raise result.error
+        return results.values()
+
     def _check_type(self):
         '''Check that the device group type is correct.
 
@@ -227,7 +255,7 @@ class DeviceGroup(object):
         :param device: bigip object -- device to add to group
         '''
 
-        device_name = get_device_info(device).name
+        device_name = self._get_device_name(device)
         dg = pollster(self._get_device_group)(device)
         dg.devices_s.devices.create(name=device_name, partition=self.partition)
         pollster(self._check_device_exists_in_device_group)(device_name)
@@ -247,7 +275,7 @@ class DeviceGroup(object):
         :param device: ManagementRoot object -- device to delete from group
         '''
 
-        device_name = get_device_info(device).name
+        device_name = self._get_device_name(device)
         dg = pollster(self._get_device_group)(device)
         device_to_remove = dg.devices_s.devices.load(
             name=device_name, partition=self.partition
@@ -262,7 +290,7 @@ class DeviceGroup(object):
         '''
 
         act = device.tm.cm.devices.device.load(
-            name=get_device_info(device).name,
+            name=self._get_device_name(device),
             partition=self.partition
         )
         if act.failoverState != 'active':
@@ -302,11 +330,10 @@ class DeviceGroup(object):
         :returns: list -- list of devices that have the given status
         '''
 
-        devices_with_status = []
-        for device in self.devices:
-            if (self._check_device_failover_status(device, status)):
-                devices_with_status.append(device)
-        return devices_with_status
+        has_status = self._poll_devices(
+            lambda device: self._check_device_failover_status(device, status)
+        )
+        return [d for d, found in zip(self.devices, has_status) if found]
 
     def _check_device_failover_status(self, device, status):
         '''Determine if a device has a specific failover status.
@@ -331,12 +358,11 @@ class DeviceGroup(object):
         :returns: list -- list of devices that are in the given state
         '''
 
-        devices_with_state = []
-        for device in self.devices:
-            act = device.tm.cm.devices.device.load(
-                name=get_device_info(device).name,
+        def _get_failover_state(device):
+            return device.tm.cm.devices.device.load(
+                name=self._get_device_name(device),
                 partition=self.partition
-            )
-            if act.failoverState == state:
-                devices_with_state.append(device)
-        return devices_with_state
+            ).failoverState
+
+        states = self._poll_devices(_get_failover_state)
+        return [d for d, current in zip(self.devices, states) if current == state]
@@ -82,3 +82,11 @@ class UnexpectedDeviceGroupDevices(DeviceGroupError):
 
 class UnexpectedDeviceGroupType(DeviceGroupError):
     pass
+
+
+class FleetError(F5SDKError):
+    pass
+
+
+class DeviceTimeout(FleetError):
+    pass
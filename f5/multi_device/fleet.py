@@ -0,0 +1,271 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''Run the same operation against many BIG-IP® devices at once.
+
+A :class:`Fleet` holds a list of ``ManagementRoot`` objects and runs a
+callable (or a dotted resource path) against each of them on a bounded pool
+of threads.  Every device gets a :class:`DeviceResult`, so one unreachable
+or misbehaving device does not hide the results from the others.
+
+.. code-block:: python
+
+    >>> from f5.multi_device.fleet import Fleet
+    >>> fleet = Fleet(devices, max_workers=32, timeout=60, rate_limit=5)
+    >>> results = fleet.map(lambda mgmt: mgmt.tm.sys.version.load())
+    >>> for result in results.failed:
+    ...     print(result.device.hostname, result.error)
+    >>> versions = fleet.map('tm.sys.version.load')
+'''
+
+import threading
+import time
+
+from requests.adapters import BaseAdapter
+from six import string_types
+
+from f5.multi_device.exceptions import DeviceTimeout
+from f5.multi_device.exceptions import FleetError
+
+
+class RateLimiter(object):
+    '''Token bucket allowing ``rate`` calls per second, ``burst`` at once.
+
+    :meth:`acquire` reserves a token and sleeps until it is due, so callers
+    are served in the order they asked.
+    '''
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise FleetError('rate must be a positive number, got %r' % rate)
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.clock = time.time
+        self.sleep = time.sleep
+        self._tokens = float(self.burst)
+        self._updated = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = self.clock()
+            if self._updated is not None:
+                refill = (now - self._updated) * self.rate
+                self._tokens = min(self.burst, self._tokens + refill)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay:
+            self.sleep(delay)
+
+
+class RateLimitedAdapter(BaseAdapter):
+    '''Transport adapter that passes each request through a RateLimiter.'''
+
+    def __init__(self, adapter, limiter):
+        super(RateLimitedAdapter, self).__init__()
+        self.adapter = adapter
+        self.limiter = limiter
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire()
+        return self.adapter.send(request, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
+class DeviceResult(object):
+    '''Outcome of running an operation against one device.
+
+    :ivar device: the ``ManagementRoot`` the operation ran against
+    :ivar value: what the operation returned, or None if it failed
+    :ivar error: the exception it raised (``DeviceTimeout`` if it did not
+                 finish in time), or None
+    :ivar elapsed: seconds the operation ran for, or None if it timed out
+    '''
+
+    def __init__(self, device):
+        self.device = device
+        self.value = None
+        self.error = None
+        self.elapsed = None
+        self.started = None
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    def __repr__(self):
+        state = 'ok' if self.succeeded else repr(self.error)
+        return '<DeviceResult %s %s>' % (
+            getattr(self.device, 'hostname', self.device), state)
+
+
+class FleetResults(list):
+    '''The DeviceResult objects of one :meth:`Fleet.map`, in device order.'''
+
+    @property
+    def succeeded(self):
+        return [r for r in self if r.succeeded]
+
+    @property
+    def failed(self):
+        return [r for r in self if not r.succeeded]
+
+    def values(self):
+        return [r.value for r in self]
+
+    def raise_on_failure(self):
+        '''Raise FleetError naming every device that failed, if any did.'''
+        failed = self.failed
+        if failed:
+            error_message = '%d of %d devices failed: %s' % (
+                len(failed), len(self), ', '.join(repr(r) for r in failed))
+            raise FleetError(error_message)
+
+
+def _resolve_path(device, path):
+    target = device
+    for attribute in path.split('.'):
+        target = getattr(target, attribute)
+    return target
+
+
+class Fleet(object):
+    '''A set of devices to run operations against concurrently.
+
+    :param devices: list -- ManagementRoot objects
+    :param max_workers: int -- upper bound on devices worked on at once
+    :param timeout: float -- default seconds an operation may run on one
+                    device before that device is reported as timed out
+    :param rate_limit: float -- if given, maximum HTTP requests per second
+                       sent to each device.  The limit is installed on the
+                       devices' sessions and stays in effect after the call.
+    :param burst: int -- requests allowed back to back under the rate limit
+
+    A timed out operation cannot be interrupted: its thread runs on in the
+    background until the underlying request returns, so pair ``timeout``
+    with the ``timeout`` argument of ``ManagementRoot`` to bound requests.
+    '''
+
+    def __init__(self, devices, max_workers=16, timeout=None,
+                 rate_limit=None, burst=1):
+        self.devices = list(devices)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.clock = time.time
+        self.limiters = []
+        if rate_limit:
+            for device in self.devices:
+                self.limiters.append(
+                    self._install_rate_limit(device, rate_limit, burst))
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    @staticmethod
+    def _install_rate_limit(device, rate_limit, burst):
+        session = device._meta_data['icr_session'].session
+        adapter = session.get_adapter('https://')
+        if isinstance(adapter, RateLimitedAdapter):
+            adapter = adapter.adapter
+        limiter = RateLimiter(rate_limit, burst)
+        session.mount('https://', RateLimitedAdapter(adapter, limiter))
+        return limiter
+
+    def _run(self, result, func, args, kwargs):
+        result.started = self.clock()
+        try:
+            if isinstance(func, string_types):
+                value = _resolve_path(result.device, func)(*args, **kwargs)
+            else:
+                value = func(result.device, *args, **kwargs)
+            error = None
+        except Exception as ex:
+            value, error = None, ex
+        return value, error, self.clock() - result.started
+
+    def _wait_time(self, pending, futures, timeout):
+        if timeout is None:
+            return None
+        now = self.clock()
+        remaining = [timeout]
+        for future in pending:
+            started = futures[future].started
+            if started is not None:
+                remaining.append(started + timeout - now)
+        return max(0, min(remaining))
+
+    def _expire(self, pending, futures, timeout):
+        now = self.clock()
+        for future in list(pending):
+            result = futures[future]
+            if result.started is not None and \
+                    now - result.started >= timeout:
+                future.cancel()
+                result.error = DeviceTimeout(
+                    'Operation did not finish within %s seconds' % timeout)
+                pending.discard(future)
+
+    def map(self, func, args=(), kwargs=None, timeout=None):
+        '''Run ``func`` against every device.
+
+        :param func: callable invoked as ``func(device, *args, **kwargs)``,
+                     or a dotted path such as ``'tm.sys.version.load'``
+                     which is looked up on each device and called with
+                     ``*args, **kwargs``
+        :param timeout: float -- overrides the fleet's default timeout
+        :returns: FleetResults -- one DeviceResult per device, in order
+        '''
+        kwargs = kwargs or {}
+        if timeout is None:
+            timeout = self.timeout
+        results = FleetResults(DeviceResult(d) for d in self.devices)
+        if not results:
+            return results
+        # Imported here so that importing f5.multi_device does not need the
+        # futures backport on Python 2
+        from concurrent.futures import FIRST_COMPLETED
+        from concurrent.futures import ThreadPoolExecutor
+        from concurrent.futures import wait
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(results)))
+        futures = {}
+        try:
+            for result in results:
+                future = executor.submit(
+                    self._run, result, func, args, kwargs)
+                futures[future] = result
+            pending = set(futures)
+            while pending:
+                done, pending = wait(
+                    pending, timeout=self._wait_time(pending, futures, timeout),
+                    return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = futures[future]
+                    result.value, result.error, result.elapsed = \
+                        future.result()
+                if timeout is not None:
+                    self._expire(pending, futures, timeout)
+        finally:
+            executor.shutdown(wait=False)
+        return results
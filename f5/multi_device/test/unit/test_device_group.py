@@ -198,3 +198,38 @@ def test_validate_given_devices_dont_match(mock_get_dg, mock_dev_map, BigIPs):
             devices=BigIPs, device_group_name='device_not_found',
             device_group_type='sync-failover', device_group_partition='Common')
     assert 'Given devices does not match queried devices.' in str(ex.value)
+
+
+def test_device_name_looked_up_once(DeviceGroupCreateNew):
+    dg, mock_bigips = DeviceGroupCreateNew
+    for device in mock_bigips:
+        device.tm.cm.devices.get_collection.reset_mock()
+    dg._device_names = {}
+    assert dg._get_device_name(mock_bigips[0]) == 'test'
+    assert dg._get_device_name(mock_bigips[0]) == 'test'
+    assert mock_bigips[0].tm.cm.devices.get_collection.call_count == 1
+
+
+def test__get_devices_by_activation_state(DeviceGroupCreateNew):
+    dg, mock_bigips = DeviceGroupCreateNew
+    for i, device in enumerate(mock_bigips):
+        state = 'active' if i % 2 else 'standby'
+        device.tm.cm.devices.device.load.return_value = FakeActDevice(state)
+    assert dg._get_devices_by_activation_state('active') == \
+        [mock_bigips[1], mock_bigips[3]]
+
+
+def test__get_devices_by_failover_status(DeviceGroupCreateNew):
+    dg, mock_bigips = DeviceGroupCreateNew
+    for i, device in enumerate(mock_bigips):
+        status = 'In Sync' if i else 'Changes Pending'
+        device.tm.cm.sync_status.entries = {dg.sync_status_entry: {
+            'nestedStats': {'entries': {'status': {'description': status}}}}}
+    assert dg._get_devices_by_failover_status('In Sync') == mock_bigips[1:]
+
+
+def test__poll_devices_raises_device_error(DeviceGroupCreateNew):
+    dg, mock_bigips = DeviceGroupCreateNew
+    mock_bigips[2].tm.cm.sync_status.refresh.side_effect = ValueError('down')
+    with pytest.raises(ValueError):
+        dg._get_devices_by_failover_status('In Sync')
@@ -0,0 +1,158 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from f5.multi_device.exceptions import DeviceTimeout
+from f5.multi_device.exceptions import FleetError
+from f5.multi_device.fleet import Fleet
+from f5.multi_device.fleet import RateLimitedAdapter
+from f5.multi_device.fleet import RateLimiter
+from f5.multi_device.utils import get_device_names_to_objects
+
+import mock
+import pytest
+import subprocess
+import sys
+import threading
+import time
+
+
+class MockDeviceInfo(object):
+    def __init__(self, name):
+        self.name = name
+        self.selfDevice = 'true'
+
+
+def make_devices(count):
+    devices = []
+    for i in range(count):
+        device = mock.MagicMock()
+        device.hostname = 'bigip%s' % i
+        device.tm.cm.devices.get_collection.return_value = \
+            [MockDeviceInfo('device%s' % i)]
+        device.tm.cm.devices.get_collection.__name__ = 'get_collection'
+        devices.append(device)
+    return devices
+
+
+def test_map_callable_keeps_device_order():
+    devices = make_devices(5)
+    results = Fleet(devices, max_workers=3).map(lambda d: d.hostname)
+    assert results.values() == ['bigip%s' % i for i in range(5)]
+    assert [r.device for r in results] == devices
+    assert all(r.elapsed is not None for r in results)
+
+
+def test_map_path_with_arguments():
+    devices = make_devices(2)
+    results = Fleet(devices).map('tm.sys.version.load', kwargs={'a': 1})
+    for device in devices:
+        device.tm.sys.version.load.assert_called_once_with(a=1)
+    assert len(results.succeeded) == 2
+
+
+def test_map_partial_failure():
+    devices = make_devices(3)
+    devices[1].tm.sys.version.load.side_effect = ValueError('down')
+    results = Fleet(devices).map('tm.sys.version.load')
+    assert [r.device for r in results.failed] == [devices[1]]
+    assert isinstance(results[1].error, ValueError)
+    assert results[1].value is None
+    with pytest.raises(FleetError) as ex:
+        results.raise_on_failure()
+    assert 'bigip1' in str(ex.value)
+
+
+def test_map_is_bounded_by_max_workers():
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    def work(device):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.01)
+        with lock:
+            state['active'] -= 1
+
+    Fleet(make_devices(8), max_workers=3).map(work)
+    assert state['peak'] == 3
+
+
+def test_map_timeout():
+    release = threading.Event()
+
+    def work(device):
+        if device.hostname == 'bigip0':
+            release.wait(5)
+        return device.hostname
+
+    results = Fleet(make_devices(2), timeout=0.05).map(work)
+    release.set()
+    assert isinstance(results[0].error, DeviceTimeout)
+    assert results[0].elapsed is None
+    assert results[1].value == 'bigip1'
+
+
+def test_map_no_devices():
+    assert Fleet([]).map(lambda d: d) == []
+
+
+def test_rate_limiter_spaces_out_calls():
+    limiter = RateLimiter(rate=2, burst=2)
+    limiter.clock = mock.MagicMock(return_value=100.0)
+    limiter.sleep = mock.MagicMock()
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.sleep.call_count == 0
+    limiter.acquire()
+    limiter.sleep.assert_called_once_with(0.5)
+    limiter.acquire()
+    assert limiter.sleep.call_args == mock.call(1.0)
+    limiter.clock.return_value = 110.0
+    limiter.sleep.reset_mock()
+    limiter.acquire()
+    assert limiter.sleep.call_count == 0
+
+
+def test_rate_limiter_rejects_bad_rate():
+    with pytest.raises(FleetError):
+        RateLimiter(0)
+
+
+def test_rate_limit_installed_on_each_session():
+    devices = make_devices(2)
+    fleet = Fleet(devices, rate_limit=10)
+    assert len(fleet.limiters) == 2
+    for device in devices:
+        session = device._meta_data['icr_session'].session
+        prefix, adapter = session.mount.call_args[0]
+        assert prefix == 'https://'
+        assert isinstance(adapter, RateLimitedAdapter)
+        assert adapter.adapter is session.get_adapter.return_value
+        adapter.limiter.sleep = mock.MagicMock()
+        adapter.send('request', timeout=1)
+        adapter.adapter.send.assert_called_once_with('request', timeout=1)
+
+
+def test_get_device_names_to_objects():
+    devices = make_devices(3)
+    assert get_device_names_to_objects(devices) == {
+        'device0': devices[0], 'device1': devices[1], 'device2': devices[2]}
+
+
+def test_import_does_not_need_futures():
+    script = ('import sys, f5.multi_device.device_group, f5.multi_device.fleet; '
+              'sys.exit("concurrent.futures" in sys.modules)')
+    assert subprocess.call([sys.executable, '-c', script]) == 0
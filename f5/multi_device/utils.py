@@ -14,16 +14,19 @@
 #
 #
 
-from f5.utils.decorators import poll_for_exceptionless_callable
+from f5.utils.decorators import poll_with_backoff
 
 
 def pollster(callable):
     '''Wraps the poll to get attempts and interval applicable for cluster.
 
+    Waits start at 0.1 seconds and double up to 2 seconds, which gives up
+    after roughly 40 seconds of waiting in total.
+
     :param callable: callable -- callable to pass into poll
     '''
 
-    return poll_for_exceptionless_callable(callable, 20, 2)
+    return poll_with_backoff(callable, 25, 2)
 
 
 def get_device_info(bigip):
@@ -46,8 +49,11 @@ def get_device_names_to_objects(devices):
     :returns: dict -- mapping of hostnames to ManagementRoot objects
     '''
 
+    from f5.multi_device.fleet import Fleet
+
     name_to_object = {}
-    for device in devices:
-        device_name = get_device_info(device).name
-        name_to_object[device_name] = device
+    for result in Fleet(devices).map(get_device_info):
+        if result.error is not None:
+            raise result.error
+        name_to_object[result.value.name] = result.device
     return name_to_object
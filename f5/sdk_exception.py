@@ -58,12 +58,27 @@ class ExclusiveAttributesPresent(F5SDKError):
     pass
 
 
+class FileDownloadError(F5SDKError):
+    """Raise when the file transfer worker answers a range unexpectedly."""
+    pass
+
+
+class FileDownloadChecksumMismatch(FileDownloadError):
+    """Raise when a downloaded file does not match the expected checksum."""
+    pass
+
+
 class FileMustNotHaveDotISOExtension(F5SDKError):
     """Raise this when file has ISO extension."""
     def __init__(self, filename):
         super(FileMustNotHaveDotISOExtension, self).__init__(filename)
 
 
+class FileUploadSizeError(F5SDKError):
+    """Raise when an upload's size is unknown or does not match its data."""
+    pass
+
+
 class GenerationMismatch(F5SDKError):
     """The server reported BIG-IP® is not the expacted value."""
     pass
@@ -85,6 +100,21 @@ class InvalidForceType(ValueError):
     pass
 
 
+class InvalidConflictPolicy(ValueError):
+    """Must be one of 'fail', 'merge' or 'last_writer_wins'."""
+    pass
+
+
+class InvalidQuery(ValueError):
+    """A collection query was given a value OData cannot express."""
+    pass
+
+
+class InvalidTransactionPlan(ValueError):
+    """A transaction plan was given invalid settings or dependencies."""
+    pass
+
+
 class InvalidName(ValueError):
     """Raised during creation when a given resource name is invalid."""
     pass
@@ -0,0 +1,291 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Read-through cache for the GET requests issued by resources.
+
+A ``ManagementRoot`` created with a :class:`ResourceCache` answers repeated
+``load``, ``refresh``, ``exists`` and ``get_collection`` calls from memory:
+
+.. code-block:: python
+
+    >>> from f5.bigip import ManagementRoot
+    >>> from f5.utils.cache import ResourceCache
+    >>> mgmt = ManagementRoot('192.168.1.1', 'admin', 'admin',
+    ...                       cache=ResourceCache(ttl=10, max_entries=512))
+    >>> pool = mgmt.tm.ltm.pools.pool.load(name='web', partition='Common')
+    >>> pool = mgmt.tm.ltm.pools.pool.load(name='web', partition='Common')
+    >>> mgmt.cache.stats['hits']
+    1
+
+Entries are keyed by the URI path and query parameters of the request.  A
+fresh entry (younger than ``ttl``) is served without contacting the device.
+A stale entry is revalidated by asking the device for ``$select=generation``
+only; if the generation of the object (or of every item of a collection) is
+unchanged, the entry is served and its age reset, otherwise the full object
+is downloaded again.
+
+Writes made through the SDK (create, modify, update, delete) drop the
+entries of the object written to, its subcollections and its parent
+collection.  Changes made by other clients, or by commands such as
+``tm.sys.config.exec_cmd('load')``, are only noticed once an entry is stale,
+so choose ``ttl`` according to how long a stale read is acceptable, or call
+:meth:`ResourceCache.clear`.  Statistics endpoints are never cached.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+from six import binary_type
+from six import iteritems
+from six import string_types
+from six import text_type
+
+from f5.utils.json_codec import get_codec
+from icontrol.session import generate_bigip_uri
+
+try:
+    import urlparse
+except ImportError:
+    import urllib.parse as urlparse
+
+
+class CachedResponse(object):
+    """Stand-in for a ``requests.Response`` returned by the cache.
+
+    ``JSONCodec.decode`` calls :meth:`json` on it rather than decoding
+    ``content`` again, so the body the cache decoded when it fetched the
+    response is handed over instead of being decoded a second time.
+
+    Args:
+        content (bytes): The raw body.
+        codec (JSONCodec): Codec decoding ``content``.
+        body: The body already decoded from ``content``, returned by the
+            first call to :meth:`json`.
+    """
+    cached = True
+
+    def __init__(self, content, status_code=200, headers=None, codec=None,
+                 body=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self._codec = codec or get_codec()
+        self._body = body
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        body, self._body = self._body, None
+        if body is None:
+            body = self._codec.loads(self.content)
+        return body
+
+
+class _Entry(object):
+    __slots__ = ('content', 'status_code', 'headers', 'token', 'stored')
+
+    def __init__(self, content, status_code, headers, token, stored):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers
+        self.token = token
+        self.stored = stored
+
+
+def _params_to_dict(params):
+    if not params:
+        return {}
+    if isinstance(params, string_types):
+        return dict(urlparse.parse_qsl(params, keep_blank_values=True))
+    return dict(params)
+
+
+def _request_path(uri, kwargs):
+    """Return ``(path, params)`` of the request a session verb would send."""
+    if kwargs.get('uri_as_parts'):
+        name = kwargs.get('uuid') or kwargs.get('id')
+        name = name or kwargs.get('name', '')
+        uri = generate_bigip_uri(
+            uri, kwargs.get('partition', ''), name,
+            kwargs.get('subPath', ''), kwargs.get('suffix', ''),
+            transform_name=kwargs.get('transform_name', False),
+            transform_subpath=kwargs.get('transform_subpath', False))
+    parts = urlparse.urlsplit(uri)
+    params = dict(urlparse.parse_qsl(parts.query, keep_blank_values=True))
+    params.update(_params_to_dict(kwargs.get('params')))
+    return parts.path.rstrip('/'), params
+
+
+def _generation_token(body):
+    """The generation of a resource, or the generations of a collection."""
+    if 'items' in body:
+        token = tuple(item.get('generation') for item in body['items'])
+        return None if None in token else token
+    return body.get('generation')
+
+
+class ResourceCache(object):
+    """LRU cache of GET responses with a TTL and generation revalidation.
+
+    Args:
+        ttl (float): Seconds an entry is served without asking the device.
+        max_entries (int): Entries kept before the least recently used one
+            is evicted.
+        revalidate (bool): Revalidate stale entries with a
+            ``$select=generation`` request instead of dropping them.
+        codec (JSONCodec): Codec decoding the responses.  None for the
+            codec of the ``ManagementRoot`` the cache is given to.
+
+    Attributes:
+        stats (dict): Counters of ``hits`` (responses served from the
+            cache, including revalidated ones), ``misses`` (full GETs sent),
+            ``revalidations`` (``$select=generation`` GETs sent),
+            ``evictions`` and ``invalidations``.
+    """
+    STAT_NAMES = ('hits', 'misses', 'revalidations', 'evictions',
+                  'invalidations')
+
+    def __init__(self, ttl=30.0, max_entries=1024, revalidate=True,
+                 codec=None):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.revalidate = revalidate
+        self.codec = codec
+        self.clock = time.time
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(self.STAT_NAMES, 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = dict.fromkeys(self.STAT_NAMES, 0)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    @staticmethod
+    def _key(path, params):
+        return path, tuple(sorted((str(k), str(v))
+                                  for k, v in iteritems(params)))
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def _codec(self):
+        return self.codec or get_codec()
+
+    def _fetch(self, send, key, uri, kwargs):
+        self._count('misses')
+        response = send(uri, **kwargs)
+        codec = self._codec()
+        body = codec.decode(response)
+        content = getattr(response, 'content', None)
+        if not isinstance(content, binary_type) or not content:
+            content = codec.dumps(body)
+            if isinstance(content, text_type):
+                content = content.encode('utf-8')
+        status_code = getattr(response, 'status_code', 200)
+        headers = getattr(response, 'headers', None)
+        if isinstance(body, dict) and \
+                not str(body.get('kind', '')).endswith('stats'):
+            self._store(key, _Entry(content, status_code, headers,
+                                    _generation_token(body), self.clock()))
+        return CachedResponse(content, status_code, headers, codec, body)
+
+    def _is_current(self, send, uri, kwargs, entry):
+        if not self.revalidate or entry.token is None:
+            return False
+        self._count('revalidations')
+        kwargs = dict(kwargs)
+        params = _params_to_dict(kwargs.get('params'))
+        params['$select'] = 'generation'
+        kwargs['params'] = params
+        body = self._codec().decode(send(uri, **kwargs))
+        return _generation_token(body) == entry.token
+
+    def get(self, send, uri, **kwargs):
+        """Serve ``send(uri, **kwargs)`` from the cache when possible.
+
+        Args:
+            send (callable): The session's ``get`` verb.
+            uri (str): URI passed to the verb.
+
+        Returns:
+            A :class:`CachedResponse`.
+        """
+        key = self._key(*_request_path(uri, kwargs))
+        entry = self._lookup(key)
+        if entry is not None:
+            fresh = self.clock() - entry.stored < self.ttl
+            if fresh or self._is_current(send, uri, kwargs, entry):
+                if not fresh:
+                    entry.stored = self.clock()
+                self._count('hits')
+                return CachedResponse(entry.content, entry.status_code,
+                                      entry.headers, self._codec())
+        return self._fetch(send, key, uri, kwargs)
+
+    def invalidate(self, uri, method='delete', **kwargs):
+        """Drop the entries affected by a write to ``uri``.
+
+        A write drops the entries of ``uri`` itself and of its parent
+        collection.  Writes other than POST also drop the subcollections of
+        ``uri``, because the body of a PUT, PATCH or DELETE can change them.
+
+        Args:
+            uri (str): URI the write was sent to.
+            method (str): HTTP method of the write.
+        """
+        path = _request_path(uri, kwargs)[0]
+        parent = path.rsplit('/', 1)[0]
+        prefix = path + '/'
+        descendants = method.lower() != 'post'
+
+        def affected(key_path):
+            if key_path in (path, parent):
+                return True
+            return descendants and key_path.startswith(prefix)
+
+        with self._lock:
+            stale = [key for key in self._entries if affected(key[0])]
+            for key in stale:
+                del self._entries[key]
+            self.stats['invalidations'] += len(stale)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
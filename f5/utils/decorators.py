@@ -45,3 +45,32 @@ def poll_for_exceptionless_callable(callable, attempts, interval):
                 time.sleep(interval)
                 continue
     return poll
+
+
+def poll_with_backoff(callable, attempts, max_interval, initial_interval=0.1,
+                      factor=2):
+    '''Poll a callable like the above, waiting longer after each failure.
+
+    Conditions that are met quickly are noticed quickly, while the waits
+    grow towards ``max_interval`` for those that take a while.
+
+    :param callable: callable to invoke in loop -- if no exception is raised
+                    the call is considered succeeded
+    :param attempts: number of iterations to attempt
+    :param max_interval: upper bound, in seconds, of a single wait
+    :param initial_interval: seconds to wait after the first failure
+    :param factor: multiplier applied to the wait after every failure
+    '''
+
+    @wraps(callable)
+    def poll(*args, **kwargs):
+        interval = initial_interval
+        for attempt in range(attempts):
+            try:
+                return callable(*args, **kwargs)
+            except Exception as ex:
+                if attempt == attempts-1:
+                    raise MaximumAttemptsReached(ex)
+                time.sleep(interval)
+                interval = min(max_interval, interval * factor)
+    return poll
@@ -0,0 +1,234 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""JSON encoding and decoding of request and response bodies.
+
+Every ``ManagementRoot`` owns a :class:`JSONCodec`.  The default one uses
+the standard library.  A faster implementation can be chosen by module
+name when connecting; if it is not installed the standard library is used:
+
+.. code-block:: python
+
+    >>> from f5.bigip import ManagementRoot
+    >>> mgmt = ManagementRoot('192.168.1.1', 'admin', 'admin',
+    ...                       json_codec='orjson')
+    >>> mgmt.json_codec.name
+    'orjson'
+
+Responses are decoded straight from their bytes, skipping the charset
+detection and text decoding of ``requests.Response.json``.
+
+:meth:`JSONCodec.iter_items` parses the ``items`` of a collection body
+incrementally as the body arrives, so a large collection never has to
+be held in memory both as text and as Python objects.
+"""
+
+import codecs
+import importlib
+import json
+import logging
+import sys
+
+from six import binary_type
+
+
+logger = logging.getLogger(__name__)
+
+# Bytes read at a time from a streamed response.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+class JSONCodec(object):
+    """Encode and decode JSON with ``module`` (``loads`` and ``dumps``).
+
+    Args:
+        module (module): A module with the ``json`` module's ``loads`` and
+            ``dumps`` functions, such as ``orjson``, ``ujson`` or
+            ``simplejson``.  ``loads`` must accept bytes.
+    """
+
+    def __init__(self, module=json):
+        self.module = module
+        self.name = module.__name__
+
+    @property
+    def is_stdlib(self):
+        """True if this codec is the ``json`` module ``requests`` uses."""
+        return self.module is json
+
+    def loads(self, data):
+        if self.is_stdlib and isinstance(data, binary_type) and \
+                sys.version_info[:2] < (3, 6):
+            data = data.decode('utf-8')
+        return self.module.loads(data)
+
+    def dumps(self, obj):
+        return self.module.dumps(obj)
+
+    def decode(self, response):
+        """Decode the body of a ``requests.Response``.
+
+        Cached responses and objects without a bytes ``content`` are
+        decoded with their own ``json()`` method.
+        """
+        content = getattr(response, 'content', None)
+        if getattr(response, 'cached', False) is True or \
+                not isinstance(content, binary_type) or not content:
+            return response.json()
+        return self.loads(content)
+
+    def iter_items(self, chunks, key='items'):
+        """Return an :class:`ItemStream` over the ``key`` array of a body.
+
+        Args:
+            chunks: Iterable of bytes, for example ``iter_content()`` of a
+                response requested with ``stream=True``.
+            key (str): Name of the top level array to iterate over.
+        """
+        return ItemStream(chunks, key)
+
+
+def get_codec(codec=None):
+    """Return the codec to use for ``codec``.
+
+    Args:
+        codec: None for the standard library, a :class:`JSONCodec`, or the
+            name of a module to build one from.  A module that cannot be
+            imported is logged and replaced by the standard library.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if not codec or codec == 'json':
+        return JSONCodec()
+    try:
+        return JSONCodec(importlib.import_module(codec))
+    except ImportError:
+        logger.warning('JSON codec %r is not installed, using json', codec)
+        return JSONCodec()
+
+
+class ItemStream(object):
+    """Iterate over the elements of one array of a streamed JSON object.
+
+    The other top level members of the object are collected in
+    :attr:`extra` as they are passed, so :attr:`extra` is complete once the
+    iteration has finished.
+
+    Args:
+        chunks: Iterable of bytes making up the JSON document.
+        key (str): Name of the top level array to iterate over.
+    """
+
+    def __init__(self, chunks, key='items'):
+        self.chunks = chunks
+        self.key = key
+        self.extra = {}
+        self._iterator = None
+
+    def __iter__(self):
+        if self._iterator is None:
+            self._iterator = _StreamParser(self).items()
+        return self._iterator
+
+
+class _StreamParser(object):
+    """Incremental parser built on ``json.JSONDecoder.raw_decode``."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.chunks = iter(stream.chunks)
+        self.decoder = json.JSONDecoder()
+        self.reader = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            raise ValueError('Truncated JSON document')
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+        text = self.reader.decode(chunk or b'', final=self.eof)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+
+    def _skip(self):
+        """Skip whitespace and return the next character."""
+        while True:
+            while self.pos < len(self.buffer) and \
+                    self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ''
+            self._fill()
+
+    def _expect(self, characters):
+        char = self._skip()
+        if char not in characters or not char:
+            raise ValueError('Expected %r at offset %d, found %r' % (
+                characters, self.pos, char))
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next value, reading until it is followed by more."""
+        self._skip()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # A number at the end of the buffer may continue in the next
+            # chunk, so only accept a value that something follows.
+            following = end
+            while following < len(self.buffer) and \
+                    self.buffer[following] in _WHITESPACE:
+                following += 1
+            if following < len(self.buffer) or self.eof:
+                self.pos = following
+                return value
+            self._fill()
+
+    def items(self):
+        self._expect('{')
+        if self._skip() == '}':
+            self.pos += 1
+            return
+        while True:
+            name = self._value()
+            self._expect(':')
+            if name == self.stream.key:
+                self._expect('[')
+                if self._skip() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.stream.extra[name] = self._value()
+            if self._expect(',}') == '}':
+                return
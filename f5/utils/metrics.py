@@ -0,0 +1,338 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Instrumentation of the HTTP requests issued by resources.
+
+Every ``ManagementRoot`` owns a :class:`RequestMetrics`.  Each request sent
+by a resource, a collection, a command or a file transfer is timed and
+recorded in a latency histogram keyed by its endpoint template and HTTP
+method, and is passed to the hooks registered on the ``ManagementRoot``:
+
+.. code-block:: python
+
+    >>> from f5.bigip import ManagementRoot
+    >>> mgmt = ManagementRoot('192.168.1.1', 'admin', 'admin')
+    >>> def slow(event):
+    ...     if event.latency > 1:
+    ...         print(event.method, event.endpoint, event.latency)
+    >>> mgmt.add_request_hook(after=slow)
+    >>> mgmt.tm.ltm.pools.pool.load(name='web', partition='Common')
+    >>> mgmt.metrics.summary()[0]
+    {'endpoint': 'tm/ltm/pool/{name}', 'method': 'get', 'count': 1, ...}
+
+The endpoint template is the path of the request below ``/mgmt/``, with the
+object names (``~Partition~name`` segments, or the name of the resource the
+request is about) replaced by ``{name}`` and numeric identifiers, such as
+transaction IDs, by ``{id}``.  The files of a file transfer endpoint share
+one template, e.g. ``shared/file-transfer/uploads/{name}``.  GETs answered
+by a ``ResourceCache`` send no request and are not recorded.
+"""
+
+from bisect import bisect_left
+import logging
+import threading
+import time
+
+from six import binary_type
+from six import integer_types
+from six import string_types
+from six import text_type
+from six.moves.urllib.parse import unquote
+from six.moves.urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+
+def endpoint_template(uri, name=None):
+    """Return the endpoint template of ``uri``.
+
+    Args:
+        uri (str): The URI of the request.
+        name (str): The name of the object the request is about, for the
+            objects whose URI does not carry a partition.
+    """
+    path = urlsplit(uri).path
+    if path.startswith('/mgmt/'):
+        path = path[len('/mgmt/'):]
+    segments = []
+    for segment in path.strip('/').split('/'):
+        if segment.startswith('~') or (
+                name is not None and unquote(segment) == name):
+            segment = '{name}'
+        elif segment.isdigit():
+            segment = '{id}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+def _length(body):
+    if isinstance(body, (binary_type, text_type)):
+        return len(body)
+    return None
+
+
+def _request_bytes(response, kwargs):
+    request = getattr(response, 'request', None)
+    size = _length(getattr(request, 'body', None))
+    if size is None:
+        size = _length(kwargs.get('data'))
+    return size
+
+
+def _response_bytes(response, stream):
+    """Size of the body of ``response``, without reading a stream."""
+    if not stream:
+        size = _length(getattr(response, 'content', None))
+        if size is not None:
+            return size
+    headers = getattr(response, 'headers', None)
+    try:
+        length = headers.get('Content-Length')
+    except AttributeError:
+        return None
+    if isinstance(length, string_types + integer_types):
+        return int(length)
+    return None
+
+
+class RequestEvent(object):
+    """A request sent to the device, as seen by the request hooks.
+
+    ``before`` hooks see the event before the request is sent, with only
+    ``method``, ``uri``, ``endpoint`` and ``started`` set.
+
+    Attributes:
+        method (str): HTTP method, e.g. ``'get'``.
+        uri (str): URI passed to the session, without the query parameters
+            given in ``params``.
+        endpoint (str): Endpoint template, e.g. ``'tm/ltm/pool/{name}'``.
+        started (float): ``time.time()`` when the request was issued.
+        latency (float): Seconds until the response, retries included.
+        request_bytes (int): Size of the request body, None if unknown.
+        response_bytes (int): Size of the response body, None if unknown.
+        status (int): HTTP status of the response, None if the device did
+            not answer.
+        retries (int): Number of retries the ``RetryPolicy`` made.
+        error (Exception): The exception raised by the request, if any.
+    """
+    __slots__ = ('method', 'uri', 'endpoint', 'started', 'latency',
+                 'request_bytes', 'response_bytes', 'status', 'retries',
+                 'error')
+
+    def __init__(self, method, uri, endpoint, started):
+        self.method = method
+        self.uri = uri
+        self.endpoint = endpoint
+        self.started = started
+        self.latency = None
+        self.request_bytes = None
+        self.response_bytes = None
+        self.status = None
+        self.retries = 0
+        self.error = None
+
+    def __repr__(self):
+        return '<RequestEvent %s %s %s %.3fs>' % (
+            self.method.upper(), self.endpoint, self.status,
+            self.latency or 0)
+
+
+class LatencyHistogram(object):
+    """Counts of latencies in exponentially growing buckets.
+
+    Bucket ``i`` counts the latencies up to ``smallest * growth ** i``
+    seconds, the last bucket counts the latencies above all the others.  A
+    percentile is reported as the upper bound of the bucket it falls in,
+    so it overestimates by at most ``growth - 1`` (19% by default).
+
+    Args:
+        smallest (float): Upper bound of the first bucket, in seconds.
+        growth (float): Ratio between the bounds of consecutive buckets.
+        buckets (int): Number of bounded buckets.
+    """
+
+    def __init__(self, smallest=0.0005, growth=2 ** 0.25, buckets=72):
+        self.bounds = [smallest * growth ** i for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def percentile(self, percent):
+        """Latency, in seconds, under which ``percent`` of requests were."""
+        if not self.count:
+            return None
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                if index == len(self.bounds):
+                    break
+                return min(self.bounds[index], self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {'count': self.count, 'errors': self.errors,
+                'total': self.total, 'mean': self.mean,
+                'p50': self.percentile(50), 'p90': self.percentile(90),
+                'p99': self.percentile(99), 'max': self.max}
+
+
+class RequestMetrics(object):
+    """Latency histograms and hooks for the requests of a ``ManagementRoot``.
+
+    A hook is a callable taking a :class:`RequestEvent`.  ``before`` hooks
+    are called just before a request is sent, ``after`` hooks once it
+    completed or failed.  Hooks run on the thread that issued the request,
+    so keep them quick; an exception raised by a hook is logged and
+    otherwise ignored.
+
+    Args:
+        histograms (bool): Keep a :class:`LatencyHistogram` per endpoint
+            template and method.
+    """
+
+    def __init__(self, histograms=True):
+        self.keep_histograms = histograms
+        self.histograms = {}
+        self.clock = time.time
+        self._before = ()
+        self._after = ()
+        self._lock = threading.Lock()
+
+    def add_hook(self, after=None, before=None):
+        """Register hooks called after and before every request."""
+        with self._lock:
+            if before is not None:
+                self._before += (before,)
+            if after is not None:
+                self._after += (after,)
+
+    def remove_hook(self, hook):
+        """Unregister ``hook`` wherever it was registered."""
+        with self._lock:
+            self._before = tuple(h for h in self._before if h != hook)
+            self._after = tuple(h for h in self._after if h != hook)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def histogram(self, endpoint, method):
+        """The :class:`LatencyHistogram` of an endpoint, None if unused."""
+        return self.histograms.get((endpoint, method.lower()))
+
+    def summary(self, order_by='total'):
+        """Statistics of every endpoint and method, busiest first.
+
+        Args:
+            order_by (str): Key of the statistics to sort on, e.g.
+                ``'total'`` (time spent), ``'count'`` or ``'p99'``.
+
+        Returns:
+            list: One dict per endpoint template and method, with the keys
+            of :meth:`LatencyHistogram.to_dict`.
+        """
+        with self._lock:
+            histograms = list(self.histograms.items())
+        result = []
+        for (endpoint, method), histogram in histograms:
+            row = histogram.to_dict()
+            row.update(endpoint=endpoint, method=method)
+            result.append(row)
+        result.sort(key=lambda row: row[order_by] or 0, reverse=True)
+        return result
+
+    def _notify(self, hooks, event):
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception('Request hook %r failed', hook)
+
+    def record(self, event):
+        """Account for a completed request and call the ``after`` hooks."""
+        if self.keep_histograms:
+            key = (event.endpoint, event.method)
+            with self._lock:
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = LatencyHistogram()
+                histogram.observe(event.latency, event.error is not None)
+        if self._after:
+            self._notify(self._after, event)
+
+    def measure(self, method, endpoint, call, verb, uri, **kwargs):
+        """Send a request through ``call`` and record it.
+
+        Args:
+            method (str): HTTP method of the request.
+            endpoint (str): Its endpoint template.
+            call (callable): Called as ``call(method, send, uri,
+                **kwargs)``, typically ``RetryPolicy.call``.  It may invoke
+                ``send`` more than once, each further invocation counts as
+                a retry.
+            verb (callable): The session verb sending the request.
+            uri (str): URI of the request.
+
+        Returns:
+            The response returned by ``call``.
+        """
+        event = RequestEvent(method, uri, endpoint, self.clock())
+        attempts = [0]
+
+        def send(*args, **kw):
+            attempts[0] += 1
+            return verb(*args, **kw)
+
+        if self._before:
+            self._notify(self._before, event)
+        response = None
+        try:
+            response = call(method, send, uri, **kwargs)
+            return response
+        except Exception as ex:
+            event.error = ex
+            response = getattr(ex, 'response', None)
+            raise
+        finally:
+            event.latency = self.clock() - event.started
+            event.retries = max(attempts[0] - 1, 0)
+            status = getattr(response, 'status_code', None)
+            if isinstance(status, integer_types):
+                event.status = status
+            event.request_bytes = _request_bytes(response, kwargs)
+            if response is not None:
+                event.response_bytes = _response_bytes(
+                    response, kwargs.get('stream', False))
+            self.record(event)
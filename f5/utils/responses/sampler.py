@@ -0,0 +1,209 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Sample the statistics of a whole collection at once.
+
+Where :class:`~f5.utils.responses.handlers.Stats` wraps the statistics of
+one object, a :class:`StatsSampler` reads the ``stats`` endpoint of a
+collection, for example ``/mgmt/tm/ltm/virtual/stats`` or
+``/mgmt/tm/ltm/pool/~Common~web/members/stats``, in a single request per
+sample.  Only the requested counters are kept, in preallocated columns with
+one slot per object, and the last ``history`` samples are kept in a ring
+buffer:
+
+.. code-block:: python
+
+    >>> sampler = StatsSampler(mgmt.tm.ltm.virtuals,
+    ...                        ['clientside.bitsIn', 'clientside.curConns'])
+    >>> sampler.sample()
+    >>> time.sleep(10)
+    >>> sampler.sample()
+    >>> dict(zip(sampler.names, sampler.rates('clientside.bitsIn')))
+    {'/Common/vs1': 81240.8, '/Common/vs2': 0.0}
+
+Columns are ``array.array('d')``; ``numpy.frombuffer`` turns them into
+NumPy arrays without a copy.  Objects missing from a sample, and counters
+that went backwards (a reset), read as NaN.  Counters are stored as
+doubles, which are exact up to 2**53.
+"""
+
+from array import array
+import time
+
+from six import iteritems
+from six.moves.urllib.parse import unquote
+from six.moves.urllib.parse import urlsplit
+
+
+NAN = float('nan')
+
+
+def _object_name(link):
+    """Full path of the object a ``.../~Common~name/stats`` link is about."""
+    path = urlsplit(link).path.rstrip('/')
+    if path.endswith('/stats'):
+        path = path[:-len('/stats')]
+    return unquote(path.rsplit('/', 1)[-1]).replace('~', '/')
+
+
+def _nan_row(size):
+    return array('d', [NAN]) * size
+
+
+class StatsSampler(object):
+    """Keep a history of some counters of every object of a collection.
+
+    Args:
+        collection (Collection): The collection to sample, for example
+            ``mgmt.tm.ltm.virtuals`` or ``pool.members_s``.
+        counters (list): Names of the counters to keep, as the device
+            names them, e.g. ``'clientside.bitsIn'``.
+        history (int): Number of samples kept.
+        capacity (int): Number of objects to allocate room for.  The
+            columns grow when more objects are seen.
+
+    Attributes:
+        names (list): Full path of each object, in column order.
+        samples (int): Number of samples taken so far.
+    """
+
+    def __init__(self, collection, counters, history=60, capacity=64):
+        if history < 2:
+            raise ValueError('history must keep at least two samples')
+        self.collection = collection
+        self.counters = list(counters)
+        self.history = history
+        self.names = []
+        self.samples = 0
+        self._index = {}
+        self._links = {}
+        self._capacity = max(capacity, 1)
+        self._times = _nan_row(history)
+        self._columns = dict(
+            (counter, [_nan_row(self._capacity) for _ in range(history)])
+            for counter in self.counters)
+
+    @property
+    def uri(self):
+        return self.collection._meta_data['uri'] + 'stats'
+
+    def _slot(self, age):
+        if age >= min(self.samples, self.history):
+            raise IndexError('only %d samples are kept' % min(
+                self.samples, self.history))
+        return (self.samples - 1 - age) % self.history
+
+    def _grow(self, size):
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+        padding = _nan_row(capacity - self._capacity)
+        for rows in self._columns.values():
+            for row in rows:
+                row.extend(padding)
+        self._capacity = capacity
+
+    def _column_of(self, name):
+        index = self._index.get(name)
+        if index is None:
+            index = len(self.names)
+            if index >= self._capacity:
+                self._grow(index + 1)
+            self._index[name] = index
+            self.names.append(name)
+        return index
+
+    def sample(self, timestamp=None):
+        """Read the collection's statistics once and record them.
+
+        Args:
+            timestamp (float): Time of the sample, ``time.time()`` by
+                default.
+        """
+        response = self.collection._request('get', self.uri, use_cache=False)
+        self.record(self.collection._decode(response), timestamp)
+
+    def record(self, body, timestamp=None):
+        """Record the decoded body of a collection ``stats`` response."""
+        slot = self.samples % self.history
+        rows = [(counter, self._columns[counter][slot])
+                for counter in self.counters]
+        seen = set()
+        for link, entry in iteritems(body.get('entries', {})):
+            index = self._links.get(link)
+            if index is None:
+                # Growing the columns extends the rows in place.
+                index = self._column_of(_object_name(link))
+                self._links[link] = index
+            seen.add(index)
+            stats = entry.get('nestedStats', {}).get('entries', {})
+            for counter, row in rows:
+                value = stats.get(counter)
+                if value is not None and 'value' in value:
+                    row[index] = value['value']
+                else:
+                    row[index] = NAN
+        # The slot still holds an older sample; only the columns of objects
+        # missing from this one need clearing, the rest were never written.
+        for index in range(len(self.names)):
+            if index not in seen:
+                for _, row in rows:
+                    row[index] = NAN
+        self._times[slot] = time.time() if timestamp is None else timestamp
+        self.samples += 1
+
+    def index(self, name):
+        """Column of the object with full path ``name``."""
+        return self._index[name]
+
+    def timestamp(self, age=0):
+        """Time of the sample taken ``age`` samples ago."""
+        return self._times[self._slot(age)]
+
+    def values(self, counter, age=0):
+        """Values of ``counter`` for every object, ``age`` samples ago.
+
+        :returns: array.array of floats, one per name in :attr:`names`
+        """
+        return self._columns[counter][self._slot(age)][:len(self.names)]
+
+    def deltas(self, counter, age=0):
+        """Change of ``counter`` between two consecutive samples."""
+        current = self.values(counter, age)
+        previous = self.values(counter, age + 1)
+        result = array('d', map(float.__sub__, current, previous))
+        for index, delta in enumerate(result):
+            if delta < 0:
+                result[index] = NAN
+        return result
+
+    def rates(self, counter, age=0):
+        """Change of ``counter`` per second between consecutive samples."""
+        elapsed = self.timestamp(age) - self.timestamp(age + 1)
+        if elapsed <= 0:
+            return _nan_row(len(self.names))
+        scale = 1.0 / elapsed
+        return array('d', [delta * scale
+                           for delta in self.deltas(counter, age)])
+
+    def series(self, counter, name):
+        """Values of ``counter`` for one object, oldest sample first."""
+        index = self._index[name]
+        rows = self._columns[counter]
+        kept = min(self.samples, self.history)
+        return array('d', [rows[self._slot(age)][index]
+                           for age in range(kept - 1, -1, -1)])
@@ -0,0 +1,123 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import math
+import mock
+import pytest
+
+from f5.utils.responses.sampler import StatsSampler
+
+
+BASE = 'https://localhost/mgmt/tm/ltm/virtual/'
+
+
+def _body(**bits_in):
+    entries = {}
+    for name, value in bits_in.items():
+        link = BASE + '~Common~%s/~Common~%s/stats' % (name, name)
+        entries[link] = {'nestedStats': {'entries': {
+            'clientside.bitsIn': {'value': value},
+            'clientside.curConns': {'value': 1},
+            'tmName': {'description': '/Common/%s' % name}}}}
+    return {'kind': 'tm:ltm:virtual:virtualcollectionstats',
+            'entries': entries}
+
+
+def _nan(value):
+    return math.isnan(value)
+
+
+@pytest.fixture
+def sampler():
+    collection = mock.MagicMock()
+    collection._meta_data = {
+        'uri': 'https://192.168.1.1:443/mgmt/tm/ltm/virtual/'}
+    return StatsSampler(collection, ['clientside.bitsIn'], history=3,
+                        capacity=1)
+
+
+def test_sample_reads_collection_stats_once(sampler):
+    collection = sampler.collection
+    collection._decode.return_value = _body(a=10)
+    sampler.sample(timestamp=100.0)
+    collection._request.assert_called_once_with(
+        'get', 'https://192.168.1.1:443/mgmt/tm/ltm/virtual/stats',
+        use_cache=False)
+    assert sampler.names == ['/Common/a']
+    assert list(sampler.values('clientside.bitsIn')) == [10.0]
+    assert sampler.timestamp() == 100.0
+
+
+def test_rates_and_new_objects(sampler):
+    sampler.record(_body(a=10, b=5), timestamp=100.0)
+    sampler.record(_body(a=30, b=1, c=7), timestamp=110.0)
+    a, b, c = (sampler.index('/Common/%s' % n) for n in 'abc')
+    deltas = sampler.deltas('clientside.bitsIn')
+    assert deltas[a] == 20.0
+    # A counter that went backwards was reset, an object that was not
+    # there before has no previous value.
+    assert _nan(deltas[b]) and _nan(deltas[c])
+    rates = sampler.rates('clientside.bitsIn')
+    assert rates[a] == 2.0
+    assert len(rates) == 3
+
+
+def test_ring_buffer(sampler):
+    for i in range(5):
+        sampler.record(_body(a=i * 10), timestamp=float(i))
+    assert sampler.samples == 5
+    assert list(sampler.series('clientside.bitsIn', '/Common/a')) == \
+        [20.0, 30.0, 40.0]
+    assert list(sampler.values('clientside.bitsIn', age=2)) == [20.0]
+    with pytest.raises(IndexError):
+        sampler.values('clientside.bitsIn', age=3)
+
+
+def test_missing_object_reads_nan(sampler):
+    sampler.record(_body(a=1, b=2), timestamp=1.0)
+    sampler.record(_body(b=3), timestamp=2.0)
+    values = sampler.values('clientside.bitsIn')
+    assert _nan(values[sampler.index('/Common/a')])
+    assert values[sampler.index('/Common/b')] == 3.0
+
+
+def test_reused_slot_is_cleared(sampler):
+    for i in range(3):
+        sampler.record(_body(a=1, b=2), timestamp=float(i))
+    body = _body(b=3)
+    sampler.record(body, timestamp=3.0)
+    values = sampler.values('clientside.bitsIn')
+    assert _nan(values[sampler.index('/Common/a')])
+    assert values[sampler.index('/Common/b')] == 3.0
+    stats = list(body['entries'].values())[0]['nestedStats']['entries']
+    del stats['clientside.bitsIn']
+    for i in range(3):
+        sampler.record(body, timestamp=4.0 + i)
+    assert all(_nan(v) for v in sampler.values('clientside.bitsIn'))
+
+
+def test_pool_member_names():
+    collection = mock.MagicMock()
+    collection._meta_data = {'uri': 'https://h/mgmt/tm/ltm/pool/~Common~p/'
+                                    'members/'}
+    sampler = StatsSampler(collection, ['serverside.curConns'])
+    sampler.record({'entries': {
+        'https://localhost/mgmt/tm/ltm/pool/~Common~p/members/'
+        '~Common~10.0.0.1:80/stats': {'nestedStats': {'entries': {
+            'serverside.curConns': {'value': 4}}}}}})
+    assert sampler.names == ['/Common/10.0.0.1:80']
+    assert list(sampler.values('serverside.curConns')) == [4.0]
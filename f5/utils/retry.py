@@ -0,0 +1,189 @@
+# coding=utf-8
+#
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Retry policy applied to the HTTP requests issued by resources.
+
+Every ``ManagementRoot`` owns a :class:`RetryPolicy`.  The CRUD verbs of
+``f5.bigip.resource`` send their requests through it, so a policy tuned for
+a busy or distant device can be passed in when connecting:
+
+.. code-block:: python
+
+    >>> from f5.bigip import ManagementRoot
+    >>> from f5.utils.retry import RetryPolicy
+    >>> policy = RetryPolicy(max_attempts=5, deadline=10)
+    >>> mgmt = ManagementRoot('192.168.1.1', 'admin', 'admin',
+    ...                       retry_policy=policy)
+    >>> mgmt.tm.ltm.pools.get_collection()
+    >>> policy.stats['retries']
+    0
+"""
+
+import random
+import threading
+import time
+
+from requests.exceptions import ConnectionError
+from requests.exceptions import ConnectTimeout
+from requests.exceptions import HTTPError
+from requests.exceptions import ProxyError
+from requests.exceptions import SSLError
+
+
+class RetryPolicy(object):
+    """Exponential backoff with jitter, bounded by attempts and a deadline.
+
+    A request is retried when it fails with a connection error, or when the
+    device answers with one of ``retry_statuses`` and the HTTP method is one
+    of ``status_retry_methods``.  POST and PATCH are not retried on status by
+    default because they are not guaranteed to be idempotent.
+
+    For the same reason only the methods in ``connection_retry_methods`` are
+    retried on any connection error.  The other methods, such as the POSTs
+    of ``create`` and ``exec_cmd``, are retried only on a
+    :exc:`requests.exceptions.ConnectTimeout`, when the request was never
+    sent.  An :exc:`~requests.exceptions.SSLError` or a
+    :exc:`~requests.exceptions.ProxyError` comes from the configuration
+    rather than from a transient failure and is never retried.
+
+    The wait before retry ``n`` (starting at 0) is drawn uniformly from
+    ``[0, min(max_backoff, backoff_factor * 2 ** n)]``, or is exactly that
+    upper bound if ``jitter`` is False.  A ``Retry-After`` header sent with
+    a retryable status is honoured when it asks for a longer wait.  No retry
+    is attempted if it would start after ``deadline`` seconds have passed
+    since the first attempt.
+
+    Args:
+        max_attempts (int): Total attempts, including the first one.
+        backoff_factor (float): Seconds of the first backoff step.
+        max_backoff (float): Upper bound of a single wait, in seconds.
+        deadline (float): Upper bound of the time spent retrying, in
+            seconds.  ``None`` disables it.
+        jitter (bool): Randomize each wait to spread out retries from
+            concurrent clients.
+        retry_statuses (iterable): HTTP status codes considered transient.
+        status_retry_methods (iterable): Methods retried on those statuses.
+        retry_connection_errors (bool): Retry on
+            :exc:`requests.exceptions.ConnectionError`.
+        connection_retry_methods (iterable): Methods retried on every
+            connection error, not only when the connection was never made.
+
+    Attributes:
+        stats (dict): Counters of ``attempts``, ``retries`` (split into
+            ``connection_retries`` and ``status_retries``) and ``giveups``
+            (retryable failures that were raised because the attempts or the
+            deadline ran out).
+    """
+    STAT_NAMES = ('attempts', 'retries', 'connection_retries',
+                  'status_retries', 'giveups')
+
+    def __init__(self, max_attempts=10, backoff_factor=0.5, max_backoff=8.0,
+                 deadline=30.0, jitter=True,
+                 retry_statuses=(408, 429, 502, 503, 504),
+                 status_retry_methods=('get', 'put', 'delete'),
+                 retry_connection_errors=True,
+                 connection_retry_methods=('get', 'put', 'delete')):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.status_retry_methods = frozenset(
+            m.lower() for m in status_retry_methods)
+        self.retry_connection_errors = retry_connection_errors
+        self.connection_retry_methods = frozenset(
+            m.lower() for m in connection_retry_methods)
+        self.sleep = time.sleep
+        self.clock = time.time
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(self.STAT_NAMES, 0)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = dict.fromkeys(self.STAT_NAMES, 0)
+
+    def _count(self, *names):
+        with self._lock:
+            for name in names:
+                self.stats[name] += 1
+
+    def _classify(self, method, ex):
+        """Return the counter name for a retryable error, otherwise None."""
+        if isinstance(ex, HTTPError):
+            response = getattr(ex, 'response', None)
+            status = getattr(response, 'status_code', None)
+            if status in self.retry_statuses and \
+                    method.lower() in self.status_retry_methods:
+                return 'status_retries'
+            return None
+        if not isinstance(ex, ConnectionError) or \
+                not self.retry_connection_errors or \
+                isinstance(ex, (SSLError, ProxyError)):
+            return None
+        if method.lower() in self.connection_retry_methods or \
+                isinstance(ex, ConnectTimeout):
+            return 'connection_retries'
+        return None
+
+    def backoff(self, retry_number):
+        """Seconds to wait before the given retry (0 based)."""
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** retry_number)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    @staticmethod
+    def _retry_after(ex):
+        response = getattr(ex, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return 0
+
+    def call(self, method, func, *args, **kwargs):
+        """Invoke ``func(*args, **kwargs)`` and retry it under this policy.
+
+        Args:
+            method (str): HTTP method the call performs, e.g. ``'get'``.
+            func (callable): The callable performing the request.
+
+        Returns:
+            Whatever ``func`` returns.
+        """
+        start = self.clock()
+        retries = 0
+        while True:
+            self._count('attempts')
+            try:
+                return func(*args, **kwargs)
+            except (ConnectionError, HTTPError) as ex:
+                kind = self._classify(method, ex)
+                if kind is None:
+                    raise
+                delay = max(self.backoff(retries), self._retry_after(ex))
+                elapsed = self.clock() - start
+                out_of_attempts = retries + 1 >= self.max_attempts
+                out_of_time = self.deadline is not None and \
+                    elapsed + delay > self.deadline
+                if out_of_attempts or out_of_time:
+                    self._count('giveups')
+                    raise
+                self._count('retries', kind)
+                retries += 1
+                self.sleep(delay)
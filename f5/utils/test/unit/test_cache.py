@@ -0,0 +1,207 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import mock
+import pytest
+
+from f5.utils.cache import _request_path
+from f5.utils.cache import ResourceCache
+from f5.utils.json_codec import JSONCodec
+
+BASE = 'https://host:443/mgmt/tm/ltm/pool/'
+
+
+class Response(object):
+    def __init__(self, body):
+        self.body = body
+        self.status_code = 200
+        self.headers = {}
+
+    def json(self):
+        return dict(self.body)
+
+
+class FakeDevice(object):
+    """Answer GETs from a dict of path -> body, honouring $select."""
+    def __init__(self, objects):
+        self.objects = objects
+        self.calls = []
+
+    def get(self, uri, **kwargs):
+        path, params = _request_path(uri, kwargs)
+        self.calls.append((path, params))
+        body = self.objects[path]
+        if params.get('$select') == 'generation':
+            if 'items' in body:
+                return Response({'items': [{'generation': i['generation']}
+                                           for i in body['items']]})
+            return Response({'generation': body['generation']})
+        return Response(body)
+
+
+@pytest.fixture
+def device():
+    return FakeDevice({
+        '/mgmt/tm/ltm/pool/~Common~web': {'name': 'web', 'generation': 1},
+        '/mgmt/tm/ltm/pool': {'items': [{'name': 'web', 'generation': 1}]},
+        '/mgmt/tm/ltm/pool/~Common~web/stats': {
+            'kind': 'tm:ltm:pool:poolstats', 'entries': {}}})
+
+
+@pytest.fixture
+def cache():
+    cache = ResourceCache(ttl=10)
+    cache.now = 100.0
+    cache.clock = lambda: cache.now
+    return cache
+
+
+def load(cache, device, name='web', **kwargs):
+    return cache.get(device.get, BASE, uri_as_parts=True, name=name,
+                     partition='Common', **kwargs).json()
+
+
+def test_request_path():
+    assert _request_path(BASE, {'uri_as_parts': True, 'name': 'web',
+                                'partition': 'Common'}) == \
+        ('/mgmt/tm/ltm/pool/~Common~web', {})
+    assert _request_path(BASE + '~Common~web?ver=11.6.0',
+                         {'params': '$select=name'}) == \
+        ('/mgmt/tm/ltm/pool/~Common~web', {'ver': '11.6.0',
+                                           '$select': 'name'})
+
+
+def test_hit_within_ttl(cache, device):
+    first = load(cache, device)
+    first['name'] = 'mutated'
+    assert load(cache, device)['name'] == 'web'
+    assert len(device.calls) == 1
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 1
+
+
+def test_params_are_part_of_key(cache, device):
+    load(cache, device)
+    load(cache, device, params={'expandSubcollections': 'true'})
+    assert cache.stats['misses'] == 2
+
+
+def test_stale_entry_revalidated_by_generation(cache, device):
+    load(cache, device)
+    cache.now += 11
+    assert load(cache, device)['name'] == 'web'
+    assert device.calls[-1][1] == {'$select': 'generation'}
+    assert cache.stats['revalidations'] == 1
+    assert cache.stats['hits'] == 1
+    cache.now += 5
+    load(cache, device)
+    assert len(device.calls) == 2
+
+
+def test_stale_entry_refetched_when_generation_changed(cache, device):
+    load(cache, device)
+    device.objects['/mgmt/tm/ltm/pool/~Common~web'] = \
+        {'name': 'web', 'generation': 2, 'description': 'new'}
+    cache.now += 11
+    assert load(cache, device)['description'] == 'new'
+    assert cache.stats['revalidations'] == 1
+    assert cache.stats['misses'] == 2
+
+
+def test_collection_revalidation(cache, device):
+    cache.get(device.get, BASE)
+    cache.now += 11
+    cache.get(device.get, BASE)
+    assert cache.stats['hits'] == 1
+    device.objects['/mgmt/tm/ltm/pool']['items'].append(
+        {'name': 'api', 'generation': 7})
+    cache.now += 11
+    assert len(cache.get(device.get, BASE).json()['items']) == 2
+    assert cache.stats['misses'] == 2
+
+
+def test_no_revalidation_without_generation(cache, device):
+    device.objects['/mgmt/tm/ltm/pool/~Common~web'] = {'name': 'web'}
+    load(cache, device)
+    cache.now += 11
+    load(cache, device)
+    assert cache.stats['revalidations'] == 0
+    assert cache.stats['misses'] == 2
+
+
+def test_stats_are_not_cached(cache, device):
+    cache.get(device.get, BASE + '~Common~web/stats')
+    cache.get(device.get, BASE + '~Common~web/stats')
+    assert cache.stats['misses'] == 2
+    assert len(cache) == 0
+
+
+def test_lru_eviction(device):
+    cache = ResourceCache(max_entries=2)
+    device.objects['/mgmt/tm/ltm/pool/~Common~api'] = {'generation': 1}
+    load(cache, device, 'web')
+    cache.get(device.get, BASE)
+    load(cache, device, 'web')
+    load(cache, device, 'api')
+    assert cache.stats['evictions'] == 1
+    load(cache, device, 'web')
+    assert cache.stats['hits'] == 2
+    cache.get(device.get, BASE)
+    assert cache.stats['misses'] == 4
+
+
+def test_invalidate(cache, device):
+    load(cache, device)
+    cache.get(device.get, BASE)
+    cache.get(device.get, BASE + '~Common~web/stats')
+    cache.invalidate(BASE, method='post')
+    assert len(cache) == 1
+    cache.get(device.get, BASE)
+    cache.invalidate(BASE + '~Common~web', method='put')
+    assert len(cache) == 0
+    assert cache.stats['invalidations'] == 3
+
+
+def test_invalidate_subcollections(cache):
+    member = BASE + '~Common~web/members/~Common~a:80'
+    members = FakeDevice({
+        '/mgmt/tm/ltm/pool/~Common~web/members/~Common~a:80':
+            {'generation': 1}})
+    cache.get(members.get, member)
+    cache.invalidate(BASE, method='post')
+    assert len(cache) == 1
+    cache.invalidate(BASE, uri_as_parts=True, name='web',
+                     partition='Common', method='delete')
+    assert len(cache) == 0
+
+
+def test_content_decoded_once_with_codec():
+    module = mock.MagicMock(__name__='counting')
+    module.loads.side_effect = json.loads
+    codec = JSONCodec(module)
+    cache = ResourceCache(codec=codec)
+    body = b'{"name": "web", "generation": 1}'
+    response = mock.MagicMock(content=body, status_code=200, headers={})
+    send = mock.MagicMock(return_value=response)
+    first = cache.get(send, BASE + '~Common~web')
+    assert codec.decode(first) == {'name': 'web', 'generation': 1}
+    assert module.loads.call_count == 1
+    assert not module.dumps.called
+    second = cache.get(send, BASE + '~Common~web')
+    assert second.content is body
+    assert codec.decode(second)['name'] == 'web'
+    assert module.loads.call_count == 2
+    assert send.call_count == 1
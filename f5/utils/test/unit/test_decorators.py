@@ -0,0 +1,41 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+
+from f5.utils.decorators import MaximumAttemptsReached
+from f5.utils.decorators import poll_with_backoff
+
+
+@mock.patch('f5.utils.decorators.time.sleep')
+def test_poll_with_backoff_grows_interval(mock_sleep):
+    func = mock.MagicMock(side_effect=[ValueError, ValueError, ValueError,
+                                       ValueError, 'done'])
+    func.__name__ = 'func'
+    assert poll_with_backoff(func, 10, 0.5, initial_interval=0.1)() == 'done'
+    assert [c[0][0] for c in mock_sleep.call_args_list] == \
+        [0.1, 0.2, 0.4, 0.5]
+
+
+@mock.patch('f5.utils.decorators.time.sleep')
+def test_poll_with_backoff_gives_up(mock_sleep):
+    func = mock.MagicMock(side_effect=ValueError('never'))
+    func.__name__ = 'func'
+    with pytest.raises(MaximumAttemptsReached) as ex:
+        poll_with_backoff(func, 3, 2)()
+    assert 'never' in str(ex.value)
+    assert func.call_count == 3
+    assert mock_sleep.call_count == 2
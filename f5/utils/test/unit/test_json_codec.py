@@ -0,0 +1,78 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import mock
+import pytest
+
+from f5.utils.json_codec import get_codec
+from f5.utils.json_codec import JSONCodec
+
+
+BODY = {'kind': 'tm:ltm:pool:poolcollectionstate',
+        'items': [{'name': u'p\xe9%d' % i, 'ratio': 1.5, 'weight': 10 ** i}
+                  for i in range(20)],
+        'selfLink': 'https://localhost/mgmt/tm/ltm/pool?ver=13.1.0'}
+
+
+def _chunks(size):
+    data = json.dumps(BODY).encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_get_codec():
+    assert get_codec().is_stdlib
+    codec = JSONCodec()
+    assert get_codec(codec) is codec
+    assert get_codec('json').is_stdlib
+    assert get_codec('no_such_json_module').is_stdlib
+
+
+def test_decode_from_bytes():
+    response = mock.MagicMock(content=b'{"name": "p\\u00e9"}')
+    assert JSONCodec().decode(response) == {'name': u'p\xe9'}
+    assert not response.json.called
+
+
+def test_decode_falls_back_to_json_method():
+    response = mock.MagicMock(content=b'')
+    response.json.return_value = {'name': 'p'}
+    assert JSONCodec().decode(response) == {'name': 'p'}
+
+
+def test_orjson_codec():
+    pytest.importorskip('orjson')
+    codec = get_codec('orjson')
+    assert not codec.is_stdlib
+    assert codec.loads(codec.dumps(BODY)) == BODY
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 1 << 20])
+def test_iter_items(size):
+    stream = JSONCodec().iter_items(_chunks(size))
+    assert list(stream) == BODY['items']
+    assert stream.extra == {'kind': BODY['kind'],
+                            'selfLink': BODY['selfLink']}
+
+
+def test_iter_items_without_items():
+    stream = JSONCodec().iter_items([b' {"kind": "x"', b'} '])
+    assert list(stream) == []
+    assert stream.extra == {'kind': 'x'}
+
+
+def test_iter_items_truncated():
+    with pytest.raises(ValueError):
+        list(JSONCodec().iter_items([b'{"items": [{"a": 1}, {"a"']))
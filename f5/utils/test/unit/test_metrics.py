@@ -0,0 +1,132 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+
+from f5.utils.metrics import endpoint_template
+from f5.utils.metrics import LatencyHistogram
+from f5.utils.metrics import RequestMetrics
+from f5.utils.retry import RetryPolicy
+from requests.exceptions import ConnectionError
+from requests.exceptions import HTTPError
+
+
+class Response(object):
+    def __init__(self, status_code=200, content=b'{}', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.request = mock.MagicMock(body=b'{"name": "a"}')
+
+
+@pytest.fixture
+def metrics():
+    m = RequestMetrics()
+    m.clock = mock.MagicMock(side_effect=[10.0, 10.25])
+    return m
+
+
+def test_endpoint_template():
+    base = 'https://192.168.1.1:443/mgmt/'
+    assert endpoint_template(
+        base + 'tm/ltm/pool/~Common~web/members/~Common~10.0.0.1:80') == \
+        'tm/ltm/pool/{name}/members/{name}'
+    assert endpoint_template(base + 'tm/ltm/pool/?$top=10') == 'tm/ltm/pool'
+    assert endpoint_template(base + 'tm/transaction/1525/commands/') == \
+        'tm/transaction/{id}/commands'
+    assert endpoint_template(base + 'tm/sys/db/ui.advisory.enabled',
+                             name='ui.advisory.enabled') == 'tm/sys/db/{name}'
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram(smallest=0.001, growth=2, buckets=10)
+    for latency in [0.001] * 50 + [0.003] * 49 + [5.0]:
+        histogram.observe(latency)
+    assert histogram.percentile(50) == 0.001
+    assert histogram.percentile(90) == 0.004
+    # Latencies above the last bucket report the maximum.
+    assert histogram.percentile(100) == 5.0
+    assert histogram.count == 100
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_measure_records_event(metrics):
+    events = []
+    metrics.add_hook(after=events.append,
+                     before=lambda e: events.append(e.latency))
+    verb = mock.MagicMock(return_value=Response(content=b'{"a": 1}'))
+    response = metrics.measure('post', 'tm/ltm/pool', RetryPolicy().call,
+                               verb, 'https://h/mgmt/tm/ltm/pool/',
+                               json={'name': 'a'})
+    assert response is verb.return_value
+    assert events[0] is None
+    event = events[1]
+    assert (event.method, event.endpoint, event.status) == \
+        ('post', 'tm/ltm/pool', 200)
+    assert event.latency == 0.25
+    assert event.request_bytes == 13
+    assert event.response_bytes == 8
+    assert event.retries == 0
+    summary = metrics.summary()
+    assert summary[0]['count'] == 1
+    assert summary[0]['endpoint'] == 'tm/ltm/pool'
+    assert metrics.histogram('tm/ltm/pool', 'POST').max == 0.25
+
+
+def test_measure_counts_retries_and_errors(metrics):
+    events = []
+    metrics.add_hook(after=events.append)
+    policy = RetryPolicy(max_attempts=2, jitter=False)
+    policy.sleep = mock.MagicMock()
+    failure = HTTPError(response=Response(status_code=404, content=b'x'))
+    verb = mock.MagicMock(side_effect=[ConnectionError('reset'), failure])
+    with pytest.raises(HTTPError):
+        metrics.measure('get', 'tm/ltm/pool/{name}', policy.call, verb, 'u')
+    event = events[0]
+    assert event.retries == 1
+    assert event.status == 404
+    assert event.error is failure
+    assert metrics.histogram('tm/ltm/pool/{name}', 'get').errors == 1
+
+
+def test_stream_is_not_read(metrics):
+    response = Response(headers={'Content-Length': '512'})
+    response.content = mock.PropertyMock(side_effect=AssertionError)
+    events = []
+    metrics.add_hook(after=events.append)
+    metrics.measure('get', 'tm/ltm/pool', RetryPolicy().call,
+                    mock.MagicMock(return_value=response), 'u', stream=True)
+    assert events[0].response_bytes == 512
+
+
+def test_failing_hook_is_ignored(metrics):
+    hook = mock.MagicMock(side_effect=ValueError('bug'))
+    metrics.add_hook(after=hook)
+    verb = mock.MagicMock(return_value=Response())
+    metrics.measure('get', 'tm', RetryPolicy().call, verb, 'u')
+    assert hook.called
+    metrics.remove_hook(hook)
+    metrics.clock.side_effect = [1.0, 2.0]
+    metrics.measure('get', 'tm', RetryPolicy().call, verb, 'u')
+    assert hook.call_count == 1
+    assert metrics.histogram('tm', 'get').count == 2
+
+
+def test_histograms_disabled():
+    metrics = RequestMetrics(histograms=False)
+    verb = mock.MagicMock(return_value=Response())
+    metrics.measure('get', 'tm', RetryPolicy().call, verb, 'u')
+    assert metrics.summary() == []
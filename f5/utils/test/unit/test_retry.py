@@ -0,0 +1,133 @@
+# Copyright 2018 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mock
+import pytest
+
+from f5.utils.retry import RetryPolicy
+from requests.exceptions import ConnectionError
+from requests.exceptions import ConnectTimeout
+from requests.exceptions import HTTPError
+from requests.exceptions import ProxyError
+from requests.exceptions import SSLError
+
+
+def http_error(status, headers=None):
+    response = mock.MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return HTTPError(response=response)
+
+
+@pytest.fixture
+def policy():
+    p = RetryPolicy(max_attempts=4, backoff_factor=1, max_backoff=3,
+                    deadline=None, jitter=False)
+    p.sleep = mock.MagicMock()
+    return p
+
+
+def test_success_first_time(policy):
+    func = mock.MagicMock(return_value='ok')
+    assert policy.call('get', func, 'uri', a=1) == 'ok'
+    func.assert_called_once_with('uri', a=1)
+    assert policy.stats['attempts'] == 1
+    assert policy.stats['retries'] == 0
+
+
+def test_connection_error_backoff(policy):
+    func = mock.MagicMock(side_effect=[
+        ConnectionError('Connection aborted'),
+        ConnectionError('Connection aborted'),
+        ConnectionError('Connection aborted'),
+        'ok'])
+    assert policy.call('get', func) == 'ok'
+    assert [c[0][0] for c in policy.sleep.call_args_list] == [1, 2, 3]
+    assert policy.stats['retries'] == 3
+    assert policy.stats['connection_retries'] == 3
+
+
+def test_connection_retry_only_when_safe(policy):
+    func = mock.MagicMock(side_effect=ConnectionError('Connection aborted'))
+    with pytest.raises(ConnectionError):
+        policy.call('post', func)
+    func = mock.MagicMock(side_effect=[ConnectTimeout('timed out'), 'ok'])
+    assert policy.call('post', func) == 'ok'
+    for error in (SSLError('bad certificate'), ProxyError('bad proxy')):
+        func = mock.MagicMock(side_effect=error)
+        with pytest.raises(type(error)):
+            policy.call('get', func)
+    assert policy.stats['retries'] == 1
+    policy = RetryPolicy(connection_retry_methods=['GET', 'POST'])
+    policy.sleep = mock.MagicMock()
+    func = mock.MagicMock(side_effect=[ConnectionError('reset'), 'ok'])
+    assert policy.call('post', func) == 'ok'
+
+
+def test_gives_up_after_max_attempts(policy):
+    func = mock.MagicMock(side_effect=ConnectionError('refused'))
+    with pytest.raises(ConnectionError):
+        policy.call('get', func)
+    assert func.call_count == 4
+    assert policy.stats['giveups'] == 1
+
+
+def test_status_retry_only_for_idempotent_methods(policy):
+    func = mock.MagicMock(side_effect=[http_error(503), 'ok'])
+    assert policy.call('get', func) == 'ok'
+    assert policy.stats['status_retries'] == 1
+
+    func = mock.MagicMock(side_effect=http_error(503))
+    with pytest.raises(HTTPError):
+        policy.call('post', func)
+    assert func.call_count == 1
+
+
+def test_non_retryable_status(policy):
+    func = mock.MagicMock(side_effect=http_error(404))
+    with pytest.raises(HTTPError):
+        policy.call('get', func)
+    assert func.call_count == 1
+    assert policy.stats['giveups'] == 0
+
+
+def test_retry_after_header(policy):
+    func = mock.MagicMock(side_effect=[
+        http_error(429, {'Retry-After': '7'}), 'ok'])
+    policy.call('get', func)
+    policy.sleep.assert_called_once_with(7.0)
+
+
+def test_deadline(policy):
+    policy.deadline = 2.5
+    policy.clock = mock.MagicMock(side_effect=[0, 0, 0.5, 3])
+    func = mock.MagicMock(side_effect=ConnectionError('refused'))
+    with pytest.raises(ConnectionError):
+        policy.call('get', func)
+    # the waits of 1 and 2 seconds fit in the deadline, the third does not
+    assert func.call_count == 3
+    assert policy.stats['giveups'] == 1
+
+
+def test_jitter_bounds():
+    p = RetryPolicy(backoff_factor=1, max_backoff=4)
+    for retry in range(6):
+        assert 0 <= p.backoff(retry) <= 4
+
+
+def test_reset_stats(policy):
+    policy.call('get', mock.MagicMock())
+    policy.reset_stats()
+    assert policy.stats['attempts'] == 0